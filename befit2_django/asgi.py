@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'befit2_django.settings')
+# Pod ASGI widoki odczytu działają w wersji async def (TRAINING_ASYNC_VIEWS).
+os.environ.setdefault('BEFIT_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
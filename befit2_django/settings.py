@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,13 +42,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'training.profiling.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'training.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'training.profiling.ViewProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'befit2_django.urls'
@@ -73,13 +77,48 @@ WSGI_APPLICATION = 'befit2_django.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Strojenie SQLite pod równoległe zapisy i odczyty: pragmy ustawiane przy
+# każdym nowym połączeniu (training/sqlite.py) oraz transakcje BEGIN IMMEDIATE,
+# które biorą blokadę zapisu od razu i czekają na nią (busy_timeout), zamiast
+# zwracać "database is locked" przy próbie podniesienia blokady w trakcie.
+# BEFIT_SQLITE_TUNING=0 przywraca domyślne ustawienia (np. do porównań).
+SQLITE_TUNING = os.environ.get('BEFIT_SQLITE_TUNING', '1') != '0'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('BEFIT_DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'} if SQLITE_TUNING else {},
     }
 }
 
+# Repliki do odczytu (training/routers.py). Lokalnie replikę może udawać druga
+# baza SQLite (BEFIT_REPLICA_NAME) odświeżana poleceniem sync_replica.
+# Po zapisie użytkownik czyta z bazy głównej przez
+# TRAINING_PRIMARY_PIN_SECONDS sekund.
+TRAINING_READ_REPLICAS = []
+TRAINING_PRIMARY_PIN_SECONDS = 10
+
+if os.environ.get('BEFIT_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['BEFIT_REPLICA_NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    TRAINING_READ_REPLICAS = ['replica']
+
+DATABASE_ROUTERS = ['training.routers.PrimaryReplicaRouter']
+
+TRAINING_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Ujemna wartość to rozmiar w KiB (tu 64 MiB na połączenie).
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+} if SQLITE_TUNING else {}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -124,4 +163,37 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Redirects after login/logout
 LOGIN_REDIRECT_URL = '/'
-LOGOUT_REDIRECT_URL = '/'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = '/'
+
+# Widoki odczytu (listy, szczegóły sesji, statystyki) w wersji async def –
+# pod ASGI bez przeskoku do wątku na czas zapytań do bazy. Pod WSGI (runserver,
+# gunicorn) każdy widok async wymagałby własnej pętli zdarzeń, dlatego są
+# domyślnie włączone tylko w befit2_django/asgi.py. BEFIT_ASYNC_VIEWS=0/1
+# wybiera wersje jawnie (np. do porównania wydajności).
+TRAINING_ASYNC_VIEWS = os.environ.get('BEFIT_ASYNC_VIEWS', '0') == '1'
+
+# Wersje danych w pamięci podręcznej (training/versions.py) muszą być wspólne
+# dla procesów serwera. Domyślny cache (LocMemCache) jest osobny w każdym
+# procesie, więc wtedy wersje czytane są z bazy. Przy wspólnym cache (CACHES
+# z Redis lub Memcached) leżą w nim; None – wykrycie na podstawie CACHES.
+TRAINING_SHARED_CACHE = None
+
+# Pomiar żądań (training/profiling.py): Server-Timing, log JSON i próbki pod
+# /monitoring/requests/. Wyłączony middleware nie trafia do łańcucha.
+TRAINING_PROFILING = os.environ.get('BEFIT_PROFILING', '0') == '1'
+TRAINING_PROFILING_SAMPLE_RATE = float(
+    os.environ.get('BEFIT_PROFILING_SAMPLE_RATE', '1')
+)
+TRAINING_PROFILING_BUFFER_SIZE = 200
+TRAINING_PROFILING_SLOW_QUERIES = 5
+
+# Kolejka przeliczeń w tle (training/jobs.py): "local" – pula wątków w procesie
+# serwera, "worker" – tylko `manage.py run_training_worker`, "eager" – od razu
+# w miejscu wywołania, bez kolejki.
+TRAINING_JOBS_BACKEND = os.environ.get('BEFIT_JOBS_BACKEND', 'local')
+TRAINING_JOBS_LOCAL_THREADS = 2
+TRAINING_JOBS_MAX_ATTEMPTS = 5
+# Opóźnienie ponowienia w sekundach, podwajane przy każdej kolejnej próbie.
+TRAINING_JOBS_RETRY_DELAY = 10
+# Po tym czasie zadanie w toku uznaje się za porzucone (worker przerwany).
+TRAINING_JOBS_LOCK_TIMEOUT = 300
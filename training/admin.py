@@ -1,6 +1,154 @@
+"""
+Panel administracyjny.
+
+Listy sesji i ćwiczeń działają w trybie wydajnym (PerformanceAdminMixin),
+bo te tabele rosną najszybciej:
+
+- powiązane obiekty z kolumn listy dociągane są jednym JOIN-em
+  (list_select_related) zamiast zapytania na wiersz,
+- lista bez filtrów i wyszukiwania nie liczy wierszy przez COUNT(*) – liczbę
+  szacuje z zakresu kluczy głównych (dwa odczyty z indeksu), a dokładny
+  COUNT(*) wykonuje tylko dla małych tabel; sumy bez filtrów też nie liczy
+  (show_full_result_count),
+- filtry po użytkowniku i typie ćwiczenia to pola autouzupełniania zamiast
+  listy wszystkich użytkowników w panelu bocznym,
+- wyszukiwanie zamienia tekst na klucze po indeksach (nazwa użytkownika – prefiks
+  na unikalnym indeksie, typ ćwiczenia – z zapamiętanego katalogu) zamiast
+  LIKE '%…%' po całej tabeli,
+- domyślne sortowanie po kluczu głównym, które nie wymaga sortowania tabeli.
+"""
+
+from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db.models import Max, Min, Q
+from django.utils.functional import cached_property
+
+from . import catalogue
+from .models import ExerciseType, TrainingJob, TrainingSession, SessionExercise
+
+
+# Największa liczba użytkowników, których nazwa pasuje do wyszukiwanego prefiksu.
+SEARCH_USERS_LIMIT = 100
+
+
+def exact_count_limit():
+    return getattr(settings, "TRAINING_ADMIN_EXACT_COUNT_LIMIT", 10000)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator listy bez filtrów: liczba wierszy szacowana z zakresu kluczy
+    głównych (zawyżona o usunięte wiersze). Poniżej
+    TRAINING_ADMIN_EXACT_COUNT_LIMIT liczy dokładnie – to wciąż tanie.
+    """
+
+    @cached_property
+    def count(self):
+        span = self.object_list.model._base_manager.aggregate(
+            low=Min("pk"), high=Max("pk")
+        )
+        if span["low"] is None:
+            return 0
+        estimate = span["high"] - span["low"] + 1
+        if estimate <= exact_count_limit():
+            return super().count
+        return estimate
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """
+    Filtr po kluczu obcym jako pole autouzupełniania (widok autocomplete
+    panelu) – nie wczytuje wszystkich obiektów powiązanego modelu.
+    """
+
+    template = "admin/training/autocomplete_filter.html"
 
-from .models import ExerciseType, TrainingSession, SessionExercise
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.admin_site = model_admin.admin_site
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        # Adres z wybraną wartością uzupełnia skrypt filtra.
+        self.url_template = changelist.get_query_string(
+            {self.lookup_kwarg: "__value__"}, [self.lookup_kwarg_isnull, PAGE_VAR]
+        )
+        yield {
+            "selected": self.lookup_val is None,
+            "query_string": changelist.get_query_string(
+                remove=[self.lookup_kwarg, self.lookup_kwarg_isnull, PAGE_VAR]
+            ),
+            "display": "Wszystko",
+        }
+
+    def widget(self):
+        field = forms.ModelChoiceField(
+            queryset=self.field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(self.field, self.admin_site),
+            required=False,
+        )
+        value = self.lookup_val[-1] if self.lookup_val else None
+        return field.widget.render(f"filter-{self.field_path}", value)
+
+
+class PerformanceAdminMixin:
+    """
+    Tryb wydajny listy (opis w nagłówku modułu). Klasa określa
+    list_select_related, autocomplete_filters i indexed_search – pola, po
+    których szuka: "created_by" (prefiks nazwy użytkownika) i "exercise_type"
+    (fragment nazwy typu ćwiczenia).
+    """
+
+    autocomplete_filters = ()
+    indexed_search = ()
+    ordering = ("-pk",)
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+    def get_list_filter(self, request):
+        return [
+            (name, AutocompleteFilter) for name in self.autocomplete_filters
+        ] + list(super().get_list_filter(request))
+
+    @property
+    def media(self):
+        return super().media + AutocompleteSelect(None, self.admin_site).media
+
+    def get_paginator(self, request, queryset, per_page, **kwargs):
+        if set(request.GET) <= {ORDER_VAR, PAGE_VAR}:
+            return EstimatedCountPaginator(queryset, per_page, **kwargs)
+        return super().get_paginator(request, queryset, per_page, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        condition = Q()
+        if "created_by" in self.indexed_search:
+            user_ids = (
+                get_user_model()
+                .objects.filter(username__gte=term, username__lt=term + "\U0010ffff")
+                .order_by("username")
+                .values_list("pk", flat=True)[:SEARCH_USERS_LIMIT]
+            )
+            condition |= Q(created_by_id__in=list(user_ids))
+        if "exercise_type" in self.indexed_search:
+            needle = term.casefold()
+            type_ids = [
+                t.pk for t in catalogue.exercise_types() if needle in t.name.casefold()
+            ]
+            condition |= Q(exercise_type_id__in=type_ids)
+        return queryset.filter(condition), False
 
 
 @admin.register(ExerciseType)
@@ -10,14 +158,18 @@ class ExerciseTypeAdmin(admin.ModelAdmin):
 
 
 @admin.register(TrainingSession)
-class TrainingSessionAdmin(admin.ModelAdmin):
+class TrainingSessionAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ("start", "end", "created_by")
-    list_filter = ("created_by", "start")
-    search_fields = ("created_by__username",)
+    list_select_related = ("created_by",)
+    autocomplete_filters = ("created_by",)
+    list_filter = ("start",)
+    search_fields = ("^created_by__username",)
+    indexed_search = ("created_by",)
+    autocomplete_fields = ("created_by",)
 
 
 @admin.register(SessionExercise)
-class SessionExerciseAdmin(admin.ModelAdmin):
+class SessionExerciseAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = (
         "exercise_type",
         "training_session",
@@ -26,8 +178,18 @@ class SessionExerciseAdmin(admin.ModelAdmin):
         "reps",
         "created_by",
     )
-    list_filter = ("exercise_type", "created_by")
+    list_select_related = ("exercise_type", "training_session", "created_by")
+    autocomplete_filters = ("exercise_type", "created_by")
     search_fields = (
         "exercise_type__name",
-        "created_by__username",
+        "^created_by__username",
     )
+    indexed_search = ("exercise_type", "created_by")
+    autocomplete_fields = ("training_session", "exercise_type", "created_by")
+
+
+@admin.register(TrainingJob)
+class TrainingJobAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_after", "last_error")
+    list_filter = ("status", "name")
+    readonly_fields = ("dedup_key", "locked_at")
@@ -0,0 +1,216 @@
+"""
+Długoterminowe trendy postępów liczone kolumnowo w NumPy.
+
+Historia użytkownika wczytywana jest jednym zapytaniem values_list()
+z agregatów dziennych (DailyExerciseStats) do tablic (dzień, typ ćwiczenia,
+objętość, najlepszy szacowany 1RM) – wierszy jest tyle, ile dni z treningiem
+danego typu, a nie ile ćwiczeń. Tablice trzymane są w cache pod kluczem
+z wersją danych użytkownika (ta sama, co dla fragmentów stron), więc każda
+zmiana jego ćwiczeń je unieważnia. Metryki liczone są bez pętli po wierszach:
+
+- tygodniowa objętość na typ ćwiczenia i jej średnia krocząca (np.bincount
+  + sumy skumulowane),
+- krzywa szacowanego 1RM – najlepszy wynik tygodnia (np.maximum.reduceat),
+- nachylenie tej krzywej w kg/tydzień (regresja liniowa z sum grupowych).
+
+NumPy jest zależnością opcjonalną – bez niego AVAILABLE jest False, a strona
+statystyk pomija trendy.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+
+from django.core.cache import cache
+
+from . import fragments, routers
+from .models import DailyExerciseStats
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - zależy od środowiska
+    np = None
+
+AVAILABLE = np is not None
+
+CACHE_KEY = "training:analytics-daily:{user_id}:{version}"
+CACHE_TIMEOUT = 24 * 60 * 60
+DEFAULT_WINDOW = 4
+MAX_WINDOW = 52
+
+COLUMNS = ("period_start", "exercise_type_id", "total_volume", "best_e1rm")
+
+
+@dataclass(frozen=True)
+class History:
+    # Dzień (porządkowy, data lokalna), rosnąco; jeden wiersz na (dzień, typ).
+    days: "np.ndarray"
+    type_ids: "np.ndarray"
+    volume: "np.ndarray"
+    e1rm: "np.ndarray"
+
+    def __len__(self):
+        return len(self.days)
+
+
+# --- Wczytywanie ---
+
+
+def _queryset(user_id):
+    return (
+        DailyExerciseStats.objects.filter(created_by_id=user_id)
+        .order_by("period_start", "exercise_type_id")
+        .values_list(*COLUMNS)
+    )
+
+
+def _to_arrays(rows):
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        floats = empty.astype(np.float64)
+        return History(empty, empty, floats, floats)
+    days, type_ids, volume, e1rm = zip(*rows)
+    return History(
+        days=np.fromiter(
+            (day.toordinal() for day in days), dtype=np.int64, count=len(days)
+        ),
+        type_ids=np.asarray(type_ids, dtype=np.int64),
+        volume=np.asarray(volume, dtype=np.float64),
+        e1rm=np.asarray(e1rm, dtype=np.float64),
+    )
+
+
+def history(user_id):
+    """
+    Tablice z całą historią użytkownika (z cache albo jednym zapytaniem).
+    """
+    key = CACHE_KEY.format(user_id=user_id, version=fragments.version(user_id))
+    data = cache.get(key)
+    if data is None:
+        data = _to_arrays(list(_queryset(user_id)))
+        cache.set(key, data, routers.cache_timeout(CACHE_TIMEOUT))
+    return data
+
+
+async def ahistory(user_id):
+    """
+    Asynchroniczna wersja history().
+    """
+    version = await fragments.aversion(user_id)
+    key = CACHE_KEY.format(user_id=user_id, version=version)
+    data = await cache.aget(key)
+    if data is None:
+        data = _to_arrays([row async for row in _queryset(user_id)])
+        await cache.aset(key, data, routers.cache_timeout(CACHE_TIMEOUT))
+    return data
+
+
+# --- Metryki ---
+
+
+def _rolling_mean(values, window):
+    # Średnia krocząca po ostatniej osi z sum skumulowanych; na początku
+    # (mniej niż window punktów) – średnia z dostępnych.
+    cumsum = np.cumsum(values, axis=-1)
+    shifted = np.zeros_like(cumsum)
+    shifted[..., window:] = cumsum[..., :-window]
+    counts = np.minimum(np.arange(1, values.shape[-1] + 1), window)
+    return (cumsum - shifted) / counts
+
+
+def _slopes(groups, x, y, n_groups):
+    # Nachylenie prostej MNK w każdej grupie z sum: n, Σx, Σy, Σxx, Σxy.
+    n = np.bincount(groups, minlength=n_groups).astype(np.float64)
+    sx = np.bincount(groups, weights=x, minlength=n_groups)
+    sy = np.bincount(groups, weights=y, minlength=n_groups)
+    sxx = np.bincount(groups, weights=x * x, minlength=n_groups)
+    sxy = np.bincount(groups, weights=x * y, minlength=n_groups)
+    denominator = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = (n * sxy - sx * sy) / denominator
+    return np.where(denominator > 0, slopes, np.nan)
+
+
+def trends(data, names, window=DEFAULT_WINDOW):
+    """
+    Trendy tygodniowe dla każdego typu ćwiczenia z historii; names to
+    słownik {pk typu: nazwa}.
+    """
+    if not len(data):
+        return {"weeks": [], "window": window, "types": []}
+
+    # Tygodnie od poniedziałku (dzień porządkowy 1 to poniedziałek).
+    week_index = (data.days - 1) // 7
+    first_week = week_index.min()
+    week = week_index - first_week
+    n_weeks = int(week.max()) + 1
+    type_ids, type_index = np.unique(data.type_ids, return_inverse=True)
+    n_types = len(type_ids)
+
+    # Objętość tygodniowa: jedna siatka (typ × tydzień) z np.bincount.
+    cell = type_index * n_weeks + week
+    volume = np.bincount(
+        cell, weights=data.volume, minlength=n_types * n_weeks
+    ).reshape(n_types, n_weeks)
+    volume_avg = _rolling_mean(volume, window)
+
+    # Najlepszy szacowany 1RM w tygodniu: segmenty (typ, tydzień) po sortowaniu.
+    order = np.argsort(cell, kind="stable")
+    sorted_cells = cell[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    best = np.maximum.reduceat(data.e1rm[order], starts)
+    segment_cells = sorted_cells[starts]
+    segment_types = segment_cells // n_weeks
+    segment_weeks = segment_cells % n_weeks
+    e1rm_grid = np.full(n_types * n_weeks, np.nan)
+    e1rm_grid[segment_cells] = best
+    e1rm_grid = e1rm_grid.reshape(n_types, n_weeks)
+
+    slopes = _slopes(
+        segment_types, segment_weeks.astype(np.float64), best, n_types
+    )
+
+    monday = date.fromordinal(int(first_week) * 7 + 1)
+    weeks = [date.fromordinal(monday.toordinal() + 7 * i) for i in range(n_weeks)]
+    return {
+        "weeks": weeks,
+        "window": window,
+        "types": [
+            {
+                "exercise_type_id": int(type_id),
+                "exercise": names.get(int(type_id), ""),
+                "volume": _rounded(volume[i]),
+                "volume_avg": _rounded(volume_avg[i]),
+                "e1rm": _rounded(e1rm_grid[i]),
+                "e1rm_slope": _rounded_scalar(slopes[i]),
+            }
+            for i, type_id in enumerate(type_ids)
+        ],
+    }
+
+
+def summary(data, names, window=DEFAULT_WINDOW):
+    """
+    Skrót trendów na stronę statystyk: ostatnia średnia krocząca objętości,
+    ostatni tygodniowy 1RM i jego nachylenie – po jednym wierszu na typ.
+    """
+    result = trends(data, names, window)
+    rows = []
+    for t in result["types"]:
+        e1rm = [value for value in t["e1rm"] if value is not None]
+        rows.append(
+            {
+                "exercise": t["exercise"],
+                "volume_avg": t["volume_avg"][-1],
+                "e1rm": e1rm[-1] if e1rm else None,
+                "e1rm_slope": t["e1rm_slope"],
+            }
+        )
+    return sorted(rows, key=lambda row: row["exercise"])
+
+
+def _rounded(values):
+    return [None if np.isnan(v) else round(float(v), 2) for v in values]
+
+
+def _rounded_scalar(value):
+    return None if np.isnan(value) else round(float(value), 3)
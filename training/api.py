@@ -0,0 +1,340 @@
+"""
+JSON API dla danych treningowych.
+
+Zasoby: typy ćwiczeń, sesje treningowe i wykonane ćwiczenia – z tym samym
+zawężeniem do danych zalogowanego użytkownika co w widokach HTML.
+
+- ?fields=id,start – wybór pól (zapytanie pobiera tylko potrzebne kolumny),
+- ?after= / ?before= – paginacja kursorowa (jak na listach HTML),
+- If-None-Match / If-Modified-Since – odpowiedź 304 na podstawie znacznika
+  zmian użytkownika (TrainingDataStamp) lub wersji katalogu typów ćwiczeń,
+- zwarty JSON bez zbędnych spacji.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.forms.models import model_to_dict
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_http_methods
+
+from . import catalogue, deletion, stamps
+from .forms import ExerciseTypeForm, SessionExerciseForm, TrainingSessionForm
+from .models import ExerciseType, SessionExercise, TrainingSession
+from .pagination import PER_PAGE, keyset_page
+from .routers import pins_primary
+
+
+@dataclass(frozen=True)
+class Resource:
+    model: type[models.Model]
+    # nazwa pola w API -> wyrażenie dla .values()
+    fields: dict
+    form: type
+    order_field: str | None = None
+    owned: bool = True
+    write_fields: list = field(default_factory=list)
+
+
+EXERCISE_TYPES = Resource(
+    model=ExerciseType,
+    fields={"id": "id", "name": "name"},
+    form=ExerciseTypeForm,
+    owned=False,
+    write_fields=["name"],
+)
+TRAINING_SESSIONS = Resource(
+    model=TrainingSession,
+    fields={
+        "id": "id",
+        "start": "start",
+        "end": "end",
+        "exercise_count": "exercise_count",
+        "total_volume": "total_volume",
+        "duration_seconds": "duration_seconds",
+    },
+    form=TrainingSessionForm,
+    order_field="start",
+    write_fields=["start", "end"],
+)
+SESSION_EXERCISES = Resource(
+    model=SessionExercise,
+    fields={
+        "id": "id",
+        "training_session": "training_session_id",
+        "session_start": "session_start",
+        "exercise_type": "exercise_type_id",
+        "exercise": "exercise_type__name",
+        "weight": "weight",
+        "sets": "sets",
+        "reps": "reps",
+    },
+    form=SessionExerciseForm,
+    order_field="session_start",
+    write_fields=["training_session", "exercise_type", "weight", "sets", "reps"],
+)
+
+
+class ApiError(Exception):
+    def __init__(self, status, payload):
+        super().__init__(payload)
+        self.status = status
+        self.payload = payload
+
+
+def _json(payload, status=200):
+    return JsonResponse(
+        payload,
+        status=status,
+        encoder=DjangoJSONEncoder,
+        json_dumps_params={"separators": (",", ":"), "ensure_ascii": False},
+    )
+
+
+def api_view(view):
+    """
+    Wspólna obsługa: wymagane logowanie (401 zamiast przekierowania),
+    błędy jako JSON.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return _json({"detail": "Wymagane zalogowanie."}, status=401)
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as e:
+            return _json(e.payload, status=e.status)
+        except Http404:
+            return _json({"detail": "Nie znaleziono."}, status=404)
+
+    return wrapper
+
+
+# --- Odczyt ---
+
+
+def _selected_fields(request, resource):
+    raw = request.GET.get("fields")
+    if not raw:
+        return list(resource.fields)
+    selected = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in resource.fields]
+    if unknown:
+        raise ApiError(400, {"fields": [f"Nieznane pola: {', '.join(unknown)}."]})
+    return selected
+
+
+def _project(rows, resource, selected):
+    return [{name: row[resource.fields[name]] for name in selected} for row in rows]
+
+
+def _queryset(request, resource):
+    queryset = resource.model.objects.order_by()
+    if resource.owned:
+        queryset = queryset.filter(created_by=request.user)
+    return queryset
+
+
+def _values(queryset, resource, selected):
+    # Kolumny klucza paginacji muszą być zawsze pobrane.
+    lookups = {resource.fields[name] for name in selected} | {"id"}
+    if resource.order_field:
+        lookups.add(resource.order_field)
+    return queryset.values(*lookups)
+
+
+def _list(request, resource):
+    selected = _selected_fields(request, resource)
+    rows = _values(_queryset(request, resource), resource, selected)
+    page = keyset_page(rows, request.GET, resource.order_field, PER_PAGE)
+    return _json(
+        {
+            "results": _project(page, resource, selected),
+            "next": page.next_cursor,
+            "previous": page.previous_cursor,
+        }
+    )
+
+
+def _detail(request, resource, pk):
+    selected = _selected_fields(request, resource)
+    rows = _values(_queryset(request, resource), resource, selected)
+    row = get_object_or_404(rows, pk=pk)
+    return _json(_project([row], resource, selected)[0])
+
+
+# --- Zapis ---
+
+
+def _body(request):
+    try:
+        data = json.loads(request.body or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError(400, {"detail": "Nieprawidłowy JSON."})
+    if not isinstance(data, dict):
+        raise ApiError(400, {"detail": "Oczekiwano obiektu JSON."})
+    return data
+
+
+def _form(request, resource, data, instance=None):
+    kwargs = {"instance": instance}
+    if resource.form in (SessionExerciseForm, TrainingSessionForm):
+        kwargs["user"] = request.user
+    return resource.form(data, **kwargs)
+
+
+def _check_write_access(request, resource):
+    if not resource.owned and not request.user.is_staff:
+        raise ApiError(403, {"detail": "Brak uprawnień."})
+
+
+def _save(request, resource, instance=None, partial=False):
+    _check_write_access(request, resource)
+    data = _body(request)
+    if partial:
+        data = {**model_to_dict(instance, fields=resource.write_fields), **data}
+    form = _form(request, resource, data, instance)
+    if not form.is_valid():
+        raise ApiError(400, {"errors": form.errors.get_json_data()})
+    obj = form.save(commit=False)
+    if resource.owned and instance is None:
+        obj.created_by = request.user
+    obj.save()
+    return obj
+
+
+def _get_instance(request, resource, pk):
+    return get_object_or_404(_queryset(request, resource), pk=pk)
+
+
+def _created(request, resource):
+    obj = _save(request, resource)
+    return _detail_response(resource, obj.pk, status=201)
+
+
+def _detail_response(resource, pk, status=200):
+    selected = list(resource.fields)
+    row = _values(resource.model.objects.filter(pk=pk), resource, selected).get()
+    return _json(_project([row], resource, selected)[0], status=status)
+
+
+# --- Żądania warunkowe ---
+
+
+def _variant(request):
+    # Ta sama ścieżka z innymi parametrami (pola, kursor) to inna treść.
+    query = "&".join(sorted(request.GET.urlencode().split("&")))
+    raw = f"{request.path}?{query}".encode()
+    return hashlib.md5(raw, usedforsecurity=False).hexdigest()[:12]
+
+
+def _user_etag(request, *args, **kwargs):
+    return stamps.etag(stamps.for_request(request), _variant(request))
+
+
+def _user_last_modified(request, *args, **kwargs):
+    return stamps.for_request(request).modified_at
+
+
+def _catalogue_etag(request, *args, **kwargs):
+    return f"{catalogue.version()}-{_variant(request)}"
+
+
+user_condition = condition(
+    etag_func=_user_etag, last_modified_func=_user_last_modified
+)
+catalogue_condition = condition(etag_func=_catalogue_etag)
+
+
+# --- Widoki ---
+
+
+def _collection(request, resource):
+    if request.method == "POST":
+        return _created(request, resource)
+    return _list(request, resource)
+
+
+def _item(request, resource, pk):
+    if request.method in ("GET", "HEAD"):
+        return _detail(request, resource, pk)
+    instance = _get_instance(request, resource, pk)
+    if request.method == "DELETE":
+        _check_write_access(request, resource)
+        deletion.delete(instance)
+        return HttpResponse(status=204)
+    obj = _save(request, resource, instance, partial=request.method == "PATCH")
+    return _detail_response(resource, obj.pk)
+
+
+@api_view
+@pins_primary
+@require_http_methods(["GET", "HEAD", "POST"])
+@catalogue_condition
+def exercise_types(request):
+    """
+    Katalog typów ćwiczeń (bez paginacji – to krótka lista słownikowa).
+    """
+    if request.method == "POST":
+        return _created(request, EXERCISE_TYPES)
+    selected = _selected_fields(request, EXERCISE_TYPES)
+    return _json(
+        {
+            "results": [
+                {name: getattr(t, name) for name in selected}
+                for t in catalogue.exercise_types()
+            ]
+        }
+    )
+
+
+@api_view
+@pins_primary
+@require_http_methods(["GET", "HEAD", "PUT", "PATCH", "DELETE"])
+@catalogue_condition
+def exercise_type_detail(request, pk):
+    return _item(request, EXERCISE_TYPES, pk)
+
+
+@api_view
+@pins_primary
+@require_http_methods(["GET", "HEAD", "POST"])
+@user_condition
+def training_sessions(request):
+    """
+    Sesje treningowe użytkownika, od najnowszej.
+    """
+    return _collection(request, TRAINING_SESSIONS)
+
+
+@api_view
+@pins_primary
+@require_http_methods(["GET", "HEAD", "PUT", "PATCH", "DELETE"])
+@user_condition
+def training_session_detail(request, pk):
+    return _item(request, TRAINING_SESSIONS, pk)
+
+
+@api_view
+@pins_primary
+@require_http_methods(["GET", "HEAD", "POST"])
+@user_condition
+def session_exercises(request):
+    """
+    Wykonane ćwiczenia użytkownika, od najnowszej sesji.
+    """
+    return _collection(request, SESSION_EXERCISES)
+
+
+@api_view
+@pins_primary
+@require_http_methods(["GET", "HEAD", "PUT", "PATCH", "DELETE"])
+@user_condition
+def session_exercise_detail(request, pk):
+    return _item(request, SESSION_EXERCISES, pk)
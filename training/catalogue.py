@@ -0,0 +1,78 @@
+"""
+Katalog typów ćwiczeń z pamięcią podręczną na dwóch poziomach.
+
+Wersja katalogu podbijana jest przy każdej zmianie typu ćwiczenia (sygnały –
+widoki i panel admina, import) i jest wspólna dla wszystkich procesów serwera
+(training/versions.py). Lista typów leży w cache Django pod kluczem
+zawierającym wersję oraz lokalnie w procesie, więc w stanie ustalonym odczyt
+katalogu wykonuje co najwyżej odczyt wersji – przy wspólnym cache żadnego
+zapytania. Lista wczytana z repliki nie trafia do pamięci procesu (replika
+może być opóźniona – patrz routers.cache_timeout).
+"""
+
+from django.core.cache import cache
+
+from . import routers, versions
+from .models import ExerciseType
+
+
+VERSION_KEY = "training:catalogue-version"
+TYPES_KEY = "training:catalogue:{version}"
+
+# (wersja, lista typów) – podmieniane w całości, więc bezpieczne dla wątków.
+_local = (None, [])
+
+
+def version():
+    return versions.get(VERSION_KEY)
+
+
+async def aversion():
+    return await versions.aget(VERSION_KEY)
+
+
+def bump():
+    """
+    Unieważnia katalog we wszystkich procesach.
+    """
+    versions.bump(VERSION_KEY)
+
+
+def exercise_types():
+    """
+    Wszystkie typy ćwiczeń posortowane po nazwie.
+    """
+    global _local
+    current = version()
+    local_version, types = _local
+    if local_version == current:
+        return types
+
+    key = TYPES_KEY.format(version=current)
+    types = cache.get(key)
+    if types is None:
+        types = list(ExerciseType.objects.order_by("name"))
+        cache.set(key, types, timeout=routers.cache_timeout(None))
+    if not routers.reading_from_replica():
+        _local = (current, types)
+    return types
+
+
+async def aexercise_types():
+    """
+    Asynchroniczna wersja exercise_types() (dla widoków async def).
+    """
+    global _local
+    current = await aversion()
+    local_version, types = _local
+    if local_version == current:
+        return types
+
+    key = TYPES_KEY.format(version=current)
+    types = await cache.aget(key)
+    if types is None:
+        types = [t async for t in ExerciseType.objects.order_by("name")]
+        await cache.aset(key, types, timeout=routers.cache_timeout(None))
+    if not routers.reading_from_replica():
+        _local = (current, types)
+    return types
@@ -0,0 +1,133 @@
+"""
+Miękkie usuwanie sesji treningowych i wykonanych ćwiczeń.
+
+Widoki i API nie kasują wierszy, tylko ustawiają deleted_at – sesji i wszystkich
+jej ćwiczeń po jednym UPDATE, bez zbierania obiektów do kaskady i bez sygnałów
+dla każdego wiersza. Domyślne menedżery obu modeli (LiveManager) pomijają
+usunięte wiersze, a fizycznie usuwa je później, partiami, polecenie
+purge_deleted_training.
+
+Dane pochodne poprawiane są od razu, liczbą zapytań niezależną od rozmiaru
+sesji: agregaty okresu sesji przeliczane są zbiorczo, a rekordy osobiste
+i rankingi trafiają do kolejki zadań w tle. Usunięcie z panelu admina (oraz
+kaskady, np. przy usuwaniu typu ćwiczenia) pozostaje zwykłym DELETE obsłużonym
+przez sygnały.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import jobs, records, rollups, stamps, summaries
+from .models import PersonalRecord, SessionExercise, TrainingSession
+
+# Pola rekordów osobistych wskazujące na ćwiczenie, z którego pochodzą.
+RECORD_SOURCE_FIELDS = [f"{metric}_exercise" for metric in records.METRICS]
+
+
+def delete_session(session):
+    """
+    Oznacza sesję i wszystkie jej ćwiczenia jako usunięte.
+    """
+    user_id = session.created_by_id
+    with transaction.atomic():
+        record_types = {t for _, t in records.sources_in_session(session.pk)}
+        type_ids = set(
+            SessionExercise.objects.filter(training_session_id=session.pk)
+            .order_by()
+            .values_list("exercise_type_id", flat=True)
+            .distinct()
+        )
+        now = timezone.now()
+        TrainingSession.objects.filter(pk=session.pk).update(deleted_at=now)
+        SessionExercise.objects.filter(training_session_id=session.pk).update(
+            deleted_at=now
+        )
+        rollups.refresh_period(user_id, rollups.period_start(session.start), type_ids)
+        # Przeliczenie rekordów odświeża też ranking swoich typów.
+        jobs.enqueue_types("records.recompute", user_id, record_types)
+        jobs.enqueue_types("leaderboards.refresh", user_id, type_ids - record_types)
+        stamps.bump(user_id)
+    session.deleted_at = now
+
+
+def delete_exercise(exercise):
+    """
+    Oznacza jedno ćwiczenie jako usunięte.
+    """
+    user_id = exercise.created_by_id
+    type_ids = [exercise.exercise_type_id]
+    with transaction.atomic():
+        was_record = records.is_source(exercise.pk)
+        now = timezone.now()
+        SessionExercise.objects.filter(pk=exercise.pk).update(deleted_at=now)
+        summaries.add(exercise.training_session_id, -1, -summaries.volume(exercise))
+        rollups.refresh_bucket(
+            user_id,
+            exercise.exercise_type_id,
+            rollups.period_start(exercise.session_start),
+        )
+        jobs.enqueue_types(
+            "records.recompute" if was_record else "leaderboards.refresh",
+            user_id,
+            type_ids,
+        )
+        stamps.bump(user_id)
+    exercise.deleted_at = now
+
+
+def delete(instance):
+    """
+    Usuwa obiekt: sesje i ćwiczenia miękko, pozostałe modele zwyczajnie.
+    """
+    if isinstance(instance, TrainingSession):
+        delete_session(instance)
+    elif isinstance(instance, SessionExercise):
+        delete_exercise(instance)
+    else:
+        instance.delete()
+
+
+# --- Czyszczenie ---
+
+
+def purge_exercises(before, batch_size):
+    """
+    Fizycznie usuwa jedną partię ćwiczeń usuniętych przed `before`.
+    Zwraca liczbę usuniętych wierszy (0 – nie ma już czego usuwać).
+    """
+    with transaction.atomic():
+        ids = list(
+            SessionExercise.all_objects.filter(deleted_at__lt=before)
+            .order_by()
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        # Rekord mógł jeszcze nie zostać przeliczony (zadanie w kolejce) –
+        # zamiast kaskady SET_NULL, dla której trzeba by zebrać obiekty.
+        for field in RECORD_SOURCE_FIELDS:
+            PersonalRecord.objects.filter(**{f"{field}__in": ids}).update(
+                **{field: None}
+            )
+        # Bez kolektora i sygnałów – dane pochodne poprawiono przy usuwaniu.
+        queryset = SessionExercise.all_objects.filter(pk__in=ids)
+        return queryset._raw_delete(queryset.db)
+
+
+def purge_sessions(before, batch_size):
+    """
+    Fizycznie usuwa jedną partię sesji usuniętych przed `before`, które nie
+    mają już żadnych ćwiczeń (te usuwa najpierw purge_exercises()).
+    """
+    with transaction.atomic():
+        ids = list(
+            TrainingSession.all_objects.filter(
+                deleted_at__lt=before, exercises__isnull=True
+            )
+            .order_by()
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        queryset = TrainingSession.all_objects.filter(pk__in=ids)
+        return queryset._raw_delete(queryset.db)
@@ -1,10 +1,18 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
+from django.urls import reverse_lazy
+from django.utils import timezone
 
+from . import catalogue, overlaps, stats
 from .models import TrainingSession, SessionExercise, ExerciseType
 
 
 class TrainingSessionForm(forms.ModelForm):
+    """
+    Sesja użytkownika `user` – nie może nakładać się na inne jego sesje.
+    """
+
     class Meta:
         model = TrainingSession
         fields = ["start", "end"]
@@ -17,6 +25,10 @@ class TrainingSessionForm(forms.ModelForm):
             ),
         }
 
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop("user")
+        super().__init__(*args, **kwargs)
+
     def clean(self):
         cleaned_data = super().clean()
         start = cleaned_data.get("start")
@@ -29,16 +41,115 @@ class TrainingSessionForm(forms.ModelForm):
                 }
             )
 
+        if start and end:
+            other = overlaps.find(self.user.pk, start, end, exclude_pk=self.instance.pk)
+            if other is not None:
+                raise ValidationError(
+                    "Sesja nakłada się na inną sesję: %(start)s – %(end)s.",
+                    params={
+                        "start": f"{timezone.localtime(other.start):%Y-%m-%d %H:%M}",
+                        "end": f"{timezone.localtime(other.end):%Y-%m-%d %H:%M}",
+                    },
+                )
+
         return cleaned_data
 
 
+class PreloadedModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField, który korzysta z listy obiektów wczytanej raz
+    (np. na cały formset) – renderowanie i walidacja nie wykonują zapytań.
+    """
+
+    def preload(self, objects):
+        self._objects = {str(obj.pk): obj for obj in objects}
+        self.choices = [("", self.empty_label)] + [
+            (obj.pk, self.label_from_instance(obj)) for obj in objects
+        ]
+
+    def to_python(self, value):
+        if not hasattr(self, "_objects"):
+            return super().to_python(value)
+        if value in self.empty_values:
+            return None
+        try:
+            return self._objects[str(value)]
+        except KeyError:
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+
+
+class RecentChoiceIterator(ModelChoiceIterator):
+    """
+    Opcje listy: `field.recent` najnowszych obiektów i – jeśli jest starszy –
+    aktualnie wybrany. Wczytywane przy pierwszym użyciu i zapamiętywane
+    (widżet przegląda opcje więcej niż raz).
+    """
+
+    def __iter__(self):
+        if not hasattr(self, "_choices"):
+            self._choices = list(self._build())
+        return iter(self._choices)
+
+    def _build(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        objects = list(self.queryset.order_by(*self.field.order)[: self.field.recent])
+        selected = str(self.field.selected or "")
+        if selected.isdigit() and all(str(obj.pk) != selected for obj in objects):
+            objects += self.queryset.filter(pk=selected)
+        for obj in objects:
+            yield self.choice(obj)
+
+
+class RecentModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField dla długich list (np. wszystkich sesji użytkownika):
+    lista rozwijana zawiera tylko `recent` najnowszych obiektów, a starsze
+    podpowiada wyszukiwarka. Walidacja to jedno wyszukanie przesłanego klucza
+    w queryset pola – bez wczytywania całej listy.
+    """
+
+    iterator = RecentChoiceIterator
+
+    def __init__(self, *args, recent=20, order=("-pk",), **kwargs):
+        self.recent = recent
+        self.order = order
+        # Klucz wybranego obiektu – ustawia formularz.
+        self.selected = None
+        super().__init__(*args, **kwargs)
+
+
 class SessionExerciseForm(forms.ModelForm):
+    # Na liście tylko ostatnie sesje; starsze – wyszukiwarka po dacie
+    # (session_autocomplete).
+    RECENT_SESSIONS = 20
+
+    training_session = RecentModelChoiceField(
+        queryset=TrainingSession.objects.none(),
+        label="Sesja treningowa",
+        recent=RECENT_SESSIONS,
+        order=("-start", "-id"),
+        widget=forms.Select(
+            attrs={
+                "class": "form-select",
+                "data-autocomplete-url": reverse_lazy("session_autocomplete"),
+            }
+        ),
+    )
+    exercise_type = PreloadedModelChoiceField(
+        queryset=ExerciseType.objects.all(),
+        label="Typ ćwiczenia",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+
     class Meta:
         model = SessionExercise
         fields = ["training_session", "exercise_type", "weight", "sets", "reps"]
         widgets = {
-            "training_session": forms.Select(attrs={"class": "form-select"}),
-            "exercise_type": forms.Select(attrs={"class": "form-select"}),
             "weight": forms.NumberInput(attrs={"class": "form-control"}),
             "sets": forms.NumberInput(attrs={"class": "form-control"}),
             "reps": forms.NumberInput(attrs={"class": "form-control"}),
@@ -47,11 +158,17 @@ class SessionExerciseForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         user = kwargs.pop("user")
         super().__init__(*args, **kwargs)
-        self.fields["training_session"].queryset = (
-            TrainingSession.objects.filter(created_by=user).order_by("-start")
-        )
+        field = self.fields["training_session"]
+        field.queryset = TrainingSession.objects.filter(created_by=user)
+        field.selected = self["training_session"].value()
+        self.fields["exercise_type"].preload(catalogue.exercise_types())
 
-        self.fields["exercise_type"].queryset = ExerciseType.objects.order_by("name")
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        # Istnienie sesji i typu ćwiczenia sprawdziły już pola formularza
+        # (sesję – razem z właścicielem).
+        exclude.update({"training_session", "exercise_type"})
+        return exclude
 
 
 class ExerciseTypeForm(forms.ModelForm):
@@ -61,3 +178,108 @@ class ExerciseTypeForm(forms.ModelForm):
         widgets = {
             "name": forms.TextInput(attrs={"class": "form-control"}),
         }
+
+
+class LoggedExerciseForm(forms.ModelForm):
+    """
+    Pojedynczy wiersz formularza zbiorczego zapisu sesji.
+    """
+
+    exercise_type = PreloadedModelChoiceField(
+        queryset=ExerciseType.objects.all(),
+        label="Typ ćwiczenia",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+
+    class Meta:
+        model = SessionExercise
+        fields = ["exercise_type", "weight", "sets", "reps"]
+        widgets = {
+            "weight": forms.NumberInput(attrs={"class": "form-control"}),
+            "sets": forms.NumberInput(attrs={"class": "form-control"}),
+            "reps": forms.NumberInput(attrs={"class": "form-control"}),
+        }
+
+    def __init__(self, *args, exercise_types=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if exercise_types is not None:
+            self.fields["exercise_type"].preload(exercise_types)
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        # Istnienie typu ćwiczenia sprawdziło już pole formularza – bez tego
+        # ForeignKey.validate() wykonałby osobne zapytanie dla każdego wiersza.
+        exclude.add("exercise_type")
+        return exclude
+
+
+class BaseSessionExerciseFormSet(forms.BaseInlineFormSet):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("form_kwargs", {})["exercise_types"] = (
+            catalogue.exercise_types()
+        )
+        super().__init__(*args, **kwargs)
+
+
+SessionExerciseFormSet = forms.inlineformset_factory(
+    TrainingSession,
+    SessionExercise,
+    form=LoggedExerciseForm,
+    formset=BaseSessionExerciseFormSet,
+    extra=11,
+    max_num=50,
+    min_num=1,
+    validate_min=True,
+    validate_max=True,
+    can_delete=False,
+)
+
+
+class StatsFilterForm(forms.Form):
+    """
+    Parametry strony statystyk (?range=, ?bucket=); puste pola – wartości domyślne.
+    """
+
+    range = forms.ChoiceField(
+        label="Zakres",
+        choices=[
+            ("7d", "7 dni"),
+            ("28d", "28 dni"),
+            ("90d", "90 dni"),
+            ("1y", "Rok"),
+            ("all", "Cała historia"),
+        ],
+        required=False,
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    bucket = forms.ChoiceField(
+        label="Grupowanie",
+        choices=[("day", "Dni"), ("week", "Tygodnie"), ("month", "Miesiące")],
+        required=False,
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        cleaned_data["range"] = cleaned_data.get("range") or stats.DEFAULT_RANGE
+        cleaned_data["bucket"] = cleaned_data.get("bucket") or stats.DEFAULT_BUCKET
+
+        days = stats.RANGES[cleaned_data["range"]]
+        if cleaned_data["bucket"] == "day" and (
+            days is None or days > stats.DAY_BUCKET_MAX_DAYS
+        ):
+            raise ValidationError(
+                {
+                    "bucket": "Grupowanie po dniach jest dostępne dla zakresu "
+                    f"do {stats.DAY_BUCKET_MAX_DAYS} dni."
+                }
+            )
+        return cleaned_data
+
+    def filters(self):
+        """
+        (zakres, kubełek) – z formularza albo domyślne, jeśli jest błędny.
+        """
+        if self.is_valid():
+            return self.cleaned_data["range"], self.cleaned_data["bucket"]
+        return stats.DEFAULT_RANGE, stats.DEFAULT_BUCKET
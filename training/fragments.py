@@ -0,0 +1,102 @@
+"""
+Pamięć podręczna wyrenderowanych fragmentów stron, osobna dla każdego użytkownika.
+
+Klucz fragmentu zawiera wersję danych użytkownika i wersję katalogu typów
+ćwiczeń. Wersja użytkownika to licznik podbijany po każdej zmianie jego sesji
+lub ćwiczeń (stamps.bump – widoki, panel admina, import), wspólny dla
+wszystkich procesów serwera (training/versions.py), więc nieaktualny fragment
+nie jest już nigdy odczytywany i po prostu wygasa. Przy wspólnym cache
+trafienie nie wykonuje żadnego zapytania do bazy.
+
+Liczniki trafień i chybień są lokalne dla procesu (bez dodatkowego zapisu
+do cache przy każdym żądaniu).
+"""
+
+import threading
+from collections import Counter
+
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from . import catalogue, routers, versions
+
+
+VERSION_KEY = "training:user-version:{user_id}"
+FRAGMENT_KEY = "training:fragment:{user_id}:{version}:{name}:{parts}"
+# Fragmenty starych wersji nie są usuwane – wygasają po tym czasie.
+TIMEOUT = 24 * 60 * 60
+
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def version(user_id):
+    return versions.get(VERSION_KEY.format(user_id=user_id))
+
+
+async def aversion(user_id):
+    return await versions.aget(VERSION_KEY.format(user_id=user_id))
+
+
+def bump(user_id):
+    """
+    Unieważnia wszystkie fragmenty użytkownika.
+    """
+    versions.bump(VERSION_KEY.format(user_id=user_id))
+
+
+def _key(user_id, user_version, catalogue_version, name, parts):
+    return FRAGMENT_KEY.format(
+        user_id=user_id,
+        version=f"{user_version}.{catalogue_version}",
+        name=name,
+        parts=":".join(str(p) for p in parts),
+    )
+
+
+def _count(hit):
+    with _lock:
+        _counters["hits" if hit else "misses"] += 1
+
+
+def get_or_render(user_id, name, parts, render):
+    """
+    Zwraca zapamiętany fragment albo wynik render() (i go zapamiętuje).
+    parts to wszystko poza użytkownikiem, od czego zależy treść (pk, kursor).
+    """
+    key = _key(user_id, version(user_id), catalogue.version(), name, parts)
+    html = cache.get(key)
+    _count(html is not None)
+    if html is None:
+        html = render()
+        cache.set(key, html, routers.cache_timeout(TIMEOUT))
+    return mark_safe(html)
+
+
+async def aget_or_render(user_id, name, parts, render):
+    """
+    Asynchroniczna wersja get_or_render(); render to funkcja async.
+    """
+    key = _key(
+        user_id, await aversion(user_id), await catalogue.aversion(), name, parts
+    )
+    html = await cache.aget(key)
+    _count(html is not None)
+    if html is None:
+        html = await render()
+        await cache.aset(key, html, routers.cache_timeout(TIMEOUT))
+    return mark_safe(html)
+
+
+def stats():
+    """
+    Liczniki trafień i chybień w tym procesie.
+    """
+    with _lock:
+        hits, misses = _counters["hits"], _counters["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,281 @@
+"""
+Kolejka zadań w tle dla ciężkich przeliczeń (rekordy osobiste, rankingi).
+
+Zadanie to wiersz TrainingJob zapisywany w tej samej transakcji co zmiana,
+która je wywołała – nie ginie przy awarii procesu i nie wykonuje się dla
+wycofanej zmiany. Identyczne zadanie (ta sama nazwa i argumenty) oczekuje
+w kolejce najwyżej raz: pilnuje tego częściowy unikalny indeks, a enqueue()
+to INSERT, który konflikt po prostu pomija. Nieudane zadanie wraca do kolejki
+z podwajanym opóźnieniem, aż wyczerpie TRAINING_JOBS_MAX_ATTEMPTS prób.
+Zadania muszą więc być idempotentne.
+
+Sposób wykonania wybiera TRAINING_JOBS_BACKEND (zmienna BEFIT_JOBS_BACKEND):
+
+- "local" – po zatwierdzeniu transakcji kolejkę opróżnia pula wątków
+  w procesie serwera; nie trzeba uruchamiać osobnego workera,
+- "worker" – zadania wykonuje tylko `manage.py run_training_worker`
+  (dowolna liczba procesów),
+- "eager" – zadanie wykonuje się od razu w miejscu wywołania, bez kolejki
+  (np. w testach).
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from . import leaderboards, records, stamps
+from .models import TrainingJob
+
+
+logger = logging.getLogger(__name__)
+
+Status = TrainingJob.Status
+
+BACKENDS = ("local", "worker", "eager")
+
+_tasks = {}
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def backend():
+    name = getattr(settings, "TRAINING_JOBS_BACKEND", "local")
+    if name not in BACKENDS:
+        raise ImproperlyConfigured(
+            f"TRAINING_JOBS_BACKEND musi być jednym z: {', '.join(BACKENDS)}."
+        )
+    return name
+
+
+def max_attempts():
+    return getattr(settings, "TRAINING_JOBS_MAX_ATTEMPTS", 5)
+
+
+def retry_delay():
+    return getattr(settings, "TRAINING_JOBS_RETRY_DELAY", 10)
+
+
+def lock_timeout():
+    return getattr(settings, "TRAINING_JOBS_LOCK_TIMEOUT", 300)
+
+
+def task(name):
+    """
+    Rejestruje funkcję jako zadanie o podanej nazwie. Argumenty zadania
+    muszą dać się zapisać jako JSON.
+    """
+
+    def register(func):
+        _tasks[name] = func
+        return func
+
+    return register
+
+
+# --- Dodawanie zadań ---
+
+
+def dedup_key(name, kwargs):
+    payload = json.dumps([name, kwargs], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def enqueue(name, **kwargs):
+    """
+    Dodaje zadanie do kolejki, chyba że identyczne już w niej oczeka.
+    """
+    if name not in _tasks:
+        raise KeyError(f"Nieznane zadanie {name!r}.")
+    if backend() == "eager":
+        _tasks[name](**kwargs)
+        return
+    TrainingJob.objects.bulk_create(
+        [
+            TrainingJob(
+                name=name,
+                args=kwargs,
+                dedup_key=dedup_key(name, kwargs),
+                run_after=timezone.now(),
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    if backend() == "local":
+        transaction.on_commit(_wake_local)
+
+
+def enqueue_types(name, user_id, exercise_type_ids):
+    """
+    Zadanie przeliczenia wycinków (użytkownik, typy ćwiczeń) – z posortowaną
+    listą typów, żeby ten sam zbiór zawsze dawał ten sam klucz deduplikacji.
+    Pusty zbiór typów nic nie dodaje.
+    """
+    if exercise_type_ids:
+        enqueue(name, user_id=user_id, exercise_type_ids=sorted(exercise_type_ids))
+
+
+# --- Wykonywanie ---
+
+
+def claim():
+    """
+    Pobiera najstarsze gotowe zadanie albo zwraca None, gdy takiego nie ma.
+    """
+    while True:
+        now = timezone.now()
+        pk = (
+            TrainingJob.objects.filter(status=Status.PENDING, run_after__lte=now)
+            .order_by("run_after", "id")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if pk is None:
+            return None
+        # Bez SELECT ... FOR UPDATE SKIP LOCKED (SQLite): zadanie należy do
+        # tego, czyj warunkowy UPDATE je zmienił; przegrany bierze następne.
+        claimed = TrainingJob.objects.filter(pk=pk, status=Status.PENDING).update(
+            status=Status.RUNNING, locked_at=now, attempts=F("attempts") + 1
+        )
+        if claimed:
+            return TrainingJob.objects.get(pk=pk)
+
+
+def run(job):
+    """
+    Wykonuje pobrane zadanie w transakcji. Udane zadanie znika z kolejki,
+    nieudane wraca do niej później albo zostaje oznaczone jako nieudane.
+    """
+    try:
+        func = _tasks.get(job.name)
+        if func is None:
+            raise LookupError(f"Nieznane zadanie {job.name!r}.")
+        with transaction.atomic():
+            func(**job.args)
+    except Exception as error:
+        logger.exception("Zadanie %s (%s) nie powiodło się.", job.pk, job.name)
+        _fail(job, error)
+        return False
+    TrainingJob.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def run_pending(limit=None):
+    """
+    Wykonuje gotowe zadania, aż kolejka się opróżni (albo do limitu).
+    Zwraca liczbę wykonanych zadań, także nieudanych.
+    """
+    done = 0
+    while limit is None or done < limit:
+        job = claim()
+        if job is None:
+            break
+        run(job)
+        done += 1
+    return done
+
+
+def drain(limit=None):
+    """
+    run_pending() dla wątku puli – zamyka na koniec jego połączenia z bazą.
+    """
+    try:
+        return run_pending(limit)
+    finally:
+        connections.close_all()
+
+
+def _fail(job, error):
+    message = "".join(traceback.format_exception_only(error)).strip()
+    queryset = TrainingJob.objects.filter(pk=job.pk)
+    if job.attempts >= max_attempts():
+        queryset.update(status=Status.FAILED, locked_at=None, last_error=message)
+        return
+    delay = retry_delay() * 2 ** max(job.attempts - 1, 0)
+    try:
+        with transaction.atomic():
+            queryset.update(
+                status=Status.PENDING,
+                locked_at=None,
+                run_after=timezone.now() + timedelta(seconds=delay),
+                last_error=message,
+            )
+    except IntegrityError:
+        # W międzyczasie trafiło do kolejki identyczne zadanie – wykona tę
+        # samą pracę.
+        queryset.delete()
+        return
+    if backend() == "local":
+        timer = threading.Timer(delay, _wake_local)
+        timer.daemon = True
+        timer.start()
+
+
+def requeue_stale():
+    """
+    Zadania wykonywane dłużej niż TRAINING_JOBS_LOCK_TIMEOUT sekund (worker
+    przerwany w trakcie) liczy jako nieudaną próbę. Zwraca ich liczbę.
+    """
+    cutoff = timezone.now() - timedelta(seconds=lock_timeout())
+    stale = list(
+        TrainingJob.objects.filter(status=Status.RUNNING, locked_at__lt=cutoff)
+    )
+    for job in stale:
+        _fail(job, TimeoutError("Przekroczono czas wykonania zadania."))
+    return len(stale)
+
+
+def counts():
+    """
+    Liczba zadań w kolejce według stanu.
+    """
+    rows = (
+        TrainingJob.objects.order_by()
+        .values_list("status")
+        .annotate(count=Count("*"))
+    )
+    return {status: 0 for status in Status.values} | dict(rows)
+
+
+# --- Pula wątków w procesie ---
+
+
+def _local_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "TRAINING_JOBS_LOCAL_THREADS", 2),
+                thread_name_prefix="training-jobs",
+            )
+        return _executor
+
+
+def _wake_local():
+    _local_executor().submit(drain)
+
+
+# --- Zadania ---
+
+
+@task("records.recompute")
+def recompute_records(user_id, exercise_type_ids):
+    # Rekord mógł się zmienić, a 1RM w rankingu jest jego kopią. Podbicie
+    # znacznika unieważnia ETag-i i fragmenty zapamiętane przed przeliczeniem.
+    records.recompute(user_id, exercise_type_ids)
+    leaderboards.refresh(user_id, exercise_type_ids)
+    stamps.bump(user_id)
+
+
+@task("leaderboards.refresh")
+def refresh_leaderboards(user_id, exercise_type_ids):
+    leaderboards.refresh(user_id, exercise_type_ids)
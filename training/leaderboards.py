@@ -0,0 +1,330 @@
+"""
+Rankingi użytkowników dla typów ćwiczeń (LeaderboardEntry).
+
+Tabela trzyma po jednym wyniku na (typ ćwiczenia, miara, użytkownik):
+najlepszy szacowany 1RM (kopia z rekordów osobistych) i objętość z ostatnich
+VOLUME_DAYS dni. Zapis ćwiczenia przelicza tylko wycinek (użytkownik, typ),
+a polecenie refresh_leaderboards przelicza całość – m.in. po to, żeby stare
+ćwiczenia wypadały z okna objętości.
+
+Czołówka to zakres indeksu (typ, miara, wynik malejąco) ucięty po TOP_N
+wierszach. Miejsce (1 + liczba wyższych wyników) jest zapisane w samym wyniku,
+więc jego odczyt to wyszukanie po użytkowniku niezależnie od liczby
+uczestników. Przeliczenie wyniku przesuwa o jedno miejsce tylko wyniki
+leżące między starym a nowym wynikiem; pełne przeliczenie (refresh_leaderboards)
+nadaje wszystkie miejsca od nowa – wyrównuje też miejsca rozsunięte przez
+usunięcie użytkownika. Żadne zapytanie nie grupuje surowych ćwiczeń
+wszystkich użytkowników. Gotowe czołówki leżą w cache pod wersją rankingów
+(training/versions.py), podbijaną po każdym przeliczeniu.
+"""
+
+from datetime import timedelta
+from functools import reduce
+from itertools import groupby
+from operator import or_
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.utils import timezone
+
+from . import routers, versions
+from .models import LeaderboardEntry, PersonalRecord, SessionExercise
+from .rollups import VOLUME
+
+
+Metric = LeaderboardEntry.Metric
+
+TOP_N = 5
+VOLUME_DAYS = 28
+
+VERSION_KEY = "training:leaderboards-version"
+BOARDS_KEY = "training:leaderboards:{version}"
+
+
+# --- Wersja i cache ---
+
+
+def version():
+    return versions.get(VERSION_KEY)
+
+
+async def aversion():
+    return await versions.aget(VERSION_KEY)
+
+
+def bump():
+    """
+    Unieważnia zapamiętane czołówki we wszystkich procesach.
+    """
+    versions.bump(VERSION_KEY)
+
+
+# --- Odczyt ---
+
+
+def _top_queryset(type_id, metric):
+    return (
+        LeaderboardEntry.objects.filter(
+            exercise_type_id=type_id, metric=metric, score__gt=0
+        )
+        .order_by("-score", "created_by_id")
+        .values_list("created_by__username", "score")[:TOP_N]
+    )
+
+
+def _boards_key(current):
+    return BOARDS_KEY.format(version=current)
+
+
+def boards(types):
+    """
+    {pk typu: {miara: [(nazwa użytkownika, wynik), ...]}} dla podanych typów
+    – po jednym krótkim zakresie indeksu na typ i miarę, a potem z cache.
+    """
+    key = _boards_key(version())
+    result = cache.get(key)
+    if result is None:
+        result = {
+            t.pk: {
+                metric: list(_top_queryset(t.pk, metric)) for metric in Metric.values
+            }
+            for t in types
+        }
+        cache.set(key, result, timeout=routers.cache_timeout(None))
+    return result
+
+
+async def aboards(types):
+    """
+    Asynchroniczna wersja boards().
+    """
+    key = _boards_key(await aversion())
+    result = await cache.aget(key)
+    if result is None:
+        result = {}
+        for t in types:
+            result[t.pk] = {
+                metric: [row async for row in _top_queryset(t.pk, metric)]
+                for metric in Metric.values
+            }
+        await cache.aset(key, result, timeout=routers.cache_timeout(None))
+    return result
+
+
+def _ranks_queryset(user_id):
+    return LeaderboardEntry.objects.filter(
+        created_by_id=user_id, score__gt=0
+    ).values_list("exercise_type_id", "metric", "rank", "score")
+
+
+def my_ranks(user_id):
+    """
+    {(pk typu, miara): (miejsce, wynik)} użytkownika – jedno zapytanie po
+    zapisanych miejscach. Miejsce to 1 + liczba wyższych wyników (ex aequo
+    dzielą miejsce).
+    """
+    return {
+        (type_id, metric): (rank, score)
+        for type_id, metric, rank, score in _ranks_queryset(user_id)
+    }
+
+
+async def amy_ranks(user_id):
+    """
+    Asynchroniczna wersja my_ranks().
+    """
+    return {
+        (type_id, metric): (rank, score)
+        async for type_id, metric, rank, score in _ranks_queryset(user_id)
+    }
+
+
+# --- Przeliczanie ---
+
+
+def volume_since(now=None):
+    return (now or timezone.now()) - timedelta(days=VOLUME_DAYS)
+
+
+def _scores(exercises, records, since):
+    # {(użytkownik, typ, miara): wynik} z przefiltrowanych ćwiczeń i rekordów.
+    scores = {
+        (user_id, type_id, Metric.BEST_E1RM): e1rm
+        for user_id, type_id, e1rm in records.values_list(
+            "created_by_id", "exercise_type_id", "best_e1rm"
+        )
+    }
+    volumes = (
+        exercises.filter(session_start__gte=since)
+        .order_by()
+        .values_list("created_by_id", "exercise_type_id")
+        .annotate(volume=Sum(VOLUME, output_field=FloatField()))
+    )
+    for user_id, type_id, volume in volumes:
+        if volume:
+            scores[(user_id, type_id, Metric.VOLUME_28D)] = volume
+    return scores
+
+
+def _entries(scores, now, ranks=None):
+    ranks = ranks or {}
+    return [
+        LeaderboardEntry(
+            created_by_id=user_id,
+            exercise_type_id=type_id,
+            metric=metric,
+            score=score,
+            rank=ranks.get((user_id, type_id, metric), 0),
+            computed_at=now,
+        )
+        for (user_id, type_id, metric), score in scores.items()
+    ]
+
+
+def assign_ranks(entries):
+    """
+    Nadaje miejsca wynikom w pamięci: w każdym (typ, miara) 1 + liczba
+    wyższych wyników.
+    """
+
+    def board(entry):
+        return entry.exercise_type_id, entry.metric
+
+    ordered = sorted(entries, key=lambda e: (board(e), -e.score))
+    for _, group in groupby(ordered, key=board):
+        previous = None
+        for position, entry in enumerate(group, start=1):
+            if previous is None or entry.score != previous.score:
+                rank = position
+            entry.rank = rank
+            previous = entry
+    return entries
+
+
+def _shift_ranks(user_id, changes):
+    # Wynik użytkownika przeszedł z old na new: wyniki innych z przedziału
+    # [min, max) zyskują (wzrost) albo tracą (spadek) jeden wyższy wynik.
+    # Jedno UPDATE niezależnie od liczby zmienionych wyników; zera (poza
+    # rankingiem) nie mają miejsca.
+    ranges = {
+        key: Q(
+            exercise_type_id=key[0],
+            metric=key[1],
+            score__gte=min(old, new),
+            score__lt=max(old, new),
+        )
+        for key, (old, new) in changes.items()
+    }
+    step = Case(
+        *(
+            When(ranges[key], then=Value(1 if new > old else -1))
+            for key, (old, new) in changes.items()
+        ),
+        default=Value(0),
+    )
+    LeaderboardEntry.objects.filter(reduce(or_, ranges.values()), score__gt=0).exclude(
+        created_by_id=user_id
+    ).update(rank=F("rank") + step)
+
+
+def _higher(type_id, metric, score):
+    if score > 0:
+        return Q(exercise_type_id=type_id, metric=metric, score__gt=score)
+    # Zero jest poza rankingiem – pusty zakres zamiast liczenia całej tablicy.
+    return Q(exercise_type_id=type_id, metric=metric, score__gt=0, score__lt=0)
+
+
+def _ranks_of(user_id, scores):
+    # {(typ, miara): miejsce} dla nowych wyników użytkownika – jedno zapytanie:
+    # w każdej grupie (typ, miara) liczone są tylko wyniki wyższe od jego.
+    higher = (
+        LeaderboardEntry.objects.filter(
+            reduce(or_, (_higher(*key, score) for key, score in scores.items()))
+        )
+        .exclude(created_by_id=user_id)
+        .order_by()
+        .values_list("exercise_type_id", "metric")
+        .annotate(count=Count("*"))
+    )
+    counts = {(type_id, metric): count for type_id, metric, count in higher}
+    return {
+        key: counts.get(key, 0) + 1 if score > 0 else 0
+        for key, score in scores.items()
+    }
+
+
+def refresh(user_id, exercise_type_ids):
+    """
+    Przelicza wyniki jednego użytkownika dla podanych typów ćwiczeń (po
+    zmianie jego ćwiczeń). Rekordy osobiste muszą być już aktualne.
+    """
+    type_ids = set(exercise_type_ids)
+    if not type_ids:
+        return
+    now = timezone.now()
+    scores = _scores(
+        SessionExercise.objects.filter(
+            created_by_id=user_id, exercise_type_id__in=type_ids
+        ),
+        PersonalRecord.objects.filter(
+            created_by_id=user_id, exercise_type_id__in=type_ids
+        ),
+        volume_since(now),
+    )
+    # Wyniki, których już nie ma (np. nic w oknie objętości), zostają
+    # wyzerowane zamiast usunięte – zawsze jeden upsert, niezależnie od danych.
+    # Zera nie trafiają do rankingu, a usuwa je pełne przeliczenie.
+    for type_id in type_ids:
+        for metric in Metric.values:
+            scores.setdefault((user_id, type_id, metric), 0)
+    with transaction.atomic():
+        current = {
+            (type_id, metric): (score, rank)
+            for type_id, metric, score, rank in LeaderboardEntry.objects.filter(
+                created_by_id=user_id, exercise_type_id__in=type_ids
+            )
+            .select_for_update()
+            .values_list("exercise_type_id", "metric", "score", "rank")
+        }
+        # Niezmieniony wynik zachowuje miejsce; zmienione przesuwają wyniki
+        # między starym a nowym wynikiem i dostają miejsce z liczby wyższych.
+        ranks, changes = {}, {}
+        for (_, type_id, metric), score in scores.items():
+            old, rank = current.get((type_id, metric), (None, 0))
+            if old == score:
+                ranks[(user_id, type_id, metric)] = rank
+            else:
+                changes[(type_id, metric)] = (old or 0, score)
+        if changes:
+            _shift_ranks(user_id, changes)
+            new_scores = {key: new for key, (_, new) in changes.items()}
+            ranks.update(
+                ((user_id, *key), rank)
+                for key, rank in _ranks_of(user_id, new_scores).items()
+            )
+        LeaderboardEntry.objects.bulk_create(
+            _entries(scores, now, ranks),
+            update_conflicts=True,
+            unique_fields=["exercise_type", "metric", "created_by"],
+            update_fields=["score", "rank", "computed_at"],
+        )
+        transaction.on_commit(bump)
+
+
+def rebuild_all():
+    """
+    Przelicza całą tabelę rankingów od zera. Zwraca liczbę wyników.
+    """
+    now = timezone.now()
+    scores = _scores(
+        SessionExercise.objects.all(), PersonalRecord.objects.all(), volume_since(now)
+    )
+    entries = assign_ranks(
+        _entries({key: score for key, score in scores.items() if score}, now)
+    )
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+        transaction.on_commit(bump)
+    return len(entries)
@@ -0,0 +1,240 @@
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from training import sqlite
+from training.models import ExerciseType, TrainingSession
+
+
+READ_ROUTES = ["stats", "session_exercise_list"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark równoległego dostępu do SQLite: N wątków zapisujących "
+        "ćwiczenia (session_exercise_create) i M wątków czytających (stats, "
+        "lista ćwiczeń) na kopii bazy – bez strojenia (BEFIT_SQLITE_TUNING=0) "
+        "i ze strojeniem."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            required=True,
+            help="Użytkownik, jako który wysyłane są żądania (z co najmniej "
+            "jedną sesją).",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=["both", "default", "tuned"],
+            default="both",
+            help="'both' uruchamia oba warianty w osobnych procesach.",
+        )
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument(
+            "--seconds", type=float, default=5, help="Czas pomiaru jednego wariantu."
+        )
+        parser.add_argument("--json", action="store_true", help="Wynik jako JSON.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Benchmark dotyczy wyłącznie bazy SQLite.")
+        if options["mode"] == "both":
+            results = {
+                mode: self.run_subprocess(mode, options)
+                for mode in ("default", "tuned")
+            }
+        else:
+            if settings.SQLITE_TUNING != (options["mode"] == "tuned"):
+                raise CommandError(
+                    "Wariant wybiera zmienna środowiskowa BEFIT_SQLITE_TUNING=0/1."
+                )
+            results = {options["mode"]: self.run(options)}
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results))
+        else:
+            self.report(results)
+
+    def run_subprocess(self, mode, options):
+        # Każdy wariant pracuje na świeżej kopii bazy – zapisy z pomiaru nie
+        # trafiają do właściwej bazy, a oba warianty startują z tych samych danych.
+        with tempfile.TemporaryDirectory() as directory:
+            copy = os.path.join(directory, "benchmark.sqlite3")
+            self.copy_database(
+                copy, journal_mode="WAL" if mode == "tuned" else "DELETE"
+            )
+            command = [
+                sys.executable,
+                sys.argv[0],
+                "benchmark_sqlite_concurrency",
+                "--mode", mode,
+                "--user", options["user"],
+                "--writers", str(options["writers"]),
+                "--readers", str(options["readers"]),
+                "--seconds", str(options["seconds"]),
+                "--json",
+            ]
+            env = {
+                **os.environ,
+                "BEFIT_SQLITE_TUNING": "1" if mode == "tuned" else "0",
+                "BEFIT_DB_NAME": copy,
+            }
+            result = subprocess.run(command, env=env, capture_output=True, text=True)
+        if result.returncode:
+            raise CommandError(
+                f"Wariant {mode} zakończył się błędem:\n{result.stderr}"
+            )
+        return json.loads(result.stdout)[mode]
+
+    def copy_database(self, path, journal_mode):
+        source = sqlite3.connect(settings.DATABASES["default"]["NAME"])
+        target = sqlite3.connect(path)
+        try:
+            source.backup(target)
+            # Tryb WAL zapisuje się w pliku bazy, więc wariant bez strojenia
+            # musi go jawnie wyłączyć.
+            target.execute(f"PRAGMA journal_mode = {journal_mode}")
+        finally:
+            target.close()
+            source.close()
+
+    # --- Pomiar ---
+
+    def run(self, options):
+        user = get_user_model().objects.filter(username=options["user"]).first()
+        if user is None:
+            raise CommandError(f"Nieznany użytkownik {options['user']!r}.")
+        session = (
+            TrainingSession.objects.filter(created_by=user).order_by("-start").first()
+        )
+        etype = ExerciseType.objects.order_by("pk").first()
+        if session is None or etype is None:
+            raise CommandError(
+                "Użytkownik musi mieć sesję, a katalog – typ ćwiczenia."
+            )
+
+        login = Client()
+        login.force_login(user)
+        cookie_name = settings.SESSION_COOKIE_NAME
+        session_key = login.cookies[cookie_name].value
+        exercise_data = {
+            "training_session": session.pk,
+            "exercise_type": etype.pk,
+            "weight": 50,
+            "sets": 3,
+            "reps": 10,
+        }
+        read_urls = [reverse(name) for name in READ_ROUTES]
+        create_url = reverse("session_exercise_create")
+
+        stop = threading.Event()
+        results = {"write": [], "read": []}
+        errors = {"write": 0, "read": 0}
+        lock = threading.Lock()
+
+        def worker(kind, index):
+            client = Client(raise_request_exception=False, HTTP_HOST="localhost")
+            client.cookies[cookie_name] = session_key
+            latencies = []
+            failed = 0
+            i = index
+            try:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    if kind == "write":
+                        response = client.post(create_url, exercise_data)
+                        ok = response.status_code == 302
+                    else:
+                        response = client.get(read_urls[i % len(read_urls)])
+                        ok = response.status_code == 200
+                        i += 1
+                    latencies.append(time.perf_counter() - started)
+                    failed += not ok
+            finally:
+                connections.close_all()
+                with lock:
+                    results[kind].extend(latencies)
+                    errors[kind] += failed
+
+        threads = [
+            threading.Thread(target=worker, args=("write", n))
+            for n in range(options["writers"])
+        ] + [
+            threading.Thread(target=worker, args=("read", n))
+            for n in range(options["readers"])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options["seconds"])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {
+            "pragmas": sqlite.current(
+                connection, sqlite.pragmas() or ["journal_mode"]
+            ),
+            **{
+                kind: self.summary(results[kind], errors[kind], elapsed)
+                for kind in ("write", "read")
+            },
+        }
+
+    def summary(self, latencies, errors, elapsed):
+        if len(latencies) < 2:
+            return {"requests": len(latencies), "errors": errors, "rps": 0}
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentiles[49] * 1000, 2),
+            "p99_ms": round(percentiles[98] * 1000, 2),
+        }
+
+    # --- Raport ---
+
+    def report(self, results):
+        self.stdout.write(
+            f"{'wariant':<10}{'rodzaj':<8}{'żądania':>10}{'błędy':>8}"
+            f"{'req/s':>10}{'p50':>12}{'p99':>12}"
+        )
+        for mode, result in results.items():
+            for kind in ("write", "read"):
+                r = result[kind]
+                self.stdout.write(
+                    f"{mode:<10}{kind:<8}{r['requests']:>10}{r['errors']:>8}"
+                    f"{r['rps']:>10,.1f}"
+                    f"{r.get('p50_ms', 0):>10.2f}ms{r.get('p99_ms', 0):>10.2f}ms"
+                )
+        if set(results) == {"default", "tuned"}:
+            # Wątki dzielą GIL, więc szybsze zapisy zabierają czas odczytom –
+            # miarodajna jest też przepustowość łączna.
+            for kind in ("write", "read", "total"):
+                before, after = (
+                    self.rps(results[mode], kind) for mode in ("default", "tuned")
+                )
+                if before:
+                    self.stdout.write(f"{kind}: tuned/default = {after / before:.2f}×")
+
+    def rps(self, result, kind):
+        if kind == "total":
+            return result["write"]["rps"] + result["read"]["rps"]
+        return result[kind]["rps"]
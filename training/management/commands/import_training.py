@@ -0,0 +1,356 @@
+import bisect
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from training import (
+    catalogue,
+    leaderboards,
+    overlaps,
+    records,
+    rollups,
+    stamps,
+    summaries,
+)
+from training.models import ExerciseType, SessionExercise, TrainingSession
+
+
+# Sesja, którą utworzyłby wcześniejszy kawałek próbnego importu (--dry-run).
+PLANNED = -1
+
+
+class Command(BaseCommand):
+    help = (
+        "Importuje historyczne dane treningowe z pliku CSV lub NDJSON "
+        "(kolumny jak w eksporcie: session_start, session_end, exercise, "
+        "weight, sets, reps oraz opcjonalnie username). Sesje zaimportowane "
+        "wcześniej są pomijane, więc import można bezpiecznie powtórzyć; sesje "
+        "nakładające się na istniejące są odrzucane. Każdy kawałek jest "
+        "zapisywany w jednej transakcji razem z danymi pochodnymi (agregaty, "
+        "rekordy, rankingi), więc przerwany import zostawia spójną bazę."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Ścieżka do pliku lub '-' dla stdin.")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "ndjson"],
+            help="Format pliku (domyślnie na podstawie rozszerzenia).",
+        )
+        parser.add_argument(
+            "--user",
+            help="Użytkownik dla wierszy bez kolumny username.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Liczba wierszy zapisywanych w jednej transakcji.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Tylko walidacja – nic nie jest zapisywane.",
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options["dry_run"]
+        self.default_username = options["user"]
+        self.users = {}
+        self.types = dict(ExerciseType.objects.values_list("name", "id"))
+        # Sesje o większym id utworzył ten import – do nich dopisujemy
+        # ćwiczenia z kolejnych kawałków, starsze to dane już zaimportowane.
+        self.last_existing_pk = (
+            TrainingSession.all_objects.aggregate(last=Max("pk"))["last"] or 0
+        )
+        # Próbny import: sesje, które utworzyłyby wcześniejsze kawałki
+        # ({użytkownik: [(początek, koniec), ...]} posortowane po początku).
+        self.planned = {}
+        self.imported = self.invalid = self.duplicates = 0
+
+        fmt = options["format"] or (
+            "ndjson" if options["path"].endswith((".ndjson", ".jsonl")) else "csv"
+        )
+        started = time.perf_counter()
+        with self.open(options["path"]) as f:
+            rows = self.read_csv(f) if fmt == "csv" else self.read_ndjson(f)
+            while chunk := list(islice(rows, options["chunk_size"])):
+                self.import_chunk(chunk)
+                if options["verbosity"] > 1:
+                    self.report(started)
+        self.report(started)
+
+    def open(self, path):
+        if path == "-":
+            return open(sys.stdin.fileno(), encoding="utf-8", closefd=False)
+        try:
+            return open(path, encoding="utf-8", newline="")
+        except OSError as e:
+            raise CommandError(f"Nie można otworzyć pliku: {e}")
+
+    def read_csv(self, f):
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            yield line, row
+
+    def read_ndjson(self, f):
+        for line, raw in enumerate(f, start=1):
+            if not raw.strip():
+                continue
+            try:
+                yield line, json.loads(raw)
+            except json.JSONDecodeError as e:
+                yield line, {"_error": str(e)}
+
+    def report(self, started):
+        elapsed = time.perf_counter() - started
+        rate = self.imported / elapsed if elapsed else 0
+        verb = "Poprawnych" if self.dry_run else "Zaimportowano"
+        self.stdout.write(
+            f"{verb}: {self.imported} wierszy, błędnych: {self.invalid}, "
+            f"już zaimportowanych: {self.duplicates}, "
+            f"{elapsed:.1f} s ({rate:,.0f} wierszy/s)."
+        )
+
+    # --- Walidacja ---
+
+    def parse(self, row):
+        if "_error" in row:
+            raise ValidationError(row["_error"])
+        username = row.get("username") or self.default_username
+        if not username:
+            raise ValidationError("Brak użytkownika (kolumna username lub --user).")
+        start = self.parse_datetime(row.get("session_start"), "session_start")
+        end = self.parse_datetime(row.get("session_end"), "session_end")
+        # Te same reguły co przy zapisie sesji z formularza.
+        TrainingSession(start=start, end=end).clean()
+
+        name = (row.get("exercise") or "").strip()
+        ExerciseType._meta.get_field("name").clean(name, None)
+
+        values = {}
+        for field_name in ("weight", "sets", "reps"):
+            field = SessionExercise._meta.get_field(field_name)
+            values[field_name] = field.clean(row.get(field_name), None)
+        return username, start, end, name, values
+
+    def parse_datetime(self, value, name):
+        parsed = parse_datetime(str(value or ""))
+        if parsed is None:
+            raise ValidationError(f"{name}: nieprawidłowa data i czas {value!r}.")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def user_id(self, username):
+        if username not in self.users:
+            user_id = (
+                get_user_model()
+                .objects.filter(username=username)
+                .values_list("pk", flat=True)
+                .first()
+            )
+            if user_id is None:
+                raise ValidationError(f"Nieznany użytkownik {username!r}.")
+            self.users[username] = user_id
+        return self.users[username]
+
+    # --- Zapis ---
+
+    def import_chunk(self, chunk):
+        parsed = []
+        for line, row in chunk:
+            try:
+                username, start, end, name, values = self.parse(row)
+                user_id = self.user_id(username)
+                parsed.append((line, user_id, start, end, name, values))
+            except ValidationError as e:
+                self.reject(line, e.messages)
+
+        with transaction.atomic():
+            sessions, duplicates, overlapping = self.match_sessions(
+                {(user_id, start, end) for _, user_id, start, end, _, _ in parsed}
+            )
+            rows = []
+            for line, user_id, start, end, name, values in parsed:
+                key = user_id, start, end
+                if key in duplicates:
+                    self.duplicates += 1
+                elif key in overlapping:
+                    self.reject(line, ["Sesja nakłada się na inną sesję."])
+                else:
+                    rows.append((user_id, start, end, name, values))
+            if self.dry_run:
+                self.plan_sessions(key for key, pk in sessions.items() if pk is None)
+                self.imported += len(rows)
+                return
+
+            self.create_missing_types({name for _, _, _, name, _ in rows})
+            self.create_missing_sessions(sessions)
+            exercises = []
+            for user_id, start, end, name, values in rows:
+                type_id = self.types[name]
+                exercises.append(
+                    SessionExercise(
+                        training_session_id=sessions[user_id, start, end],
+                        session_start=start,
+                        exercise_type_id=type_id,
+                        created_by_id=user_id,
+                        **values,
+                    )
+                )
+            SessionExercise.objects.bulk_create(exercises, batch_size=500)
+            summaries.add_exercises(exercises)
+            records.apply_new(exercises)
+            self.refresh_derived(exercises)
+        self.imported += len(exercises)
+
+    def refresh_derived(self, exercises):
+        # Agregaty dzienne kawałka jednym zapytaniem (zakres dni każdego
+        # użytkownika), rankingi i znaczniki – stała liczba zapytań na
+        # użytkownika w kawałku.
+        ranges = {}
+        for exercise in exercises:
+            day = rollups.period_start(exercise.session_start)
+            type_ids, first, last = ranges.get(
+                exercise.created_by_id, (set(), day, day)
+            )
+            type_ids.add(exercise.exercise_type_id)
+            ranges[exercise.created_by_id] = type_ids, min(first, day), max(last, day)
+        rollups.refresh_ranges(
+            {
+                user_id: (
+                    type_ids,
+                    rollups.period_bounds(first)[0],
+                    rollups.period_bounds(last)[1],
+                )
+                for user_id, (type_ids, first, last) in ranges.items()
+            }
+        )
+        for user_id, (type_ids, _, _) in ranges.items():
+            leaderboards.refresh(user_id, type_ids)
+            stamps.bump(user_id)
+
+    def plan_sessions(self, keys):
+        for user_id, start, end in keys:
+            bisect.insort(
+                self.planned.setdefault(user_id, []), (start, end), key=lambda r: r[0]
+            )
+
+    def reject(self, line, messages):
+        self.invalid += 1
+        if self.invalid <= 20:
+            self.stderr.write(f"Wiersz {line}: {'; '.join(messages)}")
+
+    def match_sessions(self, keys):
+        """
+        Dopasowuje sesje (użytkownik, początek, koniec) z kawałka do sesji
+        w bazie – jednym zapytaniem o sesje użytkowników z zakresu czasu
+        kawałka (indeks (created_by, start, end)), więc pamięć zależy tylko
+        od rozmiaru kawałka. Zwraca:
+
+        - sesje: klucz -> id sesji utworzonej wcześniej przez ten import,
+          PLANNED (próbny import: sesja z wcześniejszego kawałka) albo None
+          (sesja do utworzenia),
+        - powtórzone: sesje, które były w bazie przed importem – ich wiersze
+          zostały już zaimportowane,
+        - nakładające się: sesje nakładające się na inną sesję użytkownika
+          (ta sama reguła co w formularzu sesji).
+        """
+        intervals = {}
+        for user_id, start, end in keys:
+            intervals.setdefault(user_id, []).append((start, end))
+        condition = Q()
+        for user_id, pairs in intervals.items():
+            condition |= Q(
+                created_by_id=user_id,
+                start__lte=max(end for _, end in pairs),
+                end__gte=min(start for start, _ in pairs),
+            )
+        existing = {}
+        if intervals:
+            rows = (
+                TrainingSession.objects.filter(condition)
+                .order_by()
+                .values_list("created_by_id", "start", "end", "pk")
+            )
+            for user_id, start, end, pk in rows:
+                existing.setdefault(user_id, []).append((start, end, pk))
+        for user_id, pairs in intervals.items():
+            existing.setdefault(user_id, []).extend(
+                self.planned_between(
+                    user_id,
+                    min(start for start, _ in pairs),
+                    max(end for _, end in pairs),
+                )
+            )
+
+        sessions, duplicates, overlapping = {}, set(), set()
+        for user_id, pairs in intervals.items():
+            taken = sorted(existing.get(user_id, []), key=lambda row: row[0])
+            same = {(start, end): pk for start, end, pk in taken}
+            for start, end in sorted(pairs):
+                key = user_id, start, end
+                pk = same.get((start, end))
+                if pk is not None:
+                    if pk == PLANNED or pk > self.last_existing_pk:
+                        sessions[key] = pk
+                    else:
+                        duplicates.add(key)
+                elif self.conflicts(taken, start, end):
+                    overlapping.add(key)
+                else:
+                    sessions[key] = None
+                    bisect.insort(taken, (start, end, None), key=lambda row: row[0])
+        return sessions, duplicates, overlapping
+
+    def planned_between(self, user_id, since, until):
+        # Sesje są rozłączne, więc po sortowaniu rosną i początki, i końce.
+        planned = self.planned.get(user_id, [])
+        first = bisect.bisect_left(planned, since, key=lambda r: r[1])
+        last = bisect.bisect_right(planned, until, key=lambda r: r[0])
+        return [(start, end, PLANNED) for start, end in planned[first:last]]
+
+    def conflicts(self, taken, start, end):
+        # Sesje w bazie są rozłączne – jak w overlaps.find() wystarczy
+        # sprawdzić ostatnią sesję zaczynającą się nie później i następną.
+        index = bisect.bisect_right(taken, start, key=lambda row: row[0])
+        neighbours = taken[max(index - 1, 0) : index + 1]
+        return any(
+            overlaps.intersects(start, end, other_start, other_end)
+            for other_start, other_end, _ in neighbours
+        )
+
+    def create_missing_types(self, names):
+        missing = sorted(names - self.types.keys())
+        if missing:
+            created = ExerciseType.objects.bulk_create(
+                ExerciseType(name=name) for name in missing
+            )
+            self.types.update((t.name, t.pk) for t in created)
+            transaction.on_commit(catalogue.bump)
+
+    def create_missing_sessions(self, sessions):
+        missing = [key for key, pk in sessions.items() if pk is None]
+        created = TrainingSession.objects.bulk_create(
+            (
+                TrainingSession(
+                    created_by_id=user_id,
+                    start=start,
+                    end=end,
+                    duration_seconds=TrainingSession.duration_between(start, end),
+                )
+                for user_id, start, end in missing
+            ),
+            batch_size=500,
+        )
+        sessions.update(zip(missing, (s.pk for s in created)))
@@ -0,0 +1,277 @@
+import itertools
+import json
+import random
+import statistics
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from training.management.commands.seed_befit import PASSWORD
+from training.models import ExerciseType, TrainingSession
+
+
+# Trasa -> waga w ruchu; proporcje zbliżone do ruchu na siłowni: dużo
+# przeglądania, co kilkanaście żądań zapis ćwiczenia lub całego treningu.
+MIX = {
+    "login": 2,
+    "home": 4,
+    "exercise_type_list": 8,
+    "training_session_list": 14,
+    "training_session_detail": 12,
+    "session_autocomplete": 4,
+    "session_exercise_list": 10,
+    "session_exercise_create": 6,
+    "training_session_log": 3,
+    "stats": 10,
+    "personal_records_json": 4,
+    "progress_trends_json": 2,
+    "api_training_sessions": 5,
+    "api_session_exercises": 5,
+}
+
+# Odpowiedź uznawana za poprawną (formularz z błędami to też porażka zapisu).
+EXPECTED_STATUS = {
+    "login": 302,
+    "session_exercise_create": 302,
+    "training_session_log": 302,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Test obciążeniowy ważoną mieszanką tras (logowanie, listy, szczegóły, "
+        "statystyki, API, zapis ćwiczeń i treningów) z wieloma równoległymi "
+        "klientami w procesie – każdy loguje się jako inny użytkownik z "
+        "seed_befit. Raportuje przepustowość, percentyle opóźnień i odsetek "
+        "błędów. Zapisy trafiają do bazy – uruchamiać na danych testowych."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prefix",
+            default="befit",
+            help="Przedrostek użytkowników utworzonych przez seed_befit.",
+        )
+        parser.add_argument(
+            "--clients", type=int, default=16, help="Liczba równoległych klientów."
+        )
+        parser.add_argument(
+            "--seconds", type=float, default=10, help="Czas trwania testu."
+        )
+        parser.add_argument(
+            "--mix",
+            help="Własne wagi tras, np. 'stats=5,training_session_list=10' "
+            "(pozostałe trasy pomijane).",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--json", action="store_true", help="Wynik jako JSON.")
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options["mix"]) if options["mix"] else MIX
+        users = list(
+            get_user_model()
+            .objects.filter(username__startswith=options["prefix"])
+            .order_by("pk")[: options["clients"]]
+        )
+        if not users:
+            raise CommandError(
+                f"Brak użytkowników z przedrostkiem {options['prefix']!r} – "
+                "najpierw uruchom seed_befit."
+            )
+        self.type_ids = list(ExerciseType.objects.values_list("pk", flat=True))
+        # Zapisywane treningi dostają kolejne, rozłączne godziny po ostatniej
+        # sesji w bazie, żeby nie odrzucała ich kontrola nakładania się sesji
+        # (także przy kolejnym uruchomieniu testu).
+        self.slots = itertools.count()
+        last_end = TrainingSession.objects.aggregate(last=Max("end"))["last"]
+        self.base = max(last_end or timezone.now(), timezone.now()).replace(
+            second=0, microsecond=0
+        ) + timedelta(hours=1)
+
+        latencies = {route: [] for route in mix}
+        errors = {route: 0 for route in mix}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        # Klienci logują się przed pomiarem; samo logowanie (z haszowaniem
+        # hasła) mierzy trasa "login".
+        clients = []
+        for index in range(options["clients"]):
+            user = users[index % len(users)]
+            client = Client(raise_request_exception=False, HTTP_HOST="localhost")
+            client.force_login(user)
+            clients.append((client, user, self.latest_session(user)))
+
+        def worker(index):
+            rng = random.Random(options["seed"] * 1000 + index)
+            client, user, session_id = clients[index]
+            own_latencies = {route: [] for route in mix}
+            own_errors = dict.fromkeys(mix, 0)
+            try:
+                routes, weights = list(mix), list(mix.values())
+                while not stop.is_set():
+                    route = rng.choices(routes, weights)[0]
+                    started = time.perf_counter()
+                    try:
+                        status = self.request(client, route, user, session_id, rng)
+                    except Exception:
+                        status = 500
+                    own_latencies[route].append(time.perf_counter() - started)
+                    if status != EXPECTED_STATUS.get(route, 200):
+                        own_errors[route] += 1
+                    if route == "training_session_log" and status == 302:
+                        session_id = self.latest_session(user)
+            finally:
+                connections.close_all()
+                with lock:
+                    for route in mix:
+                        latencies[route].extend(own_latencies[route])
+                        errors[route] += own_errors[route]
+
+        threads = [
+            threading.Thread(target=worker, args=(n,))
+            for n in range(options["clients"])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options["seconds"])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        results = {
+            "clients": options["clients"],
+            "seconds": round(elapsed, 2),
+            "total": self.summary(
+                list(itertools.chain.from_iterable(latencies.values())),
+                sum(errors.values()),
+                elapsed,
+            ),
+            "routes": {
+                route: self.summary(latencies[route], errors[route], elapsed)
+                for route in mix
+            },
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(results))
+        else:
+            self.report(results)
+
+    def parse_mix(self, raw):
+        mix = {}
+        for part in raw.split(","):
+            route, _, weight = part.partition("=")
+            if route not in MIX:
+                raise CommandError(
+                    f"Nieznana trasa {route!r}; dostępne: {', '.join(MIX)}."
+                )
+            try:
+                mix[route] = float(weight)
+            except ValueError:
+                raise CommandError(f"Niepoprawna waga trasy {route!r}.")
+        return mix
+
+    # --- Żądania ---
+
+    def latest_session(self, user):
+        return (
+            TrainingSession.objects.filter(created_by=user)
+            .order_by("-start", "-id")
+            .values_list("pk", flat=True)
+            .first()
+        )
+
+    def request(self, client, route, user, session_id, rng):
+        if route == "login":
+            client.logout()
+            return client.post(
+                reverse("login"), {"username": user.username, "password": PASSWORD}
+            ).status_code
+        if route == "training_session_detail":
+            if session_id is None:
+                return 404
+            return client.get(reverse(route, args=[session_id])).status_code
+        if route == "session_autocomplete":
+            day = timezone.localdate() - timedelta(days=rng.randrange(90))
+            return client.get(reverse(route), {"q": f"{day:%Y-%m}"}).status_code
+        if route == "stats":
+            params = {"range": rng.choice(["7d", "28d", "90d", "1y"])}
+            return client.get(reverse(route), params).status_code
+        if route == "session_exercise_create":
+            return client.post(
+                reverse(route), {"training_session": session_id, **self.row(rng)}
+            ).status_code
+        if route == "training_session_log":
+            return client.post(reverse(route), self.log_data(rng)).status_code
+        return client.get(reverse(route)).status_code
+
+    def row(self, rng):
+        return {
+            "exercise_type": rng.choice(self.type_ids),
+            "weight": rng.randrange(20, 120, 5),
+            "sets": rng.randint(2, 5),
+            "reps": rng.randint(5, 12),
+        }
+
+    def log_data(self, rng):
+        start = self.base + timedelta(hours=2 * next(self.slots))
+        rows = rng.randint(3, 7)
+        data = {
+            "start": f"{timezone.localtime(start):%Y-%m-%dT%H:%M}",
+            "end": f"{timezone.localtime(start) + timedelta(hours=1):%Y-%m-%dT%H:%M}",
+            "exercises-TOTAL_FORMS": rows,
+            "exercises-INITIAL_FORMS": 0,
+            "exercises-MIN_NUM_FORMS": 1,
+            "exercises-MAX_NUM_FORMS": 50,
+        }
+        for i in range(rows):
+            for field, value in self.row(rng).items():
+                data[f"exercises-{i}-{field}"] = value
+        return data
+
+    # --- Raport ---
+
+    def summary(self, latencies, errors, elapsed):
+        result = {
+            "requests": len(latencies),
+            "errors": errors,
+            "error_rate": round(errors / len(latencies), 4) if latencies else 0,
+            "rps": round(len(latencies) / elapsed, 1),
+        }
+        if len(latencies) >= 2:
+            percentiles = statistics.quantiles(latencies, n=100)
+            result.update(
+                p50_ms=round(percentiles[49] * 1000, 2),
+                p95_ms=round(percentiles[94] * 1000, 2),
+                p99_ms=round(percentiles[98] * 1000, 2),
+            )
+        return result
+
+    def report(self, results):
+        self.stdout.write(
+            f"{results['clients']} klientów, {results['seconds']} s "
+            f"(baza: {settings.DATABASES['default']['NAME']})"
+        )
+        self.stdout.write(
+            f"{'trasa':<26}{'żądania':>9}{'błędy':>8}{'req/s':>9}"
+            f"{'p50':>11}{'p95':>11}{'p99':>11}"
+        )
+        rows = [*results["routes"].items(), ("RAZEM", results["total"])]
+        for route, r in rows:
+            self.stdout.write(
+                f"{route:<26}{r['requests']:>9}{r['errors']:>8}{r['rps']:>9,.1f}"
+                f"{r.get('p50_ms', 0):>9.2f}ms{r.get('p95_ms', 0):>9.2f}ms"
+                f"{r.get('p99_ms', 0):>9.2f}ms"
+            )
+        self.stdout.write(f"Odsetek błędów: {results['total']['error_rate']:.2%}")
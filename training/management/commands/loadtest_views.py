@@ -0,0 +1,246 @@
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from training.models import TrainingSession
+
+
+ROUTES = [
+    "exercise_type_list",
+    "training_session_list",
+    "training_session_detail",
+    "session_exercise_list",
+    "stats",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Test obciążeniowy widoków odczytu przez aplikację ASGI (w procesie, bez "
+        "sieci): żądania/s oraz opóźnienia p50/p99 w trybie sync i async "
+        "na tych samych danych. Jeśli którekolwiek żądanie zakończy się "
+        "błędem, polecenie kończy się błędem zamiast raportować wyniki."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            required=True,
+            help="Użytkownik, jako który wysyłane są żądania.",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=["both", "sync", "async"],
+            default="both",
+            help="Tryb widoków; 'both' uruchamia oba w osobnych procesach.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Liczba żądań na trasę."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=16,
+            help="Liczba równoległych klientów.",
+        )
+        parser.add_argument("--routes", nargs="+", choices=ROUTES, default=ROUTES)
+        parser.add_argument("--json", action="store_true", help="Wynik jako JSON.")
+
+    def handle(self, *args, **options):
+        if options["mode"] == "both":
+            results = {
+                mode: self.run_subprocess(mode, options) for mode in ("sync", "async")
+            }
+        else:
+            if settings.TRAINING_ASYNC_VIEWS != (options["mode"] == "async"):
+                raise CommandError(
+                    "Tryb widoków wybiera ustawienie TRAINING_ASYNC_VIEWS "
+                    "(zmienna środowiskowa BEFIT_ASYNC_VIEWS=0/1)."
+                )
+            results = {options["mode"]: asyncio.run(self.run(options))}
+            self.check_errors(results)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results))
+        else:
+            self.report(results)
+
+    def run_subprocess(self, mode, options):
+        command = [
+            sys.executable,
+            sys.argv[0],
+            "loadtest_views",
+            "--mode", mode,
+            "--user", options["user"],
+            "--requests", str(options["requests"]),
+            "--concurrency", str(options["concurrency"]),
+            "--routes", *options["routes"],
+            "--json",
+        ]
+        env = {**os.environ, "BEFIT_ASYNC_VIEWS": "1" if mode == "async" else "0"}
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+        if result.returncode:
+            raise CommandError(
+                f"Tryb {mode} zakończył się błędem:\n{result.stderr}"
+            )
+        return json.loads(result.stdout)[mode]
+
+    # --- Pomiar ---
+
+    async def run(self, options):
+        cookie, urls = await asyncio.to_thread(self.prepare, options)
+        app = get_asgi_application()
+        try:
+            results = {}
+            for name, url in urls.items():
+                # Rozgrzanie: katalog typów, szablony, połączenie z bazą.
+                await self.request(app, url, cookie)
+                results[name] = await self.measure(
+                    app, url, cookie, options["requests"], options["concurrency"]
+                )
+            return results
+        finally:
+            await asyncio.to_thread(self.client.logout)
+
+    def prepare(self, options):
+        user = get_user_model().objects.filter(username=options["user"]).first()
+        if user is None:
+            raise CommandError(f"Nieznany użytkownik {options['user']!r}.")
+        session = (
+            TrainingSession.objects.filter(created_by=user)
+            .order_by("-start", "-id")
+            .first()
+        )
+        if session is None and "training_session_detail" in options["routes"]:
+            raise CommandError("Użytkownik nie ma żadnej sesji treningowej.")
+
+        self.client = Client()
+        self.client.force_login(user)
+        name = settings.SESSION_COOKIE_NAME
+        cookie = f"{name}={self.client.cookies[name].value}"
+        urls = {}
+        for route in options["routes"]:
+            args = [session.pk] if route == "training_session_detail" else []
+            urls[route] = reverse(route, args=args)
+        return cookie, urls
+
+    async def measure(self, app, url, cookie, total, concurrency):
+        latencies = []
+        errors = Counter()
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                status = await self.request(app, url, cookie)
+                latencies.append(time.perf_counter() - started)
+                if status >= 400:
+                    errors[status] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        result = {
+            "requests": len(latencies),
+            "errors": sum(errors.values()),
+            "error_statuses": {str(status): n for status, n in errors.items()},
+            "rps": round(len(latencies) / elapsed, 1),
+        }
+        if len(latencies) >= 2:
+            percentiles = statistics.quantiles(latencies, n=100)
+            result.update(
+                p50_ms=round(percentiles[49] * 1000, 2),
+                p99_ms=round(percentiles[98] * 1000, 2),
+            )
+        return result
+
+    async def request(self, app, url, cookie):
+        path, _, query = url.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"localhost"), (b"cookie", cookie.encode())],
+            "client": ("127.0.0.1", 0),
+            "server": ("localhost", 80),
+        }
+        sent = False
+        status = None
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                # Klient się nie rozłącza – handler anuluje to oczekiwanie sam.
+                await asyncio.Future()
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await app(scope, receive, send)
+        return status
+
+    # --- Raport ---
+
+    def check_errors(self, results):
+        # Przepustowość liczona z odpowiedzi z błędem (np. same 500) byłaby
+        # myląca – taki pomiar nie daje wyniku.
+        failed = []
+        for mode, routes in results.items():
+            for route, r in routes.items():
+                if r["errors"]:
+                    statuses = ", ".join(
+                        f"{status}×{n}" for status, n in r["error_statuses"].items()
+                    )
+                    failed.append(
+                        f"{route} ({mode}): {r['errors']}/{r['requests']} "
+                        f"(statusy: {statuses})"
+                    )
+        if failed:
+            raise CommandError(
+                "Żądania zakończone błędem – wyników nie raportuję:\n"
+                + "\n".join(failed)
+            )
+
+    def report(self, results):
+        modes = list(results)
+        routes = list(results[modes[0]])
+        header = f"{'trasa':<26}" + "".join(
+            f"{mode + ' req/s':>14}{mode + ' p50':>12}{mode + ' p99':>12}"
+            for mode in modes
+        )
+        self.stdout.write(header)
+        for route in routes:
+            line = f"{route:<26}"
+            for mode in modes:
+                r = results[mode][route]
+                line += f"{r['rps']:>14,.1f}"
+                line += f"{r.get('p50_ms', 0):>10.2f}ms{r.get('p99_ms', 0):>10.2f}ms"
+            self.stdout.write(line)
+        if modes == ["sync", "async"]:
+            for route in routes:
+                ratio = results["async"][route]["rps"] / results["sync"][route]["rps"]
+                self.stdout.write(f"{route}: async/sync = {ratio:.2f}×")
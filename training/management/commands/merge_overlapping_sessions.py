@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from training import overlaps
+from training.models import TrainingSession
+
+
+class Command(BaseCommand):
+    help = (
+        "Wyszukuje nakładające się sesje treningowe i scala każdą grupę w jej "
+        "najwcześniejszą sesję (ćwiczenia trafiają do niej, pozostałe sesje są "
+        "usuwane). Historia każdego użytkownika przetwarzana jest jednym "
+        "przejściem po sesjach posortowanych po początku."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", help="Tylko sesje tego użytkownika (domyślnie wszystkich)."
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Tylko wypisz nakładające się sesje, bez scalania.",
+        )
+
+    def handle(self, *args, **options):
+        if options["user"]:
+            user_ids = list(
+                get_user_model()
+                .objects.filter(username=options["user"])
+                .values_list("pk", flat=True)
+            )
+            if not user_ids:
+                raise CommandError(f"Nieznany użytkownik {options['user']!r}.")
+        else:
+            user_ids = (
+                TrainingSession.objects.order_by("created_by_id")
+                .values_list("created_by_id", flat=True)
+                .distinct()
+            )
+
+        groups = sessions = 0
+        for user_id in list(user_ids):
+            if options["dry_run"]:
+                found = list(overlaps.clusters(user_id))
+            else:
+                found = overlaps.merge(user_id)
+            for group in found:
+                if options["dry_run"] or options["verbosity"] > 1:
+                    self.stdout.write(self.describe(user_id, group))
+            groups += len(found)
+            sessions += sum(len(group) for group in found)
+
+        verb = "Znaleziono" if options["dry_run"] else "Scalono"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} grupy nakładających się sesji: {groups} "
+                f"(sesje w grupach: {sessions})."
+            )
+        )
+
+    def describe(self, user_id, group):
+        spans = ", ".join(
+            f"{pk} ({timezone.localtime(start):%Y-%m-%d %H:%M}"
+            f"–{timezone.localtime(end):%H:%M})"
+            for pk, start, end, *_ in group
+        )
+        return f"Użytkownik {user_id}: {spans}"
@@ -0,0 +1,61 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from training import deletion
+
+
+class Command(BaseCommand):
+    help = (
+        "Fizycznie usuwa miękko usunięte sesje i ćwiczenia – partiami, każda "
+        "w osobnej krótkiej transakcji, bez kaskady i sygnałów Django. "
+        "Uruchamiane okresowo (np. z crona)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Liczba wierszy usuwanych w jednej transakcji.",
+        )
+        parser.add_argument(
+            "--older-than",
+            type=float,
+            default=60,
+            help="Usuwa tylko wiersze usunięte co najmniej tyle minut temu "
+            "(zadania w tle zdążą przeliczyć rekordy i rankingi).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Przerwa w sekundach między partiami (mniej blokad dla "
+            "równoległych zapisów).",
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(minutes=options["older_than"])
+        started = time.perf_counter()
+        # Najpierw ćwiczenia – sesja znika dopiero, gdy nie ma już ćwiczeń.
+        totals = {}
+        for label, purge in (
+            ("ćwiczeń", deletion.purge_exercises),
+            ("sesji", deletion.purge_sessions),
+        ):
+            totals[label] = 0
+            while purged := purge(before, options["batch_size"]):
+                totals[label] += purged
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"Usunięto partię {purged} {label}.")
+                if options["pause"]:
+                    time.sleep(options["pause"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Usunięto {totals['ćwiczeń']} ćwiczeń i {totals['sesji']} sesji "
+                f"w {time.perf_counter() - started:.2f} s."
+            )
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from training import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Odbudowuje od zera dzienne agregaty ćwiczeń (DailyExerciseStats) "
+        "i sprawdza ich zgodność z surowymi danymi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Liczba kubełków zapisywanych jednym bulk_create.",
+        )
+        parser.add_argument(
+            "--check-only",
+            action="store_true",
+            help="Tylko porównaj agregaty z surowymi danymi, bez odbudowy.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["check_only"]:
+            created = rollups.rebuild_all(batch_size=options["batch_size"])
+            self.stdout.write(f"Odbudowano {created} kubełków.")
+
+        mismatches = rollups.find_mismatches()
+        for key, expected, actual in mismatches[:20]:
+            self.stderr.write(f"{key}: oczekiwano {expected}, zapisano {actual}")
+        if mismatches:
+            raise CommandError(f"Niezgodnych kubełków: {len(mismatches)}.")
+        self.stdout.write(self.style.SUCCESS("Agregaty zgodne z surowymi danymi."))
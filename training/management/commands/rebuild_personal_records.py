@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from training import records
+from training.models import PersonalRecord, SessionExercise
+
+
+class Command(BaseCommand):
+    help = "Przelicza od nowa rekordy osobiste wszystkich użytkowników."
+
+    def handle(self, *args, **options):
+        pairs = {}
+        for user_id, type_id in (
+            SessionExercise.objects.order_by()
+            .values_list("created_by_id", "exercise_type_id")
+            .distinct()
+            .iterator()
+        ):
+            pairs.setdefault(user_id, set()).add(type_id)
+
+        PersonalRecord.objects.exclude(created_by_id__in=pairs.keys()).delete()
+        for user_id, type_ids in pairs.items():
+            PersonalRecord.objects.filter(created_by_id=user_id).exclude(
+                exercise_type_id__in=type_ids
+            ).delete()
+            records.recompute(user_id, type_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Przeliczono rekordy dla {len(pairs)} użytkowników."
+            )
+        )
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from training import leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        "Przelicza od nowa tabelę rankingów (szacowany 1RM z rekordów osobistych, "
+        f"objętość z ostatnich {leaderboards.VOLUME_DAYS} dni) i miejsca. "
+        "Uruchamiane okresowo (np. raz na dobę z crona), żeby stare ćwiczenia "
+        "wypadały z okna objętości."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = leaderboards.rebuild_all()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Przeliczono {count} wyników rankingów "
+                f"w {time.perf_counter() - started:.2f} s."
+            )
+        )
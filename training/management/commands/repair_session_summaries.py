@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from training import summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Sprawdza podsumowania sesji (liczba ćwiczeń, objętość, czas trwania) "
+        "z surowymi danymi i poprawia rozbieżności."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Liczba sesji sprawdzanych i poprawianych w jednej partii.",
+        )
+        parser.add_argument(
+            "--check-only",
+            action="store_true",
+            help="Tylko wypisz rozbieżności, bez poprawiania.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if options["check_only"]:
+            drift = list(summaries.find_drift(batch_size))
+        else:
+            drift = summaries.repair(batch_size)
+
+        for pk, expected, stored in drift[:20]:
+            self.stderr.write(f"Sesja {pk}: oczekiwano {expected}, zapisano {stored}")
+        if drift and options["check_only"]:
+            raise CommandError(f"Sesji z rozbieżnym podsumowaniem: {len(drift)}.")
+        if drift:
+            self.stdout.write(
+                self.style.SUCCESS(f"Poprawiono podsumowania sesji: {len(drift)}.")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS("Podsumowania sesji zgodne z surowymi danymi.")
+            )
@@ -0,0 +1,74 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from training import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Wykonuje zadania z kolejki przeliczeń w tle (rekordy osobiste, rankingi). "
+        "Można uruchomić kilka procesów naraz – każde zadanie pobiera tylko "
+        "jeden z nich."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads", type=int, default=1, help="Liczba wątków wykonujących."
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=1.0,
+            help="Przerwa w sekundach, gdy kolejka jest pusta.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Opróżnia kolejkę z gotowych zadań i kończy działanie.",
+        )
+
+    def handle(self, *args, **options):
+        threads = max(options["threads"], 1)
+        # Jeden wątek pracuje w wątku głównym, na jego połączeniu z bazą.
+        pool = (
+            ThreadPoolExecutor(
+                max_workers=threads, thread_name_prefix="training-worker"
+            )
+            if threads > 1
+            else None
+        )
+        processed = 0
+        try:
+            while True:
+                requeued = jobs.requeue_stale()
+                if requeued:
+                    self.stderr.write(
+                        f"Porzucone zadania wróciły do kolejki: {requeued}."
+                    )
+                if pool is None:
+                    done = jobs.run_pending()
+                else:
+                    done = sum(pool.map(lambda _: jobs.drain(), range(threads)))
+                processed += done
+                if options["verbosity"] > 1 and done:
+                    self.stdout.write(f"Wykonane zadania: {done}.")
+                if options["once"]:
+                    break
+                if not done:
+                    time.sleep(options["poll"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        counts = jobs.counts()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wykonane zadania: {processed}; oczekujące: "
+                f"{counts[jobs.Status.PENDING]}, nieudane: "
+                f"{counts[jobs.Status.FAILED]}."
+            )
+        )
@@ -0,0 +1,224 @@
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from training import catalogue, leaderboards, records, rollups, summaries
+from training.models import ExerciseType, SessionExercise, TrainingSession
+
+
+EXERCISES = [
+    # (nazwa, typowy ciężar roboczy średniego bywalca [kg], zakres powtórzeń)
+    ("Przysiad ze sztangą", 70, (5, 10)),
+    ("Wyciskanie sztangi leżąc", 60, (5, 10)),
+    ("Martwy ciąg", 90, (3, 8)),
+    ("Wyciskanie żołnierskie", 35, (6, 10)),
+    ("Wiosłowanie sztangą", 50, (8, 12)),
+    ("Podciąganie na drążku", 0, (5, 12)),
+    ("Pompki na poręczach", 0, (6, 15)),
+    ("Wyciskanie hantli na skosie", 22, (8, 12)),
+    ("Ściąganie drążka wyciągu górnego", 50, (8, 12)),
+    ("Wypychanie nogami na suwnicy", 140, (8, 15)),
+    ("Hip thrust", 80, (8, 12)),
+    ("Rumuński martwy ciąg", 70, (8, 12)),
+    ("Wykroki z hantlami", 16, (10, 15)),
+    ("Uginanie ramion ze sztangą", 25, (8, 15)),
+    ("Prostowanie ramion na wyciągu", 25, (10, 15)),
+    ("Wznosy bokiem z hantlami", 8, (12, 20)),
+    ("Prostowanie nóg na maszynie", 40, (10, 15)),
+    ("Uginanie nóg na maszynie", 35, (10, 15)),
+    ("Wspięcia na palce", 60, (12, 20)),
+    ("Face pull", 20, (12, 20)),
+]
+
+# Godziny rozpoczęcia treningu i ich wagi – szczyty rano i po pracy.
+START_HOURS = list(range(6, 22))
+START_HOUR_WEIGHTS = [4, 6, 5, 3, 2, 2, 3, 3, 3, 4, 6, 9, 10, 9, 6, 3]
+
+PASSWORD = "befit-haslo"
+
+
+class Command(BaseCommand):
+    help = (
+        "Generuje syntetyczne dane o realistycznych rozkładach: użytkowników, "
+        "typy ćwiczeń, sesje i wykonane ćwiczenia (bulk_create partiami, także "
+        "dla milionów wierszy), a na koniec przelicza dane pochodne. Wszyscy "
+        f"użytkownicy mają hasło {PASSWORD!r}."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument(
+            "--weeks", type=int, default=52, help="Długość historii w tygodniach."
+        )
+        parser.add_argument(
+            "--prefix", default="befit", help="Przedrostek nazw użytkowników."
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Ziarno generatora (powtarzalność)."
+        )
+        parser.add_argument(
+            "--chunk-users",
+            type=int,
+            default=50,
+            help="Liczba użytkowników zapisywanych w jednej transakcji.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Liczba wierszy w jednym INSERT.",
+        )
+        parser.add_argument(
+            "--skip-derived",
+            action="store_true",
+            help="Bez przeliczania agregatów, rekordów i rankingów.",
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        # Czas lokalny – godziny treningów są godzinami na zegarze siłowni.
+        self.now = timezone.localtime().replace(second=0, microsecond=0)
+        self.weeks = options["weeks"]
+        self.seeded_types = {}
+        prefix = options["prefix"]
+        User = get_user_model()
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f"Użytkownicy z przedrostkiem {prefix!r} już istnieją – "
+                "użyj innego --prefix."
+            )
+
+        started = time.perf_counter()
+        self.types = self.exercise_types()
+        # Jeden skrót hasła dla wszystkich – haszowanie to najdroższa część
+        # tworzenia użytkownika.
+        password = make_password(PASSWORD)
+        sessions = exercises = 0
+        for first in range(0, options["users"], options["chunk_users"]):
+            count = min(options["chunk_users"], options["users"] - first)
+            with transaction.atomic():
+                users = User.objects.bulk_create(
+                    [
+                        User(username=f"{prefix}{n:06d}", password=password)
+                        for n in range(first, first + count)
+                    ],
+                    batch_size=self.batch_size,
+                )
+                added = self.seed_users(users)
+            sessions += added[0]
+            exercises += added[1]
+            if options["verbosity"] > 1:
+                self.stdout.write(
+                    f"Użytkownicy: {first + count}, sesje: {sessions}, "
+                    f"ćwiczenia: {exercises} ({time.perf_counter() - started:.1f} s)."
+                )
+
+        if not options["skip_derived"]:
+            self.stdout.write("Przeliczanie danych pochodnych…")
+            rollups.rebuild_all(batch_size=self.batch_size)
+            for user_id, type_ids in self.seeded_types.items():
+                records.recompute(user_id, type_ids)
+            leaderboards.rebuild_all()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Utworzono {options['users']} użytkowników, {sessions} sesji "
+                f"i {exercises} ćwiczeń w {elapsed:.1f} s "
+                f"({(sessions + exercises) / elapsed:,.0f} wierszy/s)."
+            )
+        )
+
+    def exercise_types(self):
+        existing = dict(ExerciseType.objects.values_list("name", "pk"))
+        missing = [name for name, *_ in EXERCISES if name not in existing]
+        if missing:
+            with transaction.atomic():
+                ExerciseType.objects.bulk_create(
+                    ExerciseType(name=name) for name in missing
+                )
+                transaction.on_commit(catalogue.bump)
+            existing = dict(ExerciseType.objects.values_list("name", "pk"))
+        return [
+            (existing[name], weight, reps) for name, weight, reps in EXERCISES
+        ]
+
+    # --- Rozkłady ---
+
+    def profile(self):
+        """
+        Cechy jednego użytkownika: częstość treningów, siła, ulubione ćwiczenia.
+        """
+        rng = self.random
+        # Większość chodzi 2–3 razy w tygodniu, nieliczni codziennie; część
+        # zaczęła niedawno.
+        per_week = min(max(rng.gauss(2.8, 1.1), 0.5), 6.5)
+        weeks = max(1, int(self.weeks * rng.betavariate(2, 1)))
+        strength = rng.lognormvariate(0, 0.3)
+        # Ulubione ćwiczenia – rozkład Zipfa po losowej kolejności katalogu.
+        order = rng.sample(self.types, len(self.types))
+        favourites = [1 / (rank + 1) ** 1.1 for rank in range(len(order))]
+        return per_week, weeks, strength, order, favourites
+
+    def seed_users(self, users):
+        sessions, exercises = [], []
+        for user in users:
+            self.seed_user(user, sessions, exercises)
+        # Po zapisie sesje mają klucze, a ćwiczenia biorą je z training_session.
+        TrainingSession.objects.bulk_create(sessions, batch_size=self.batch_size)
+        SessionExercise.objects.bulk_create(exercises, batch_size=self.batch_size)
+        return len(sessions), len(exercises)
+
+    def seed_user(self, user, sessions, exercises):
+        rng = self.random
+        per_week, weeks, strength, order, favourites = self.profile()
+        days = weeks * 7
+        types = self.seeded_types.setdefault(user.pk, set())
+        # Co najwyżej jedna sesja dziennie – sesje się nie nakładają.
+        count = min(days, round(per_week * weeks))
+        for day in sorted(rng.sample(range(days), count)):
+            start = (self.now - timedelta(days=day)).replace(
+                hour=rng.choices(START_HOURS, START_HOUR_WEIGHTS)[0],
+                minute=rng.randrange(0, 60, 5),
+            )
+            minutes = min(max(rng.gauss(65, 18), 20), 150)
+            end = start + timedelta(minutes=round(minutes))
+            if end > self.now:
+                continue
+            session = TrainingSession(
+                created_by=user,
+                start=start,
+                end=end,
+                duration_seconds=TrainingSession.duration_between(start, end),
+            )
+            # Postęp: ciężary rosną z czasem, szybciej na początku.
+            progress = 1 + 0.25 * math.log1p((days - day) / 60)
+            count = min(max(round(rng.gauss(5, 1.5)), 2), 9)
+            picked = set()
+            while len(picked) < count:
+                picked.add(rng.choices(range(len(order)), favourites)[0])
+            for index in sorted(picked):
+                type_id, base, (low, high) = order[index]
+                weight = base * strength * progress * rng.uniform(0.9, 1.05)
+                exercise = SessionExercise(
+                    training_session=session,
+                    session_start=start,
+                    exercise_type_id=type_id,
+                    weight=min(round(weight / 2.5) * 2.5, 1000),
+                    sets=rng.choices([2, 3, 4, 5], [1, 6, 4, 1])[0],
+                    reps=rng.randint(low, high),
+                    created_by=user,
+                )
+                session.exercise_count += 1
+                session.total_volume += summaries.volume(exercise)
+                exercises.append(exercise)
+                types.add(type_id)
+            sessions.append(session)
@@ -0,0 +1,35 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Kopiuje bazę główną SQLite do replik z TRAINING_READ_REPLICAS – lokalna "
+        "namiastka replikacji (między wywołaniami repliki są opóźnione)."
+    )
+
+    def handle(self, *args, **options):
+        aliases = list(settings.TRAINING_READ_REPLICAS)
+        if not aliases:
+            raise CommandError(
+                "Brak replik – ustaw BEFIT_REPLICA_NAME (ścieżka do pliku repliki)."
+            )
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        for alias in [DEFAULT_DB_ALIAS, *aliases]:
+            if settings.DATABASES[alias]["ENGINE"] != "django.db.backends.sqlite3":
+                raise CommandError(f"Baza {alias!r} nie jest bazą SQLite.")
+
+        for alias in aliases:
+            # Otwarte połączenie Django do repliki zostałoby ze starym obrazem.
+            connections[alias].close()
+            source = sqlite3.connect(primary["NAME"])
+            target = sqlite3.connect(settings.DATABASES[alias]["NAME"])
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(self.style.SUCCESS(f"Zsynchronizowano replikę {alias}."))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0003_alter_exercisetype_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyExerciseStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField(verbose_name='Początek tygodnia')),
+                ('total_volume', models.FloatField(default=0, verbose_name='Objętość [kg]')),
+                ('set_count', models.PositiveIntegerField(default=0, verbose_name='Serie')),
+                ('rep_count', models.PositiveIntegerField(default=0, verbose_name='Powtórzenia')),
+                ('max_weight', models.FloatField(default=0, verbose_name='Maks. ciężar [kg]')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_stats', to=settings.AUTH_USER_MODEL, verbose_name='Utworzono przez')),
+                ('exercise_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_stats', to='training.exercisetype', verbose_name='Typ ćwiczenia')),
+            ],
+            options={
+                'ordering': ['-week_start'],
+                'constraints': [models.UniqueConstraint(fields=('created_by', 'week_start', 'exercise_type'), name='weekly_stats_bucket_unique')],
+            },
+        ),
+    ]
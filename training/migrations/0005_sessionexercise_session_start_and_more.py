@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_session_start(apps, schema_editor):
+    SessionExercise = apps.get_model("training", "SessionExercise")
+    TrainingSession = apps.get_model("training", "TrainingSession")
+    SessionExercise.objects.update(
+        session_start=models.Subquery(
+            TrainingSession.objects.filter(
+                pk=models.OuterRef("training_session_id")
+            ).values("start")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0004_weeklyexercisestats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sessionexercise',
+            name='session_start',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Data i czas rozpoczęcia sesji'),
+        ),
+        migrations.RunPython(copy_session_start, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='sessionexercise',
+            index=models.Index(fields=['created_by', 'session_start', 'id'], name='exercise_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingsession',
+            index=models.Index(fields=['created_by', 'start', 'id'], name='session_user_start_idx'),
+        ),
+    ]
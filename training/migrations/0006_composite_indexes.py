@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0005_sessionexercise_session_start_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exercisetype',
+            index=models.Index(fields=['name'], name='exercisetype_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sessionexercise',
+            index=models.Index(fields=['created_by', 'exercise_type', 'session_start'], name='exercise_user_type_start_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_stamps(apps, schema_editor):
+    TrainingDataStamp = apps.get_model("training", "TrainingDataStamp")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    now = timezone.now()
+    TrainingDataStamp.objects.bulk_create(
+        TrainingDataStamp(user_id=pk, modified_at=now)
+        for pk in User.objects.values_list("pk", flat=True).iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0006_composite_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingDataStamp',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='training_stamp', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Użytkownik')),
+                ('version', models.PositiveBigIntegerField(default=1, verbose_name='Wersja danych')),
+                ('modified_at', models.DateTimeField(verbose_name='Ostatnia zmiana')),
+            ],
+        ),
+        migrations.RunPython(create_stamps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0007_trainingdatastamp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonalRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('max_weight', models.FloatField(default=0, verbose_name='Maks. ciężar [kg]')),
+                ('best_e1rm', models.FloatField(default=0, verbose_name='Szacowany 1RM [kg]')),
+                ('max_volume', models.FloatField(default=0, verbose_name='Maks. objętość [kg]')),
+                ('best_e1rm_exercise', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='training.sessionexercise', verbose_name='Ćwiczenie z najlepszym 1RM')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_records', to=settings.AUTH_USER_MODEL, verbose_name='Utworzono przez')),
+                ('exercise_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_records', to='training.exercisetype', verbose_name='Typ ćwiczenia')),
+                ('max_volume_exercise', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='training.sessionexercise', verbose_name='Ćwiczenie z maks. objętością')),
+                ('max_weight_exercise', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='training.sessionexercise', verbose_name='Ćwiczenie z maks. ciężarem')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('created_by', 'exercise_type'), name='personal_record_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:50
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Greatest, TruncMonth, TruncWeek
+
+
+def rebuild_periods(apps, schema_editor):
+    # Tygodnie na przełomie miesięcy dzielą się na dwa okresy, a nowe pola
+    # (sesje, czas) trzeba policzyć z surowych danych – budujemy tabelę od nowa.
+    SessionExercise = apps.get_model("training", "SessionExercise")
+    WeeklyExerciseStats = apps.get_model("training", "WeeklyExerciseStats")
+    first_in_session = models.Q(
+        ~models.Exists(
+            SessionExercise.objects.filter(
+                training_session=models.OuterRef("training_session"),
+                exercise_type=models.OuterRef("exercise_type"),
+                id__lt=models.OuterRef("id"),
+            )
+        )
+    )
+    duration = models.ExpressionWrapper(
+        models.F("training_session__end") - models.F("training_session__start"),
+        output_field=models.DurationField(),
+    )
+    rows = (
+        SessionExercise.objects.order_by()
+        .values(
+            "created_by_id",
+            "exercise_type_id",
+            period_start=Greatest(
+                TruncWeek("session_start", output_field=models.DateField()),
+                TruncMonth("session_start", output_field=models.DateField()),
+            ),
+        )
+        .annotate(
+            total_volume=models.Sum(
+                models.F("weight") * models.F("sets") * models.F("reps"),
+                output_field=models.FloatField(),
+            ),
+            set_count=models.Sum("sets"),
+            rep_count=models.Sum(models.F("sets") * models.F("reps")),
+            max_weight=models.Max("weight"),
+            session_count=models.Count("id", filter=first_in_session),
+            total_duration=models.Sum(duration, filter=first_in_session),
+        )
+    )
+    WeeklyExerciseStats.objects.all().delete()
+    WeeklyExerciseStats.objects.bulk_create(
+        (WeeklyExerciseStats(**row) for row in rows.iterator(chunk_size=2000)),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0008_personalrecord'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='weeklyexercisestats',
+            name='weekly_stats_bucket_unique',
+        ),
+        migrations.RenameField(
+            model_name='weeklyexercisestats',
+            old_name='week_start',
+            new_name='period_start',
+        ),
+        migrations.AlterField(
+            model_name='weeklyexercisestats',
+            name='period_start',
+            field=models.DateField(verbose_name='Początek okresu'),
+        ),
+        migrations.AlterModelOptions(
+            name='weeklyexercisestats',
+            options={'ordering': ['-period_start']},
+        ),
+        migrations.AddField(
+            model_name='weeklyexercisestats',
+            name='session_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Sesje'),
+        ),
+        migrations.AddField(
+            model_name='weeklyexercisestats',
+            name='total_duration',
+            field=models.DurationField(default=datetime.timedelta, verbose_name='Czas sesji'),
+        ),
+        migrations.AddConstraint(
+            model_name='weeklyexercisestats',
+            constraint=models.UniqueConstraint(fields=('created_by', 'period_start', 'exercise_type'), name='weekly_stats_bucket_unique'),
+        ),
+        migrations.RunPython(rebuild_periods, migrations.RunPython.noop),
+    ]
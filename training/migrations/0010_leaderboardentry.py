@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:56
+
+import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_leaderboards(apps, schema_editor):
+    # Pierwsze wypełnienie rankingów – to samo co leaderboards.rebuild_all().
+    PersonalRecord = apps.get_model("training", "PersonalRecord")
+    SessionExercise = apps.get_model("training", "SessionExercise")
+    LeaderboardEntry = apps.get_model("training", "LeaderboardEntry")
+    now = timezone.now()
+    entries = [
+        LeaderboardEntry(
+            created_by_id=user_id,
+            exercise_type_id=type_id,
+            metric="best_e1rm",
+            score=e1rm,
+            computed_at=now,
+        )
+        for user_id, type_id, e1rm in PersonalRecord.objects.values_list(
+            "created_by_id", "exercise_type_id", "best_e1rm"
+        )
+    ]
+    volumes = (
+        SessionExercise.objects.filter(
+            session_start__gte=now - datetime.timedelta(days=28)
+        )
+        .order_by()
+        .values_list("created_by_id", "exercise_type_id")
+        .annotate(
+            volume=models.Sum(
+                models.F("weight") * models.F("sets") * models.F("reps"),
+                output_field=models.FloatField(),
+            )
+        )
+    )
+    entries += [
+        LeaderboardEntry(
+            created_by_id=user_id,
+            exercise_type_id=type_id,
+            metric="volume_28d",
+            score=volume,
+            computed_at=now,
+        )
+        for user_id, type_id, volume in volumes
+        if volume
+    ]
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0009_period_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('best_e1rm', 'Szacowany 1RM'), ('volume_28d', 'Objętość (28 dni)')], max_length=16, verbose_name='Miara')),
+                ('score', models.FloatField(verbose_name='Wynik')),
+                ('computed_at', models.DateTimeField(verbose_name='Przeliczono')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL, verbose_name='Użytkownik')),
+                ('exercise_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='training.exercisetype', verbose_name='Typ ćwiczenia')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['exercise_type', 'metric', '-score', 'created_by'], name='leaderboard_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('exercise_type', 'metric', 'created_by'), name='leaderboard_entry_unique')],
+            },
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
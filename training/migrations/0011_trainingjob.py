@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0010_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, verbose_name='Zadanie')),
+                ('args', models.JSONField(default=dict, verbose_name='Argumenty')),
+                ('dedup_key', models.CharField(max_length=40, verbose_name='Klucz deduplikacji')),
+                ('status', models.CharField(choices=[('pending', 'Oczekuje'), ('running', 'W toku'), ('failed', 'Nieudane')], default='pending', max_length=16, verbose_name='Stan')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Próby')),
+                ('run_after', models.DateTimeField(verbose_name='Nie wcześniej niż')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Pobrane')),
+                ('last_error', models.TextField(blank=True, verbose_name='Ostatni błąd')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='training_job_ready_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('dedup_key',), name='training_job_pending_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0011_trainingjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='sessionexercise',
+            name='exercise_user_start_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='sessionexercise',
+            name='exercise_user_type_start_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='trainingsession',
+            name='session_user_start_idx',
+        ),
+        migrations.AddField(
+            model_name='sessionexercise',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Usunięto'),
+        ),
+        migrations.AddField(
+            model_name='trainingsession',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Usunięto'),
+        ),
+        migrations.AddIndex(
+            model_name='sessionexercise',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['created_by', 'session_start', 'id'], name='exercise_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sessionexercise',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['created_by', 'exercise_type', 'session_start'], name='exercise_user_type_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sessionexercise',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='exercise_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingsession',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['created_by', 'start', 'id'], name='session_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingsession',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='session_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:24
+
+from django.db import migrations, models
+
+
+def fill_summaries(apps, schema_editor):
+    # Pierwsze wypełnienie – to samo co summaries.repair().
+    TrainingSession = apps.get_model("training", "TrainingSession")
+    SessionExercise = apps.get_model("training", "SessionExercise")
+    rows = (
+        SessionExercise.objects.filter(deleted_at__isnull=True)
+        .order_by()
+        .values_list("training_session_id")
+        .annotate(
+            count=models.Count("id"),
+            volume=models.Sum(
+                models.F("weight") * models.F("sets") * models.F("reps"),
+                output_field=models.FloatField(),
+            ),
+        )
+    )
+    totals = {session_id: (count, volume) for session_id, count, volume in rows}
+    sessions = []
+    for session in TrainingSession.objects.only("id", "start", "end").iterator():
+        session.exercise_count, session.total_volume = totals.get(
+            session.pk, (0, 0.0)
+        )
+        session.duration_seconds = max(
+            int((session.end - session.start).total_seconds()), 0
+        )
+        sessions.append(session)
+    TrainingSession.objects.bulk_update(
+        sessions,
+        ["exercise_count", "total_volume", "duration_seconds"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0012_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainingsession',
+            name='duration_seconds',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Czas trwania [s]'),
+        ),
+        migrations.AddField(
+            model_name='trainingsession',
+            name='exercise_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Liczba ćwiczeń'),
+        ),
+        migrations.AddField(
+            model_name='trainingsession',
+            name='total_volume',
+            field=models.FloatField(default=0, editable=False, verbose_name='Objętość [kg]'),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
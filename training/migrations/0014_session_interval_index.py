@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0013_session_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trainingsession',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['created_by', 'start', 'end'], name='session_user_interval_idx'),
+        ),
+    ]
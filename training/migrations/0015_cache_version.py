@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0014_session_interval_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Klucz')),
+                ('version', models.PositiveBigIntegerField(default=1, verbose_name='Wersja')),
+            ],
+        ),
+    ]
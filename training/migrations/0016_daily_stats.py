@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:06
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def rebuild_days(apps, schema_editor):
+    # Okresem agregatu jest teraz dzień – budujemy tabelę od nowa z surowych
+    # danych, tak jak rollups.rebuild_all.
+    SessionExercise = apps.get_model("training", "SessionExercise")
+    DailyExerciseStats = apps.get_model("training", "DailyExerciseStats")
+    first_in_session = models.Q(
+        ~models.Exists(
+            SessionExercise.objects.filter(
+                training_session=models.OuterRef("training_session"),
+                exercise_type=models.OuterRef("exercise_type"),
+                id__lt=models.OuterRef("id"),
+                deleted_at__isnull=True,
+            )
+        )
+    )
+    duration = models.ExpressionWrapper(
+        models.F("training_session__end") - models.F("training_session__start"),
+        output_field=models.DurationField(),
+    )
+    rows = (
+        SessionExercise.objects.filter(deleted_at__isnull=True)
+        .order_by()
+        .values(
+            "created_by_id",
+            "exercise_type_id",
+            period_start=TruncDate("session_start"),
+        )
+        .annotate(
+            total_volume=models.Sum(
+                models.F("weight") * models.F("sets") * models.F("reps"),
+                output_field=models.FloatField(),
+            ),
+            set_count=models.Sum("sets"),
+            rep_count=models.Sum(models.F("sets") * models.F("reps")),
+            max_weight=models.Max("weight"),
+            session_count=models.Count("id", filter=first_in_session),
+            total_duration=models.Sum(duration, filter=first_in_session),
+        )
+    )
+    DailyExerciseStats.objects.all().delete()
+    DailyExerciseStats.objects.bulk_create(
+        (DailyExerciseStats(**row) for row in rows.iterator(chunk_size=2000)),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0015_cache_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='weeklyexercisestats',
+            name='weekly_stats_bucket_unique',
+        ),
+        migrations.RenameModel(
+            old_name='WeeklyExerciseStats',
+            new_name='DailyExerciseStats',
+        ),
+        migrations.AlterField(
+            model_name='dailyexercisestats',
+            name='created_by',
+            field=models.ForeignKey(on_delete=models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL, verbose_name='Utworzono przez'),
+        ),
+        migrations.AlterField(
+            model_name='dailyexercisestats',
+            name='exercise_type',
+            field=models.ForeignKey(on_delete=models.deletion.CASCADE, related_name='daily_stats', to='training.exercisetype', verbose_name='Typ ćwiczenia'),
+        ),
+        migrations.AlterField(
+            model_name='dailyexercisestats',
+            name='period_start',
+            field=models.DateField(verbose_name='Dzień'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyexercisestats',
+            constraint=models.UniqueConstraint(fields=('created_by', 'period_start', 'exercise_type'), name='daily_stats_bucket_unique'),
+        ),
+        migrations.RunPython(rebuild_days, migrations.RunPython.noop),
+    ]
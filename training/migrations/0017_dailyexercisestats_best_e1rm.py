@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:20
+
+from django.db import migrations, models
+from django.db.models.functions import Cast, TruncDate
+
+
+def fill_best_e1rm(apps, schema_editor):
+    # Ten sam wzór co records.METRICS["best_e1rm"] (Brzycki do 10 powtórzeń,
+    # dalej Epley).
+    SessionExercise = apps.get_model("training", "SessionExercise")
+    DailyExerciseStats = apps.get_model("training", "DailyExerciseStats")
+    weight = Cast("weight", models.FloatField())
+    reps = Cast("reps", models.FloatField())
+    e1rm = models.Case(
+        models.When(reps=1, then=weight),
+        models.When(reps__lte=10, then=weight * 36.0 / (37.0 - reps)),
+        default=weight * (1.0 + reps / 30.0),
+        output_field=models.FloatField(),
+    )
+    rows = (
+        SessionExercise.objects.filter(deleted_at__isnull=True)
+        .order_by()
+        .values_list(
+            "created_by_id", "exercise_type_id", TruncDate("session_start")
+        )
+        .annotate(best=models.Max(e1rm))
+    )
+    best = {row[:3]: row[3] for row in rows.iterator(chunk_size=2000)}
+    buckets = []
+    for bucket in DailyExerciseStats.objects.order_by().iterator(chunk_size=2000):
+        key = (bucket.created_by_id, bucket.exercise_type_id, bucket.period_start)
+        bucket.best_e1rm = best.get(key, 0)
+        buckets.append(bucket)
+    DailyExerciseStats.objects.bulk_update(buckets, ["best_e1rm"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0016_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyexercisestats',
+            name='best_e1rm',
+            field=models.FloatField(default=0, verbose_name='Najlepszy szacowany 1RM [kg]'),
+        ),
+        migrations.RunPython(fill_best_e1rm, migrations.RunPython.noop),
+    ]
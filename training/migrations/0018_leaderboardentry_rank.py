@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+def fill_ranks(apps, schema_editor):
+    # Miejsce to 1 + liczba wyższych wyników w (typ, miara), tak jak
+    # leaderboards.assign_ranks.
+    LeaderboardEntry = apps.get_model("training", "LeaderboardEntry")
+    entries = LeaderboardEntry.objects.order_by("exercise_type", "metric", "-score")
+    batch = []
+    board = previous = None
+    for entry in entries.iterator(chunk_size=2000):
+        if (entry.exercise_type_id, entry.metric) != board:
+            board = entry.exercise_type_id, entry.metric
+            position, previous = 0, None
+        position += 1
+        entry.rank = position
+        if previous is not None and entry.score == previous.score:
+            entry.rank = previous.rank
+        previous = entry
+        batch.append(entry)
+        if len(batch) >= 1000:
+            LeaderboardEntry.objects.bulk_update(batch, ["rank"])
+            batch = []
+    LeaderboardEntry.objects.bulk_update(batch, ["rank"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0017_dailyexercisestats_best_e1rm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='rank',
+            field=models.PositiveIntegerField(default=0, verbose_name='Miejsce'),
+        ),
+        migrations.RunPython(fill_ranks, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -9,11 +11,31 @@ class ExerciseType(models.Model):
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["name"], name="exercisetype_name_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
 
+class LiveManager(models.Manager):
+    """
+    Domyślny menedżer modeli z miękkim usuwaniem (training/deletion.py) –
+    pomija usunięte wiersze. Warunek deleted_at IS NULL pokrywają częściowe
+    indeksy modeli, więc usunięte wiersze nie są nawet przeglądane.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+# Częściowe indeksy: główne tylko dla nieusuniętych wierszy, a osobny,
+# zwykle mały, dla usuniętych – dla czyszczenia (purge_deleted_training).
+LIVE = models.Q(deleted_at__isnull=True)
+DELETED = models.Q(deleted_at__isnull=False)
+
+
 class TrainingSession(models.Model):
     start = models.DateTimeField("Data i czas rozpoczęcia")
     end = models.DateTimeField("Data i czas zakończenia")
@@ -23,9 +45,42 @@ class TrainingSession(models.Model):
         related_name="training_sessions",
         verbose_name="Utworzono przez",
     )
+    deleted_at = models.DateTimeField(
+        "Usunięto", null=True, blank=True, editable=False
+    )
+    # Podsumowanie ćwiczeń sesji – utrzymywane przez training/summaries.py.
+    exercise_count = models.IntegerField("Liczba ćwiczeń", default=0, editable=False)
+    total_volume = models.FloatField("Objętość [kg]", default=0, editable=False)
+    duration_seconds = models.PositiveIntegerField(
+        "Czas trwania [s]", default=0, editable=False
+    )
+
+    # Zmieniane tylko przez UPDATE z F() – zapis edytowanej sesji ich nie
+    # nadpisuje (mógłby cofnąć równoległą zmianę ćwiczeń).
+    COUNTER_FIELDS = ("exercise_count", "total_volume")
+
+    objects = LiveManager()
+    # Wszystkie wiersze, także usunięte.
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ["-start"]
+        indexes = [
+            models.Index(
+                fields=["created_by", "start", "id"],
+                condition=LIVE,
+                name="session_user_start_idx",
+            ),
+            # Sprawdzanie nakładania się sesji (training/overlaps.py).
+            models.Index(
+                fields=["created_by", "start", "end"],
+                condition=LIVE,
+                name="session_user_interval_idx",
+            ),
+            models.Index(
+                fields=["deleted_at"], condition=DELETED, name="session_deleted_idx"
+            ),
+        ]
 
     def clean(self):
         super().clean()
@@ -34,6 +89,26 @@ class TrainingSession(models.Model):
                 {"end": "Data zakończenia nie może być wcześniejsza niż data rozpoczęcia."}
             )
 
+    @staticmethod
+    def duration_between(start, end):
+        return max(int((end - start).total_seconds()), 0)
+
+    def save(self, *args, **kwargs):
+        if self.start and self.end:
+            self.duration_seconds = self.duration_between(self.start, self.end)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            if {"start", "end"} & set(update_fields):
+                kwargs["update_fields"] = {*update_fields, "duration_seconds"}
+        elif not self._state.adding:
+            skipped = {*self.COUNTER_FIELDS, *self.get_deferred_fields()}
+            kwargs["update_fields"] = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return f"Sesja {self.start:%Y-%m-%d %H:%M} – {self.end:%H:%M}"
 
@@ -69,9 +144,263 @@ class SessionExercise(models.Model):
         related_name="session_exercises",
         verbose_name="Utworzono przez",
     )
+    # Kopia TrainingSession.start – klucz sortowania i paginacji listy ćwiczeń
+    # bez złączenia z tabelą sesji. Ustawiana w save() i przy edycji sesji.
+    session_start = models.DateTimeField(
+        "Data i czas rozpoczęcia sesji", editable=False, null=True
+    )
+    deleted_at = models.DateTimeField(
+        "Usunięto", null=True, blank=True, editable=False
+    )
+
+    objects = LiveManager()
+    # Wszystkie wiersze, także usunięte.
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ["-training_session__start"]
+        indexes = [
+            models.Index(
+                fields=["created_by", "session_start", "id"],
+                condition=LIVE,
+                name="exercise_user_start_idx",
+            ),
+            models.Index(
+                fields=["created_by", "exercise_type", "session_start"],
+                condition=LIVE,
+                name="exercise_user_type_start_idx",
+            ),
+            models.Index(
+                fields=["deleted_at"], condition=DELETED, name="exercise_deleted_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.session_start = self.training_session.start
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "session_start" not in update_fields:
+            kwargs["update_fields"] = {*update_fields, "session_start"}
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return f"{self.exercise_type} – {self.weight} kg x {self.sets} x {self.reps}"
+
+
+class DailyExerciseStats(models.Model):
+    """
+    Podsumowanie ćwiczeń użytkownika dla danego typu w jednym dniu (w bieżącej
+    strefie czasowej). Z dni da się dokładnie złożyć tygodnie i miesiące.
+    Utrzymywane przyrostowo przez sygnały – patrz training/rollups.py.
+    """
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+        verbose_name="Utworzono przez",
+    )
+    exercise_type = models.ForeignKey(
+        ExerciseType,
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+        verbose_name="Typ ćwiczenia",
+    )
+    period_start = models.DateField("Dzień")
+    total_volume = models.FloatField("Objętość [kg]", default=0)
+    set_count = models.PositiveIntegerField("Serie", default=0)
+    rep_count = models.PositiveIntegerField("Powtórzenia", default=0)
+    max_weight = models.FloatField("Maks. ciężar [kg]", default=0)
+    best_e1rm = models.FloatField("Najlepszy szacowany 1RM [kg]", default=0)
+    # Sesje, w których wykonano ćwiczenie tego typu (każda liczona raz).
+    session_count = models.PositiveIntegerField("Sesje", default=0)
+    total_duration = models.DurationField("Czas sesji", default=timedelta)
+
+    class Meta:
+        ordering = ["-period_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["created_by", "period_start", "exercise_type"],
+                name="daily_stats_bucket_unique",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.exercise_type} – {self.period_start:%Y-%m-%d}"
+
+
+class TrainingDataStamp(models.Model):
+    """
+    Znacznik ostatniej zmiany danych treningowych użytkownika (wersja + czas).
+    Podstawa nagłówków ETag/Last-Modified – patrz training/stamps.py.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="training_stamp",
+        verbose_name="Użytkownik",
+    )
+    version = models.PositiveBigIntegerField("Wersja danych", default=1)
+    modified_at = models.DateTimeField("Ostatnia zmiana")
+
+    def __str__(self) -> str:
+        return f"{self.user} – wersja {self.version}"
+
+
+class CacheVersion(models.Model):
+    """
+    Wersja danych w pamięci podręcznej (np. katalogu typów ćwiczeń) zapisana
+    w bazie – dla serwerów bez wspólnego cache, patrz training/versions.py.
+    """
+
+    key = models.CharField("Klucz", max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField("Wersja", default=1)
+
+    def __str__(self) -> str:
+        return f"{self.key} – wersja {self.version}"
+
+
+class PersonalRecord(models.Model):
+    """
+    Rekordy osobiste użytkownika dla typu ćwiczenia wraz z ćwiczeniem,
+    w którym zostały ustanowione. Utrzymywane przez training/records.py.
+    """
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="personal_records",
+        verbose_name="Utworzono przez",
+    )
+    exercise_type = models.ForeignKey(
+        ExerciseType,
+        on_delete=models.CASCADE,
+        related_name="personal_records",
+        verbose_name="Typ ćwiczenia",
+    )
+    max_weight = models.FloatField("Maks. ciężar [kg]", default=0)
+    max_weight_exercise = models.ForeignKey(
+        SessionExercise,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name="Ćwiczenie z maks. ciężarem",
+    )
+    best_e1rm = models.FloatField("Szacowany 1RM [kg]", default=0)
+    best_e1rm_exercise = models.ForeignKey(
+        SessionExercise,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name="Ćwiczenie z najlepszym 1RM",
+    )
+    max_volume = models.FloatField("Maks. objętość [kg]", default=0)
+    max_volume_exercise = models.ForeignKey(
+        SessionExercise,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name="Ćwiczenie z maks. objętością",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["created_by", "exercise_type"],
+                name="personal_record_unique",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.exercise_type} – {self.max_weight} kg"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Wynik użytkownika w rankingu typu ćwiczenia dla jednej miary (szacowany
+    1RM, objętość z ostatnich 28 dni) wraz z zapisanym miejscem. Utrzymywane
+    przez training/leaderboards.py; indeks (typ, miara, wynik malejąco) obsługuje
+    czołówkę i przesuwanie miejsc bez przeglądania całej tabeli.
+    """
+
+    class Metric(models.TextChoices):
+        BEST_E1RM = "best_e1rm", "Szacowany 1RM"
+        VOLUME_28D = "volume_28d", "Objętość (28 dni)"
+
+    exercise_type = models.ForeignKey(
+        ExerciseType,
+        on_delete=models.CASCADE,
+        related_name="leaderboard_entries",
+        verbose_name="Typ ćwiczenia",
+    )
+    metric = models.CharField("Miara", max_length=16, choices=Metric.choices)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="leaderboard_entries",
+        verbose_name="Użytkownik",
+    )
+    score = models.FloatField("Wynik")
+    # 1 + liczba wyższych wyników w (typ, miara) – patrz training/leaderboards.py.
+    rank = models.PositiveIntegerField("Miejsce", default=0)
+    computed_at = models.DateTimeField("Przeliczono")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["exercise_type", "metric", "created_by"],
+                name="leaderboard_entry_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["exercise_type", "metric", "-score", "created_by"],
+                name="leaderboard_rank_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.exercise_type} – {self.get_metric_display()}: {self.score:g}"
+
+
+class TrainingJob(models.Model):
+    """
+    Zadanie w kolejce przeliczeń w tle (training/jobs.py). Wykonane zadania
+    są usuwane – w tabeli zostają oczekujące, wykonywane i te, którym
+    skończyły się próby. Częściowy unikalny indeks po kluczu deduplikacji
+    dopuszcza najwyżej jedno identyczne zadanie oczekujące.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Oczekuje"
+        RUNNING = "running", "W toku"
+        FAILED = "failed", "Nieudane"
+
+    name = models.CharField("Zadanie", max_length=64)
+    args = models.JSONField("Argumenty", default=dict)
+    dedup_key = models.CharField("Klucz deduplikacji", max_length=40)
+    status = models.CharField(
+        "Stan", max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField("Próby", default=0)
+    run_after = models.DateTimeField("Nie wcześniej niż")
+    locked_at = models.DateTimeField("Pobrane", null=True, blank=True)
+    last_error = models.TextField("Ostatni błąd", blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedup_key"],
+                condition=models.Q(status="pending"),
+                name="training_job_pending_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["status", "run_after"], name="training_job_ready_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.get_status_display()})"
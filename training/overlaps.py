@@ -0,0 +1,128 @@
+"""
+Nakładające się sesje treningowe jednego użytkownika.
+
+Sesje [a, b) i [c, d) nakładają się, gdy c < b i a < d; sesje stykające się
+końcem z początkiem są w porządku, a dwie sesje o tym samym początku to
+duplikat. Formularz sesji odrzuca nakładanie się przy tworzeniu i edycji,
+więc zapisane sesje użytkownika są rozłączne. Wystarczą wtedy dwa odczyty
+z indeksu (created_by, start, end), każdy zatrzymany na pierwszym wierszu:
+sesja zaczynająca się wewnątrz nowego przedziału i ostatnia sesja zaczynająca
+się nie później niż on – koszt nie zależy od długości historii.
+
+Sesje nałożone wcześniej (sprzed walidacji, z importu albo z równoległych
+zapisów) scala polecenie merge_overlapping_sessions – jednym przejściem po
+historii użytkownika posortowanej po początku.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import jobs, rollups, stamps
+from .models import SessionExercise, TrainingSession
+
+
+def intersects(start, end, other_start, other_end):
+    """
+    Czy przedziały [start, end) i [other_start, other_end) się nakładają.
+    """
+    return start == other_start or (other_start < end and start < other_end)
+
+
+def find(user_id, start, end, exclude_pk=None):
+    """
+    Sesja użytkownika nakładająca się na przedział [start, end) albo None.
+    """
+    sessions = TrainingSession.objects.filter(created_by_id=user_id)
+    if exclude_pk is not None:
+        sessions = sessions.exclude(pk=exclude_pk)
+    inside = (
+        sessions.filter(start__gt=start, start__lt=end).order_by("start").first()
+    )
+    if inside is not None:
+        return inside
+    before = sessions.filter(start__lte=start).order_by("-start").first()
+    if before is not None and intersects(start, end, before.start, before.end):
+        return before
+    return None
+
+
+def clusters(user_id):
+    """
+    Grupy nakładających się sesji użytkownika – jedno przejście po sesjach
+    posortowanych po początku. Zwraca listy (pk, start, end, exercise_count,
+    total_volume); pierwsza sesja grupy jest najwcześniejsza.
+    """
+    group, group_start, group_end = [], None, None
+    rows = (
+        TrainingSession.objects.filter(created_by_id=user_id)
+        .order_by("start", "id")
+        .values_list("pk", "start", "end", "exercise_count", "total_volume")
+    )
+    for row in rows.iterator():
+        _, start, end, *_ = row
+        if group and (start < group_end or start == group_start):
+            group.append(row)
+            group_end = max(group_end, end)
+            continue
+        if len(group) > 1:
+            yield group
+        group, group_start, group_end = [row], start, end
+    if len(group) > 1:
+        yield group
+
+
+def merge(user_id):
+    """
+    Scala każdą grupę nakładających się sesji użytkownika w jej najwcześniejszą
+    sesję: przedłuża ją do końca grupy, przenosi do niej ćwiczenia pozostałych
+    sesji, a je same usuwa (miękko). Zwraca listę scalonych grup.
+    """
+    with transaction.atomic():
+        groups = list(clusters(user_id))
+        if not groups:
+            return groups
+        now = timezone.now()
+        buckets = set()
+        for group in groups:
+            buckets.update(_merge_group(group, now))
+        rollups.refresh_buckets(sorted(buckets))
+        # Objętość w rankingu liczona jest według początku sesji ćwiczenia.
+        jobs.enqueue_types(
+            "leaderboards.refresh", user_id, {type_id for _, type_id, _ in buckets}
+        )
+        stamps.bump(user_id)
+    return groups
+
+
+def _merge_group(group, now):
+    # Zwraca kubełki agregatów do przeliczenia: okresy przenoszonych ćwiczeń
+    # i okres sesji docelowej (zmienia się też jej czas trwania).
+    keeper_pk, keeper_start, *_ = group[0]
+    end = max(row[2] for row in group)
+    merged = [row[0] for row in group[1:]]
+    exercises = SessionExercise.objects.filter(
+        training_session_id__in=[keeper_pk, *merged]
+    ).order_by()
+    buckets = set()
+    period = rollups.period_start(keeper_start)
+    pairs = exercises.values_list(
+        "created_by_id", "exercise_type_id", "session_start"
+    ).distinct()
+    for user_id, type_id, session_start in pairs:
+        buckets.add((user_id, type_id, rollups.period_start(session_start)))
+        buckets.add((user_id, type_id, period))
+
+    SessionExercise.objects.filter(training_session_id__in=merged).update(
+        training_session_id=keeper_pk, session_start=keeper_start
+    )
+    TrainingSession.objects.filter(pk=keeper_pk).update(
+        end=end,
+        duration_seconds=TrainingSession.duration_between(keeper_start, end),
+        exercise_count=F("exercise_count") + sum(row[3] for row in group[1:]),
+        total_volume=F("total_volume") + sum(row[4] for row in group[1:]),
+    )
+    TrainingSession.objects.filter(pk__in=merged).update(
+        deleted_at=now, exercise_count=0, total_volume=0
+    )
+    return buckets
@@ -0,0 +1,128 @@
+"""
+Paginacja kursorowa (keyset) po parze (data, id) – bez OFFSET.
+
+Kursor koduje wartości klucza sortowania ostatniego (lub pierwszego) wiersza
+strony, więc koszt pobrania dowolnej strony jest taki sam jak pierwszej:
+zapytanie zaczyna od pozycji w indeksie (created_by, data, id) i czyta
+co najwyżej per_page + 1 wierszy.
+"""
+
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Q
+from django.http import Http404
+
+
+PER_PAGE = 50
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+
+def encode_cursor(value: datetime, pk: int) -> str:
+    raw = f"{value.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        value, pk = raw.rsplit("|", 1)
+        value, pk = datetime.fromisoformat(value), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise Http404("Nieprawidłowy kursor strony.")
+    # Kursory z encode_cursor zawsze mają strefę czasową.
+    if value.tzinfo is None:
+        raise Http404("Nieprawidłowy kursor strony.")
+    return value, pk
+
+
+def keyset_page(queryset, params, field, per_page=PER_PAGE) -> KeysetPage:
+    """
+    Zwraca stronę wyników posortowanych malejąco po (field, id).
+
+    params to request.GET: "after" – starsze wiersze niż kursor,
+    "before" – nowsze wiersze niż kursor, brak – najnowsza strona.
+    """
+    rows = list(_page_query(queryset, params, field, per_page))
+    if params.get("before") and len(rows) <= per_page:
+        # Doszliśmy do najnowszych wierszy – pokaż pełną pierwszą stronę.
+        return keyset_page(queryset, {}, field, per_page)
+    return _build_page(rows, params, field, per_page)
+
+
+async def akeyset_page(queryset, params, field, per_page=PER_PAGE) -> KeysetPage:
+    """
+    Asynchroniczna wersja keyset_page (dla widoków async def).
+    """
+    rows = [row async for row in _page_query(queryset, params, field, per_page)]
+    if params.get("before") and len(rows) <= per_page:
+        return await akeyset_page(queryset, {}, field, per_page)
+    return _build_page(rows, params, field, per_page)
+
+
+def _page_query(queryset, params, field, per_page):
+    before = params.get("before")
+    after = params.get("after")
+
+    if before:
+        value, pk = decode_cursor(before)
+        # Warunek "field >= value" wyznacza zakres w indeksie, reszta odsiewa
+        # tylko wiersze z identyczną datą.
+        return (
+            queryset.filter(**{f"{field}__gte": value})
+            .filter(Q(**{f"{field}__gt": value}) | Q(id__gt=pk))
+            .order_by(field, "id")[: per_page + 1]
+        )
+
+    queryset = queryset.order_by(f"-{field}", "-id")
+    if after:
+        value, pk = decode_cursor(after)
+        queryset = queryset.filter(**{f"{field}__lte": value}).filter(
+            Q(**{f"{field}__lt": value}) | Q(id__lt=pk)
+        )
+    return queryset[: per_page + 1]
+
+
+def _build_page(rows, params, field, per_page):
+    if params.get("before"):
+        rows = rows[:per_page][::-1]
+        has_previous = has_next = True
+    else:
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = bool(params.get("after"))
+
+    page = KeysetPage(rows)
+    if rows and has_next:
+        page.next_cursor = encode_cursor(*_key(rows[-1], field))
+    if rows and has_previous:
+        page.previous_cursor = encode_cursor(*_key(rows[0], field))
+    return page
+
+
+def _key(row, field):
+    # Wiersz może być instancją modelu albo słownikiem z .values().
+    if isinstance(row, dict):
+        return row[field], row["id"]
+    return getattr(row, field), row.id
@@ -0,0 +1,339 @@
+"""
+Pomiar żądań: liczba i czas zapytań SQL (z najwolniejszymi zapytaniami i ich
+miejscem wywołania), czas renderowania szablonów, czas widoku i całkowity.
+
+Dwa middleware: RequestProfilingMiddleware na początku MIDDLEWARE mierzy całe
+żądanie, a ViewProfilingMiddleware na końcu – samo wywołanie widoku (bez
+pozostałych middleware i bez renderowania szablonów, liczonego osobno). Oba
+działają synchronicznie i asynchronicznie, więc pod ASGI nie wymuszają
+przełączania łańcucha w tryb synchroniczny.
+
+Zapytania liczy connection.execute_wrapper() założony na połączeniach wątku,
+który je wykonuje: przy żądaniu synchronicznym – bieżącego, przy
+asynchronicznym – wątku sync_to_async (thread_sensitive), w którym handler
+ASGI wykonuje cały kod synchroniczny żądania. Treść StreamingHttpResponse
+(eksport) generowana jest już po powrocie z middleware, więc jest opakowana
+tak samo: jej zapytania trafiają do pomiaru, a log i próbka zapisywane są
+dopiero po wysłaniu całej treści. Nagłówek Server-Timing, wysyłany przed
+treścią, obejmuje tylko część sprzed strumienia.
+
+Włączany ustawieniem TRAINING_PROFILING (zmienna BEFIT_PROFILING=1). Wyłączone
+middleware zgłaszają MiddlewareNotUsed przy starcie, więc Django w ogóle nie
+wstawia ich do łańcucha – koszt to zero. Włączony dopisuje nagłówek
+Server-Timing, loguje jedną linię JSON na żądanie (logger training.profiling)
+i zapisuje próbkę żądań (TRAINING_PROFILING_SAMPLE_RATE) do bufora
+cyklicznego w pamięci procesu, widocznego dla administratora pod
+/monitoring/requests/.
+"""
+
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template import base as template_base
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_SQL_LIMIT = 300
+
+_buffer = deque(maxlen=getattr(settings, "TRAINING_PROFILING_BUFFER_SIZE", 200))
+_lock = threading.Lock()
+_current = ContextVar("training_profile", default=None)
+_template_patch_installed = False
+
+
+def enabled():
+    return getattr(settings, "TRAINING_PROFILING", False)
+
+
+def sample_rate():
+    return getattr(settings, "TRAINING_PROFILING_SAMPLE_RATE", 1.0)
+
+
+def slow_query_count():
+    return getattr(settings, "TRAINING_PROFILING_SLOW_QUERIES", 5)
+
+
+# --- Bufor próbek ---
+
+
+def recent():
+    """
+    Zapisane pomiary, od najnowszego.
+    """
+    with _lock:
+        return list(reversed(_buffer))
+
+
+def clear():
+    with _lock:
+        _buffer.clear()
+
+
+def _store(record):
+    with _lock:
+        _buffer.append(record)
+
+
+# --- Pomiar ---
+
+
+class Profile:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.slow = []
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.view_time = 0.0
+        self._view_started = None
+
+    def start_view(self):
+        self._view_started = (time.perf_counter(), self.template_time)
+
+    def finish_view(self):
+        # Czas od process_view ostatniego middleware do powrotu widoku,
+        # pomniejszony o szablony renderowane w tym czasie.
+        if self._view_started is None:
+            return
+        started, template_time = self._view_started
+        self._view_started = None
+        elapsed = time.perf_counter() - started
+        self.view_time += elapsed - (self.template_time - template_time)
+
+    def execute(self, execute, sql, params, many, context):
+        # Wrapper dla connection.execute_wrapper().
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add_query(sql, time.perf_counter() - started, _call_site())
+
+    def add_query(self, sql, duration, call_site):
+        self.queries += 1
+        self.db_time += duration
+        limit = slow_query_count()
+        if len(self.slow) < limit or duration > self.slow[-1][0]:
+            self.slow.append((duration, sql[:SLOW_QUERY_SQL_LIMIT], call_site))
+            self.slow.sort(key=lambda item: -item[0])
+            del self.slow[limit:]
+
+
+def _call_site():
+    # Pierwsza ramka z kodu projektu (poza Django, bibliotekami i tym modułem).
+    base = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base)
+            and "site-packages" not in filename
+            and filename != __file__
+        ):
+            return (
+                f"{filename[len(base):].lstrip('/')}:{frame.f_lineno} "
+                f"({frame.f_code.co_name})"
+            )
+        frame = frame.f_back
+    return None
+
+
+def _record_queries(profile):
+    # Zakłada wrapper na połączeniach bieżącego wątku; zdejmuje go close().
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(profile.execute))
+    return stack
+
+
+def _install_template_patch():
+    # Szablony renderuje wiele miejsc (render(), render_to_string(), include),
+    # więc mierzymy samo Template.render – tylko najbardziej zewnętrzne
+    # wywołanie, żeby zagnieżdżone szablony nie liczyły się podwójnie.
+    global _template_patch_installed
+    if _template_patch_installed:
+        return
+    original = template_base.Template.render
+
+    def render(self, context):
+        profile = _current.get()
+        if profile is None:
+            return original(self, context)
+        profile.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            profile.template_depth -= 1
+            if not profile.template_depth:
+                profile.template_time += time.perf_counter() - started
+
+    template_base.Template.render = render
+    _template_patch_installed = True
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def server_timing(record):
+    # Wartości nagłówków muszą być w ASCII/latin-1 – opisy bez polskich znaków.
+    return ", ".join(
+        [
+            f'db;dur={record["db_ms"]};desc="SQL: {record["queries"]}"',
+            f'tpl;dur={record["template_ms"]};desc="Szablony"',
+            f'view;dur={record["view_ms"]};desc="Widok"',
+            f'total;dur={record["total_ms"]};desc="Razem"',
+        ]
+    )
+
+
+class RequestProfilingMiddleware:
+    """
+    Powinien stać na początku MIDDLEWARE, żeby czas całkowity obejmował
+    pozostałe middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        _install_template_patch()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = Profile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            with _record_queries(profile):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, profile, started)
+
+    async def __acall__(self, request):
+        profile = Profile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        # Zapytania widoku i middleware idą przez wątek thread_sensitive
+        # tego żądania – tam zakładamy i zdejmujemy wrapper.
+        queries = await sync_to_async(_record_queries)(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(queries.close)()
+            _current.reset(token)
+        return self._finish(request, response, profile, started)
+
+    def _finish(self, request, response, profile, started):
+        record = self._record(request, response, profile, started)
+        response["Server-Timing"] = server_timing(record)
+        if response.streaming:
+            wrap = self._astream if response.is_async else self._stream
+            response.streaming_content = wrap(
+                response.streaming_content, request, response, profile, started
+            )
+        else:
+            self._save(record)
+        return response
+
+    def _stream(self, content, request, response, profile, started):
+        try:
+            with _record_queries(profile):
+                yield from content
+        finally:
+            self._save(self._record(request, response, profile, started))
+
+    async def _astream(self, content, request, response, profile, started):
+        queries = await sync_to_async(_record_queries)(profile)
+        try:
+            async for part in content:
+                yield part
+        finally:
+            await sync_to_async(queries.close)()
+            self._save(self._record(request, response, profile, started))
+
+    def _record(self, request, response, profile, started):
+        return {
+            "at": timezone.now().isoformat(),
+            "method": request.method,
+            "path": request.get_full_path(),
+            "view": getattr(request.resolver_match, "view_name", None),
+            "status": response.status_code,
+            # Bez dociągania użytkownika, jeśli widok go nie potrzebował.
+            "user": getattr(getattr(request, "_cached_user", None), "pk", None),
+            "queries": profile.queries,
+            "db_ms": _ms(profile.db_time),
+            "template_ms": _ms(profile.template_time),
+            "view_ms": _ms(profile.view_time),
+            "total_ms": _ms(time.perf_counter() - started),
+            "slow_queries": [
+                {"ms": _ms(duration), "sql": sql, "call_site": call_site}
+                for duration, sql, call_site in profile.slow
+            ],
+        }
+
+    def _save(self, record):
+        logger.info(json.dumps(record, ensure_ascii=False))
+        if random.random() < sample_rate():
+            _store(record)
+
+
+class ViewProfilingMiddleware:
+    """
+    Musi stać na końcu MIDDLEWARE: jego process_view wywoływane jest tuż
+    przed widokiem, a odpowiedź dostaje zaraz po jego powrocie.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            return self.get_response(request)
+        finally:
+            self._finish_view()
+
+    async def __acall__(self, request):
+        try:
+            return await self.get_response(request)
+        finally:
+            self._finish_view()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = _current.get()
+        if profile is not None:
+            profile.start_view()
+
+    def _finish_view(self):
+        profile = _current.get()
+        if profile is not None:
+            profile.finish_view()
@@ -0,0 +1,162 @@
+"""
+Rekordy osobiste (PersonalRecord) – maks. ciężar, najlepszy szacowany 1RM
+i maks. objętość na (użytkownik, typ ćwiczenia).
+
+Nowe ćwiczenia są porównywane z bieżącym rekordem w pamięci (także zbiorczo,
+stałą liczbą zapytań). Edycja lub usunięcie ćwiczenia, które jest źródłem
+rekordu, przelicza wyłącznie wycinek (użytkownik, typ ćwiczenia).
+"""
+
+from django.db.models import Case, F, FloatField, Q, When
+from django.db.models.functions import Cast
+
+from .models import PersonalRecord, SessionExercise
+
+
+# Brzycki jest dokładniejszy przy małej liczbie powtórzeń, ale rozbiega się
+# powyżej ~10; wtedy używamy wzoru Epleya. Jedno powtórzenie to po prostu ciężar.
+BRZYCKI_MAX_REPS = 10
+
+_WEIGHT = Cast("weight", FloatField())
+_REPS = Cast("reps", FloatField())
+
+METRICS = {
+    "max_weight": _WEIGHT,
+    "best_e1rm": Case(
+        When(reps=1, then=_WEIGHT),
+        When(reps__lte=BRZYCKI_MAX_REPS, then=_WEIGHT * 36.0 / (37.0 - _REPS)),
+        default=_WEIGHT * (1.0 + _REPS / 30.0),
+        output_field=FloatField(),
+    ),
+    "max_volume": _WEIGHT * F("sets") * F("reps"),
+}
+
+UPDATE_FIELDS = [name for metric in METRICS for name in (metric, f"{metric}_exercise")]
+
+
+def estimated_1rm(weight, reps):
+    """
+    Szacowany ciężar maksymalny na jedno powtórzenie (Brzycki / Epley).
+    """
+    if reps == 1:
+        return float(weight)
+    if reps <= BRZYCKI_MAX_REPS:
+        return weight * 36.0 / (37.0 - reps)
+    return weight * (1.0 + reps / 30.0)
+
+
+def _metric_values(exercise):
+    return {
+        "max_weight": float(exercise.weight),
+        "best_e1rm": estimated_1rm(exercise.weight, exercise.reps),
+        "max_volume": float(exercise.weight * exercise.sets * exercise.reps),
+    }
+
+
+def _upsert(records):
+    if records:
+        PersonalRecord.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=["created_by", "exercise_type"],
+            update_fields=UPDATE_FIELDS,
+        )
+
+
+def apply_new(exercises):
+    """
+    Uwzględnia nowe (lub poprawione w górę) ćwiczenia w rekordach: jedno
+    zapytanie o bieżące rekordy i jeden zbiorczy upsert zmienionych.
+    """
+    best = {}
+    for exercise in exercises:
+        key = (exercise.created_by_id, exercise.exercise_type_id)
+        candidate = best.setdefault(key, {})
+        for metric, value in _metric_values(exercise).items():
+            if metric not in candidate or value > candidate[metric][0]:
+                candidate[metric] = (value, exercise.pk)
+    if not best:
+        return
+
+    existing = {
+        (r.created_by_id, r.exercise_type_id): r
+        for r in PersonalRecord.objects.filter(
+            created_by_id__in={user_id for user_id, _ in best},
+            exercise_type_id__in={type_id for _, type_id in best},
+        )
+    }
+    changed = []
+    for (user_id, type_id), candidate in best.items():
+        current = existing.get((user_id, type_id))
+        record = PersonalRecord(created_by_id=user_id, exercise_type_id=type_id)
+        dirty = current is None
+        for metric, (value, source_id) in candidate.items():
+            if current is not None and value <= getattr(current, metric):
+                value = getattr(current, metric)
+                source_id = getattr(current, f"{metric}_exercise_id")
+            else:
+                dirty = True
+            setattr(record, metric, value)
+            setattr(record, f"{metric}_exercise_id", source_id)
+        if dirty:
+            changed.append(record)
+    _upsert(changed)
+
+
+def recompute(user_id, exercise_type_ids):
+    """
+    Przelicza od nowa rekordy podanych typów ćwiczeń jednego użytkownika.
+    """
+    records = []
+    empty = []
+    for type_id in set(exercise_type_ids):
+        rows = SessionExercise.objects.filter(
+            created_by_id=user_id, exercise_type_id=type_id
+        )
+        record = PersonalRecord(created_by_id=user_id, exercise_type_id=type_id)
+        for metric, expression in METRICS.items():
+            top = (
+                rows.annotate(value=expression)
+                .order_by("-value", "id")
+                .values_list("value", "id")
+                .first()
+            )
+            if top is None:
+                # Brak ćwiczeń tego typu – rekord znika.
+                empty.append(type_id)
+                break
+            setattr(record, metric, top[0])
+            setattr(record, f"{metric}_exercise_id", top[1])
+        else:
+            records.append(record)
+
+    _upsert(records)
+    if empty:
+        PersonalRecord.objects.filter(
+            created_by_id=user_id, exercise_type_id__in=empty
+        ).delete()
+
+
+def is_source(exercise_id):
+    """
+    Czy ćwiczenie jest źródłem któregoś rekordu.
+    """
+    return PersonalRecord.objects.filter(
+        Q(max_weight_exercise_id=exercise_id)
+        | Q(best_e1rm_exercise_id=exercise_id)
+        | Q(max_volume_exercise_id=exercise_id)
+    ).exists()
+
+
+def sources_in_session(session_id):
+    """
+    Pary (użytkownik, typ ćwiczenia), których rekordy pochodzą z danej sesji.
+    """
+    ids = SessionExercise.objects.filter(training_session_id=session_id).values("id")
+    return set(
+        PersonalRecord.objects.filter(
+            Q(max_weight_exercise_id__in=ids)
+            | Q(best_e1rm_exercise_id__in=ids)
+            | Q(max_volume_exercise_id__in=ids)
+        ).values_list("created_by_id", "exercise_type_id")
+    )
@@ -0,0 +1,290 @@
+"""
+Dzienne agregaty ćwiczeń (DailyExerciseStats).
+
+Kubełek identyfikuje trójka (użytkownik, typ ćwiczenia, dzień), gdzie okresem
+jest jeden dzień w bieżącej strefie czasowej – z dni składają się dokładnie
+tygodnie i miesiące, a kubełki dzienne w statystykach czytane są wprost.
+Dodanie ćwiczenia aktualizuje kubełek przyrostowo, natomiast edycja i usuwanie
+przeliczają od nowa tylko te kubełki, których zmiana dotyczy.
+"""
+
+import math
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Count,
+    DurationField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Max,
+    OuterRef,
+    Q,
+    Sum,
+)
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from . import records
+from .models import DailyExerciseStats, SessionExercise
+
+
+VOLUME = F("weight") * F("sets") * F("reps")
+DURATION = ExpressionWrapper(
+    F("training_session__end") - F("training_session__start"),
+    output_field=DurationField(),
+)
+# Sesję do kubełka wnosi tylko pierwsze ćwiczenie danego typu w tej sesji.
+FIRST_IN_SESSION = Q(
+    ~Exists(
+        SessionExercise.objects.filter(
+            training_session=OuterRef("training_session"),
+            exercise_type=OuterRef("exercise_type"),
+            id__lt=OuterRef("id"),
+        )
+    )
+)
+
+AGGREGATES = {
+    "total_volume": Sum(VOLUME, output_field=FloatField()),
+    "set_count": Sum("sets"),
+    "rep_count": Sum(F("sets") * F("reps")),
+    "max_weight": Max("weight"),
+    "best_e1rm": Max(records.METRICS["best_e1rm"]),
+    "session_count": Count("id", filter=FIRST_IN_SESSION),
+    "total_duration": Sum(DURATION, filter=FIRST_IN_SESSION),
+}
+
+# Okres w bazie – to samo co period_start() w Pythonie.
+PERIOD = TruncDate("session_start")
+
+
+def period_start(value):
+    """
+    Okres (dzień), do którego należy podana data i czas – w bieżącej strefie
+    czasowej, tak samo jak TruncDate w bazie.
+    """
+    return timezone.localtime(value).date()
+
+
+def period_bounds(period):
+    """
+    Zakres [początek, koniec) okresu jako świadome daty i czasy.
+    """
+    start = timezone.make_aware(datetime.combine(period, time.min))
+    end = timezone.make_aware(datetime.combine(period + timedelta(days=1), time.min))
+    return start, end
+
+
+def add_exercise(exercise, start):
+    """
+    Przyrostowe dodanie nowego ćwiczenia do jego kubełka.
+    """
+    period = period_start(start)
+    volume = exercise.weight * exercise.sets * exercise.reps
+    e1rm = records.estimated_1rm(exercise.weight, exercise.reps)
+    first_in_session = not SessionExercise.objects.filter(
+        training_session_id=exercise.training_session_id,
+        exercise_type_id=exercise.exercise_type_id,
+        id__lt=exercise.id,
+    ).exists()
+    session = exercise.training_session
+    duration = session.end - session.start if first_in_session else timedelta()
+    bucket = DailyExerciseStats.objects.filter(
+        created_by_id=exercise.created_by_id,
+        exercise_type_id=exercise.exercise_type_id,
+        period_start=period,
+    )
+    delta = {
+        "total_volume": F("total_volume") + volume,
+        "set_count": F("set_count") + exercise.sets,
+        "rep_count": F("rep_count") + exercise.sets * exercise.reps,
+        "max_weight": Greatest(F("max_weight"), exercise.weight),
+        "best_e1rm": Greatest(F("best_e1rm"), e1rm),
+        "session_count": F("session_count") + int(first_in_session),
+        "total_duration": F("total_duration") + duration,
+    }
+    if bucket.update(**delta):
+        return
+
+    try:
+        with transaction.atomic():
+            DailyExerciseStats.objects.create(
+                created_by_id=exercise.created_by_id,
+                exercise_type_id=exercise.exercise_type_id,
+                period_start=period,
+                total_volume=volume,
+                set_count=exercise.sets,
+                rep_count=exercise.sets * exercise.reps,
+                max_weight=exercise.weight,
+                best_e1rm=e1rm,
+                session_count=int(first_in_session),
+                total_duration=duration,
+            )
+    except IntegrityError:
+        # Kubełek utworzył w międzyczasie równoległy zapis.
+        bucket.update(**delta)
+
+
+def refresh_period(user_id, period, exercise_type_ids):
+    """
+    Przelicza kubełki jednego użytkownika z jednego okresu dla podanych typów
+    ćwiczeń – stała liczba zapytań niezależnie od liczby typów: agregacja,
+    zbiorczy upsert niepustych kubełków i usunięcie pustych.
+    """
+    exercise_type_ids = set(exercise_type_ids)
+    since, until = period_bounds(period)
+    rows = (
+        SessionExercise.objects.filter(
+            created_by_id=user_id,
+            exercise_type_id__in=exercise_type_ids,
+            session_start__gte=since,
+            session_start__lt=until,
+        )
+        .order_by()
+        .values("exercise_type_id")
+        .annotate(**AGGREGATES)
+    )
+    buckets = [
+        DailyExerciseStats(created_by_id=user_id, period_start=period, **row)
+        for row in rows
+    ]
+    if buckets:
+        DailyExerciseStats.objects.bulk_create(
+            buckets,
+            update_conflicts=True,
+            unique_fields=["created_by", "period_start", "exercise_type"],
+            update_fields=list(AGGREGATES),
+        )
+    empty = exercise_type_ids - {b.exercise_type_id for b in buckets}
+    if empty:
+        DailyExerciseStats.objects.filter(
+            created_by_id=user_id, period_start=period, exercise_type_id__in=empty
+        ).delete()
+
+
+def refresh_bucket(user_id, exercise_type_id, period):
+    """
+    Przelicza jeden kubełek z surowych danych (lub usuwa go, gdy jest pusty).
+    """
+    refresh_period(user_id, period, [exercise_type_id])
+
+
+def refresh_buckets(keys):
+    periods = {}
+    for user_id, exercise_type_id, period in keys:
+        periods.setdefault((user_id, period), set()).add(exercise_type_id)
+    for (user_id, period), exercise_type_ids in periods.items():
+        refresh_period(user_id, period, exercise_type_ids)
+
+
+def refresh_ranges(ranges):
+    """
+    Przelicza kubełki w zakresach {użytkownik: (typy ćwiczeń, od, do)} – jedno
+    zapytanie agregujące i jeden zbiorczy upsert niezależnie od liczby dni
+    i użytkowników. Nie usuwa kubełków, więc nadaje się tylko po dopisaniu
+    ćwiczeń (import).
+    """
+    if not ranges:
+        return
+    condition = Q()
+    for user_id, (exercise_type_ids, since, until) in ranges.items():
+        condition |= Q(
+            created_by_id=user_id,
+            exercise_type_id__in=exercise_type_ids,
+            session_start__gte=since,
+            session_start__lt=until,
+        )
+    rows = (
+        SessionExercise.objects.filter(condition)
+        .order_by()
+        .values("created_by_id", "exercise_type_id", period_start=PERIOD)
+        .annotate(**AGGREGATES)
+    )
+    DailyExerciseStats.objects.bulk_create(
+        [DailyExerciseStats(**row) for row in rows],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["created_by", "period_start", "exercise_type"],
+        update_fields=list(AGGREGATES),
+    )
+
+
+def compute_all():
+    """
+    Agregaty wszystkich kubełków policzone jednym zapytaniem z surowych danych.
+    """
+    rows = (
+        SessionExercise.objects.order_by()
+        .values(
+            "created_by_id",
+            "exercise_type_id",
+            period=PERIOD,
+        )
+        .annotate(**AGGREGATES)
+    )
+    for row in rows.iterator(chunk_size=2000):
+        key = (
+            row.pop("created_by_id"),
+            row.pop("exercise_type_id"),
+            row.pop("period"),
+        )
+        yield key, row
+
+
+def rebuild_all(batch_size=1000):
+    """
+    Odbudowuje całą tabelę agregatów od zera (w jednej transakcji).
+    Zwraca liczbę utworzonych kubełków.
+    """
+    created = 0
+    with transaction.atomic():
+        DailyExerciseStats.objects.all().delete()
+        batch = []
+        for (user_id, exercise_type_id, period), totals in compute_all():
+            batch.append(
+                DailyExerciseStats(
+                    created_by_id=user_id,
+                    exercise_type_id=exercise_type_id,
+                    period_start=period,
+                    **totals,
+                )
+            )
+            if len(batch) >= batch_size:
+                DailyExerciseStats.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        DailyExerciseStats.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def find_mismatches():
+    """
+    Porównuje tabelę agregatów z surowymi danymi.
+    Zwraca listę (klucz, oczekiwane, zapisane) dla kubełków, które się różnią.
+    """
+    fields = tuple(AGGREGATES)
+    stored = {
+        (row[0], row[1], row[2]): dict(zip(fields, row[3:]))
+        for row in DailyExerciseStats.objects.order_by().values_list(
+            "created_by_id", "exercise_type_id", "period_start", *fields
+        )
+    }
+    mismatches = []
+    for key, expected in compute_all():
+        actual = stored.pop(key, None)
+        if actual is None or not all(
+            _same(expected[name], actual[name]) for name in fields
+        ):
+            mismatches.append((key, expected, actual))
+    mismatches.extend((key, None, actual) for key, actual in stored.items())
+    return mismatches
+
+
+def _same(expected, actual):
+    if isinstance(expected, timedelta):
+        return expected == actual
+    return math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-6)
@@ -0,0 +1,187 @@
+"""
+Kierowanie zapytań aplikacji training między bazę główną a repliki.
+
+Odczyty trafiają do replik (settings.TRAINING_READ_REPLICAS) tylko w trakcie
+żądań GET/HEAD/OPTIONS – decyduje o tym ReplicaRoutingMiddleware. Zapisy,
+odczyty w transakcji, polecenia zarządzające i wszystko poza żądaniem idą do
+bazy głównej.
+
+Repliki mogą być opóźnione, dlatego widoki zapisujące (dekorator
+pins_primary) przypinają użytkownika do bazy głównej na
+TRAINING_PRIMARY_PIN_SECONDS sekund: w tym czasie także jego odczyty idą do
+bazy głównej i świeżo zapisane ćwiczenie nie znika z listy. Znacznik
+przypięcia leży w sesji, więc działa we wszystkich procesach.
+"""
+
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.decorators import sync_and_async_middleware
+
+
+APP_LABEL = "training"
+PIN_SESSION_KEY = "_training_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# True – żądanie może czytać z repliki; poza żądaniem zawsze baza główna.
+_use_replica = ContextVar("training_use_replica", default=False)
+
+
+def replicas():
+    return list(getattr(settings, "TRAINING_READ_REPLICAS", []))
+
+
+def pin_seconds():
+    return getattr(settings, "TRAINING_PRIMARY_PIN_SECONDS", 10)
+
+
+# --- Przypinanie do bazy głównej ---
+
+
+def pin(request):
+    """
+    Kieruje odczyty użytkownika do bazy głównej przez najbliższe sekundy.
+    """
+    if hasattr(request, "session"):
+        request.session[PIN_SESSION_KEY] = time.time() + pin_seconds()
+
+
+def is_pinned(request):
+    session = getattr(request, "session", None)
+    if session is None:
+        return False
+    return session.get(PIN_SESSION_KEY, 0) > time.time()
+
+
+async def ais_pinned(request):
+    """
+    Asynchroniczna wersja is_pinned() – wczytanie sesji z bazy nie może się
+    odbyć synchronicznie w pętli zdarzeń.
+    """
+    session = getattr(request, "session", None)
+    if session is None:
+        return False
+    return await session.aget(PIN_SESSION_KEY, 0) > time.time()
+
+
+def pins_primary(view):
+    """
+    Dla widoków zapisujących: po udanym żądaniu innym niż GET/HEAD/OPTIONS
+    użytkownik jest przypinany do bazy głównej (czytanie własnych zapisów).
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin(request)
+        return response
+
+    return wrapper
+
+
+def reading_from_replica():
+    """
+    Czy odczyty w bieżącym kontekście mogą trafiać do repliki.
+    """
+    return _use_replica.get() and bool(replicas())
+
+
+def cache_timeout(timeout):
+    """
+    Czas życia w cache dla danych wczytanych w bieżącym kontekście. Replika
+    może jeszcze nie mieć ostatnich zapisów, a klucze z wersją danych są
+    podbijane zaraz po zapisie – wynik z repliki zapamiętany pod nową wersją
+    żyje więc najwyżej tyle, ile przypięcie do bazy głównej.
+    """
+    if not reading_from_replica():
+        return timeout
+    if timeout is None:
+        return pin_seconds()
+    return min(timeout, pin_seconds())
+
+
+def allows_replica(request):
+    # Bez replik nie ma czego rozstrzygać – sesja nie jest nawet wczytywana.
+    if not replicas() or request.method not in SAFE_METHODS:
+        return False
+    return not is_pinned(request)
+
+
+async def aallows_replica(request):
+    if not replicas() or request.method not in SAFE_METHODS:
+        return False
+    return not await ais_pinned(request)
+
+
+@sync_and_async_middleware
+def ReplicaRoutingMiddleware(get_response):
+    """
+    Zezwala na odczyt z replik na czas obsługi bezpiecznego żądania
+    nieprzypiętego użytkownika. Musi stać po SessionMiddleware.
+    """
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            token = _use_replica.set(await aallows_replica(request))
+            try:
+                return await get_response(request)
+            finally:
+                _use_replica.reset(token)
+
+        markcoroutinefunction(middleware)
+        return middleware
+
+    def middleware(request):
+        token = _use_replica.set(allows_replica(request))
+        try:
+            return get_response(request)
+        finally:
+            _use_replica.reset(token)
+
+    return middleware
+
+
+# --- Router ---
+
+
+class PrimaryReplicaRouter:
+    """
+    Router modeli aplikacji training: odczyt z losowej repliki, gdy pozwala
+    na to bieżące żądanie, zapis zawsze do bazy głównej.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != APP_LABEL:
+            return None
+        available = replicas()
+        if (
+            not available
+            or not _use_replica.get()
+            # Odczyt w transakcji musi widzieć jej własne zapisy.
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(available)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != APP_LABEL:
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Repliki są kopiami bazy głównej – schemat dostają razem z danymi.
+        if db in replicas():
+            return False
+        return None
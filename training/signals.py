@@ -0,0 +1,326 @@
+"""
+Sygnały utrzymujące dane pochodne (agregaty dzienne, rekordy osobiste,
+rankingi, kopię startu sesji w SessionExercise, znacznik zmian użytkownika)
+w zgodzie z surowymi rekordami – niezależnie od tego, czy zmiana przyszła
+z widoku, czy z panelu admina.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import catalogue, jobs, records, rollups, stamps, summaries
+from .models import ExerciseType, SessionExercise, TrainingDataStamp, TrainingSession
+
+
+def _origin_model(origin):
+    # origin to instancja albo QuerySet, od którego zaczęło się usuwanie.
+    return getattr(origin, "model", type(origin))
+
+
+# --- Wykonane ćwiczenia ---
+
+
+@receiver(pre_save, sender=SessionExercise)
+def remember_exercise_bucket(sender, instance, raw=False, **kwargs):
+    # Jedno zapytanie o poprzedni stan – dla kubełków i podsumowania sesji.
+    instance._old_bucket = None
+    instance._old_summary = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    old = (
+        SessionExercise.objects.filter(pk=instance.pk)
+        .order_by()
+        .values_list(
+            "created_by_id",
+            "exercise_type_id",
+            "session_start",
+            "training_session_id",
+            "weight",
+            "sets",
+            "reps",
+        )
+        .first()
+    )
+    if old:
+        instance._old_bucket = (old[0], old[1], rollups.period_start(old[2]))
+        instance._old_summary = (old[3], old[4] * old[5] * old[6])
+
+
+@receiver(post_save, sender=SessionExercise)
+def update_exercise_bucket(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        rollups.add_exercise(instance, instance.session_start)
+        return
+    keys = [
+        (
+            instance.created_by_id,
+            instance.exercise_type_id,
+            rollups.period_start(instance.session_start),
+        )
+    ]
+    if instance._old_bucket:
+        keys.append(instance._old_bucket)
+    rollups.refresh_buckets(keys)
+
+
+@receiver(pre_delete, sender=SessionExercise)
+def remember_deleted_exercise_bucket(sender, instance, origin=None, **kwargs):
+    instance._old_bucket = None
+    # Przy usuwaniu kaskadowym (sesja, użytkownik, typ ćwiczenia) kubełki
+    # obsługuje obiekt, od którego zaczęło się usuwanie.
+    if _origin_model(origin) is not SessionExercise:
+        return
+    if instance.session_start:
+        instance._old_bucket = (
+            instance.created_by_id,
+            instance.exercise_type_id,
+            rollups.period_start(instance.session_start),
+        )
+
+
+@receiver(post_delete, sender=SessionExercise)
+def refresh_deleted_exercise_bucket(sender, instance, **kwargs):
+    if getattr(instance, "_old_bucket", None):
+        rollups.refresh_buckets([instance._old_bucket])
+
+
+@receiver(post_save, sender=SessionExercise)
+def update_personal_records(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = instance._old_bucket
+    if not created and old and records.is_source(instance.pk):
+        # Ćwiczenie było źródłem rekordu – mogło go stracić, więc wycinek
+        # (użytkownik, typ) liczymy od nowa (już z nowymi wartościami).
+        jobs.enqueue_types("records.recompute", old[0], [old[1]])
+        if old[:2] == (instance.created_by_id, instance.exercise_type_id):
+            return
+    records.apply_new([instance])
+
+
+@receiver(pre_delete, sender=SessionExercise)
+def remember_deleted_record_source(sender, instance, origin=None, **kwargs):
+    instance._was_record = _origin_model(origin) is SessionExercise and (
+        records.is_source(instance.pk)
+    )
+
+
+@receiver(post_delete, sender=SessionExercise)
+def recompute_deleted_record_source(sender, instance, **kwargs):
+    if getattr(instance, "_was_record", False):
+        jobs.enqueue_types(
+            "records.recompute", instance.created_by_id, [instance.exercise_type_id]
+        )
+
+
+@receiver(post_save, sender=SessionExercise)
+def update_session_summary(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    volume = summaries.volume(instance)
+    if created:
+        summaries.add(instance.training_session_id, 1, volume)
+        return
+    old = instance._old_summary
+    if old is None:
+        return
+    old_session, old_volume = old
+    if old_session == instance.training_session_id:
+        summaries.add(old_session, 0, volume - old_volume)
+    else:
+        summaries.add(old_session, -1, -old_volume)
+        summaries.add(instance.training_session_id, 1, volume)
+
+
+@receiver(post_delete, sender=SessionExercise)
+def update_deleted_session_summary(sender, instance, origin=None, **kwargs):
+    # Przy usuwaniu sesji lub użytkownika sesja znika razem z ćwiczeniami,
+    # a miękko usunięte ćwiczenie odjęto już od podsumowania.
+    if _origin_model(origin) in (TrainingSession, get_user_model()):
+        return
+    if instance.deleted_at is None:
+        summaries.add(instance.training_session_id, -1, -summaries.volume(instance))
+
+
+# --- Sesje treningowe ---
+
+
+def _session_buckets(session_id, period):
+    pairs = (
+        SessionExercise.objects.filter(training_session_id=session_id)
+        .order_by()
+        .values_list("created_by_id", "exercise_type_id")
+        .distinct()
+    )
+    return [(user_id, type_id, period) for user_id, type_id in pairs]
+
+
+@receiver(pre_save, sender=TrainingSession)
+def remember_session_times(sender, instance, raw=False, **kwargs):
+    instance._old_times = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._old_times = (
+        TrainingSession.objects.filter(pk=instance.pk)
+        .values_list("start", "end")
+        .first()
+    )
+
+
+@receiver(post_save, sender=TrainingSession)
+def propagate_session_times(sender, instance, created, raw=False, **kwargs):
+    old_times = getattr(instance, "_old_times", None)
+    if raw or created or old_times is None:
+        return
+    old_start, old_end = old_times
+    if (old_start, old_end) == (instance.start, instance.end):
+        return
+    if old_start != instance.start:
+        SessionExercise.objects.filter(training_session=instance).update(
+            session_start=instance.start
+        )
+
+    # Zmienił się czas trwania sesji, a może i jej okres.
+    old_period = rollups.period_start(old_start)
+    new_period = rollups.period_start(instance.start)
+    keys = _session_buckets(instance.pk, new_period)
+    if new_period != old_period:
+        keys += _session_buckets(instance.pk, old_period)
+    rollups.refresh_buckets(keys)
+
+
+@receiver(pre_delete, sender=TrainingSession)
+def remember_deleted_session_buckets(sender, instance, origin=None, **kwargs):
+    instance._old_buckets = []
+    if _origin_model(origin) is not TrainingSession:
+        return
+    instance._old_buckets = _session_buckets(
+        instance.pk, rollups.period_start(instance.start)
+    )
+
+
+@receiver(post_delete, sender=TrainingSession)
+def refresh_deleted_session_buckets(sender, instance, **kwargs):
+    if getattr(instance, "_old_buckets", None):
+        rollups.refresh_buckets(instance._old_buckets)
+
+
+@receiver(pre_delete, sender=TrainingSession)
+def remember_deleted_session_records(sender, instance, origin=None, **kwargs):
+    instance._record_pairs = set()
+    if _origin_model(origin) is TrainingSession:
+        instance._record_pairs = records.sources_in_session(instance.pk)
+
+
+@receiver(post_delete, sender=TrainingSession)
+def recompute_deleted_session_records(sender, instance, **kwargs):
+    type_ids = {}
+    for user_id, type_id in getattr(instance, "_record_pairs", ()):
+        type_ids.setdefault(user_id, set()).add(type_id)
+    for user_id, types in type_ids.items():
+        jobs.enqueue_types("records.recompute", user_id, types)
+
+
+# --- Rankingi ---
+# Odbiorniki zarejestrowane po rekordach osobistych, więc ich zadania trafiają
+# do kolejki po zadaniach rekordów (wynik 1RM w rankingu to kopia rekordu;
+# przeliczenie rekordu i tak odświeża też ranking).
+
+
+@receiver(post_save, sender=SessionExercise)
+def refresh_exercise_leaderboards(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    jobs.enqueue_types(
+        "leaderboards.refresh", instance.created_by_id, [instance.exercise_type_id]
+    )
+    old = instance._old_bucket
+    if old and old[:2] != (instance.created_by_id, instance.exercise_type_id):
+        jobs.enqueue_types("leaderboards.refresh", old[0], [old[1]])
+
+
+@receiver(post_delete, sender=SessionExercise)
+def refresh_deleted_exercise_leaderboards(sender, instance, origin=None, **kwargs):
+    if _origin_model(origin) is SessionExercise:
+        jobs.enqueue_types(
+            "leaderboards.refresh",
+            instance.created_by_id,
+            [instance.exercise_type_id],
+        )
+
+
+def _session_types(session_id):
+    return set(
+        SessionExercise.objects.filter(training_session_id=session_id)
+        .order_by()
+        .values_list("exercise_type_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver(post_save, sender=TrainingSession)
+def refresh_session_leaderboards(sender, instance, created, raw=False, **kwargs):
+    # Przesunięcie sesji może wnieść jej ćwiczenia do okna objętości albo
+    # je z niego wyjąć.
+    old_times = getattr(instance, "_old_times", None)
+    if raw or created or old_times is None or old_times[0] == instance.start:
+        return
+    jobs.enqueue_types(
+        "leaderboards.refresh", instance.created_by_id, _session_types(instance.pk)
+    )
+
+
+@receiver(pre_delete, sender=TrainingSession)
+def remember_deleted_session_types(sender, instance, origin=None, **kwargs):
+    instance._leaderboard_types = set()
+    if _origin_model(origin) is TrainingSession:
+        instance._leaderboard_types = _session_types(instance.pk)
+
+
+@receiver(post_delete, sender=TrainingSession)
+def refresh_deleted_session_leaderboards(sender, instance, **kwargs):
+    jobs.enqueue_types(
+        "leaderboards.refresh",
+        instance.created_by_id,
+        getattr(instance, "_leaderboard_types", ()),
+    )
+
+
+# --- Znacznik zmian ---
+
+
+@receiver(post_save, sender=get_user_model())
+def create_stamp(sender, instance, created, raw=False, **kwargs):
+    # Znacznik istnieje od początku, więc podbicie wersji to zawsze jeden UPDATE.
+    if created and not raw:
+        TrainingDataStamp.objects.create(user=instance, modified_at=timezone.now())
+
+
+@receiver(post_save, sender=SessionExercise)
+@receiver(post_save, sender=TrainingSession)
+def bump_stamp_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        stamps.bump(instance.created_by_id)
+
+
+@receiver(post_delete, sender=SessionExercise)
+@receiver(post_delete, sender=TrainingSession)
+def bump_stamp_on_delete(sender, instance, origin=None, **kwargs):
+    if _origin_model(origin) is sender:
+        stamps.bump(instance.created_by_id)
+
+
+@receiver(post_save, sender=ExerciseType)
+@receiver(post_delete, sender=ExerciseType)
+def bump_catalogue_version(sender, raw=False, **kwargs):
+    # Unieważnia zapamiętany katalog; nazwy typów są też częścią danych
+    # każdego użytkownika, więc wersja katalogu wchodzi do ich ETag.
+    # Po zatwierdzeniu transakcji, żeby nikt nie zapamiętał pod nową wersją
+    # jeszcze starej zawartości tabeli.
+    if not raw:
+        transaction.on_commit(catalogue.bump)
@@ -0,0 +1,67 @@
+"""
+Ustawienia połączeń SQLite (pragmy) z settings.TRAINING_SQLITE_PRAGMAS.
+
+Pragmy obowiązują tylko w ramach połączenia (poza journal_mode=WAL, który
+zapisuje się w pliku bazy), dlatego ustawiane są przy każdym nowym połączeniu
+przez sygnał connection_created. Domyślnie:
+
+- journal_mode=WAL – czytelnicy nie blokują piszącego i odwrotnie,
+- synchronous=NORMAL – w trybie WAL bezpieczne dla spójności bazy, bez fsync
+  przy każdym zatwierdzeniu transakcji,
+- cache_size / mmap_size – większa pamięć podręczna stron i odczyt przez mmap,
+- busy_timeout – czekanie na blokadę zamiast natychmiastowego błędu,
+- temp_store=MEMORY – tymczasowe B-drzewa (sortowanie, GROUP BY) w pamięci.
+"""
+
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+_NAME = re.compile(r"^[a-z_]+$")
+_VALUE = re.compile(r"^(-?\d+|[A-Za-z]+)$")
+
+
+def pragmas():
+    return getattr(settings, "TRAINING_SQLITE_PRAGMAS", {})
+
+
+def statements(values):
+    """
+    Instrukcje PRAGMA dla podanych ustawień (nazwy i wartości sprawdzane,
+    bo trafiają do SQL bez parametrów).
+    """
+    result = []
+    for name, value in values.items():
+        if not _NAME.match(name) or not _VALUE.match(str(value)):
+            raise ImproperlyConfigured(
+                "Nieprawidłowa pragma SQLite w TRAINING_SQLITE_PRAGMAS: "
+                f"{name}={value!r}"
+            )
+        result.append(f"PRAGMA {name} = {value}")
+    return result
+
+
+def current(connection, names):
+    """
+    Bieżące wartości podanych pragm dla połączenia (do diagnostyki i testów).
+    """
+    values = {}
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(f"PRAGMA {name}")
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for statement in statements(pragmas()):
+            cursor.execute(statement)
@@ -0,0 +1,65 @@
+"""
+Per-użytkownikowy znacznik zmian danych treningowych (TrainingDataStamp).
+
+Każdy zapis lub usunięcie sesji albo ćwiczenia podbija wersję i czas ostatniej
+zmiany. Odczyt to jedno zapytanie po kluczu głównym, więc nadaje się do
+odpowiadania na żądania warunkowe bez dotykania samych danych.
+"""
+
+from functools import partial
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import catalogue, fragments
+from .models import TrainingDataStamp
+
+
+def bump(user_id):
+    """
+    Oznacza dane użytkownika jako zmienione (także jego zapamiętane fragmenty
+    stron – po zatwierdzeniu transakcji, jak katalog typów ćwiczeń).
+    """
+    transaction.on_commit(partial(fragments.bump, user_id))
+    now = timezone.now()
+    stamps = TrainingDataStamp.objects.filter(user_id=user_id)
+    if stamps.update(version=F("version") + 1, modified_at=now):
+        return
+    try:
+        with transaction.atomic():
+            TrainingDataStamp.objects.create(user_id=user_id, modified_at=now)
+    except IntegrityError:
+        stamps.update(version=F("version") + 1, modified_at=now)
+
+
+def etag(stamp, *parts):
+    """
+    ETag danych użytkownika: wersja jego danych, wersja katalogu i dodatkowe
+    wyróżniki (np. format eksportu).
+    """
+    return "-".join(
+        [f"{stamp.version}.{catalogue.version()}", *(str(p) for p in parts)]
+    )
+
+
+def get(user_id):
+    """
+    Zwraca znacznik użytkownika; tworzy go, jeśli jeszcze nie istnieje.
+    """
+    stamp = TrainingDataStamp.objects.filter(user_id=user_id).first()
+    if stamp is None:
+        stamp, _ = TrainingDataStamp.objects.get_or_create(
+            user_id=user_id, defaults={"modified_at": timezone.now()}
+        )
+    return stamp
+
+
+def for_request(request):
+    """
+    Znacznik zalogowanego użytkownika, pobrany najwyżej raz na żądanie
+    (funkcje ETag i Last-Modified dekoratora condition wołają go osobno).
+    """
+    if not hasattr(request, "_training_stamp"):
+        request._training_stamp = get(request.user.pk)
+    return request._training_stamp
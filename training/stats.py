@@ -0,0 +1,108 @@
+"""
+Statystyki użytkownika w wybranym zakresie czasu, pogrupowane w kubełki
+(dzień, tydzień, miesiąc) i typy ćwiczeń – agregowane w całości w bazie.
+
+Wszystkie kubełki składane są z gotowych agregatów dziennych
+(DailyExerciseStats), więc koszt zapytania zależy od liczby dni z treningiem
+i typów ćwiczeń, a nie od liczby zapisanych ćwiczeń. Limit zakresu kubełków
+dziennych ogranicza tylko liczbę wierszy na stronie.
+
+Podsumowanie sesji w zakresie czyta kolumny podsumowania zapisane w samych
+sesjach (training/summaries.py), bez sięgania do ćwiczeń.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Avg, Count, DateField, F, Max, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import DailyExerciseStats, TrainingSession
+
+
+# Zakres -> liczba dni (None – cała historia).
+RANGES = {"7d": 7, "28d": 28, "90d": 90, "1y": 365, "all": None}
+BUCKETS = ("day", "week", "month")
+DAY_BUCKET_MAX_DAYS = 90
+
+DEFAULT_RANGE = "28d"
+DEFAULT_BUCKET = "week"
+
+_PERIOD_TRUNC = {"week": TruncWeek, "month": TruncMonth}
+_PERIOD_TOTALS = {
+    "total_volume": Sum("total_volume"),
+    "set_count": Sum("set_count"),
+    "rep_count": Sum("rep_count"),
+    "max_weight": Max("max_weight"),
+    "session_count": Sum("session_count"),
+    "total_duration": Sum("total_duration"),
+}
+
+_SESSION_TOTALS = {
+    "session_count": Count("id"),
+    "exercises": Sum("exercise_count"),
+    "volume": Sum("total_volume"),
+    "max_volume": Max("total_volume"),
+    "avg_duration": Avg("duration_seconds"),
+}
+
+
+def range_start(range_key, bucket, today=None):
+    """
+    Pierwszy dzień zakresu, wyrównany do początku kubełka (żeby pierwszy
+    kubełek nie był ucięty); None dla całej historii.
+    """
+    days = RANGES[range_key]
+    if days is None:
+        return None
+    today = today or timezone.localdate()
+    first = today - timedelta(days=days - 1)
+    if bucket == "week":
+        first -= timedelta(days=first.weekday())
+    elif bucket == "month":
+        first = first.replace(day=1)
+    return first
+
+
+def queryset(user_id, since, bucket):
+    """
+    Wiersze {bucket, exercise_type_id, exercise, ...sumy} od najnowszego
+    kubełka, w kubełku alfabetycznie po nazwie ćwiczenia.
+    """
+    rows = DailyExerciseStats.objects.filter(created_by_id=user_id)
+    if since:
+        rows = rows.filter(period_start__gte=since)
+    if bucket == "day":
+        bucket_expr = F("period_start")
+    else:
+        bucket_expr = _PERIOD_TRUNC[bucket]("period_start", output_field=DateField())
+
+    return (
+        rows.order_by()
+        .values(
+            "exercise_type_id", bucket=bucket_expr, exercise=F("exercise_type__name")
+        )
+        .annotate(**_PERIOD_TOTALS)
+        .order_by("-bucket", "exercise")
+    )
+
+
+def _sessions(user_id, since):
+    sessions = TrainingSession.objects.filter(created_by_id=user_id)
+    if since:
+        sessions = sessions.filter(
+            start__gte=timezone.make_aware(datetime.combine(since, time.min))
+        )
+    return sessions.order_by()
+
+
+def session_summary(user_id, since):
+    """
+    Liczba sesji, ćwiczeń, łączna i największa objętość sesji oraz średni
+    czas trwania (w sekundach) od `since`.
+    """
+    return _sessions(user_id, since).aggregate(**_SESSION_TOTALS)
+
+
+async def asession_summary(user_id, since):
+    return await _sessions(user_id, since).aaggregate(**_SESSION_TOTALS)
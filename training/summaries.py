@@ -0,0 +1,114 @@
+"""
+Podsumowanie sesji zapisane w samej sesji (TrainingSession.exercise_count,
+total_volume, duration_seconds) – lista sesji i statystyki pokazują je bez
+agregowania ćwiczeń.
+
+Liczba ćwiczeń i objętość zmieniane są przyrostowo, jednym UPDATE z F(), przy
+dodaniu, edycji, przeniesieniu do innej sesji i usunięciu ćwiczenia (sygnały,
+zapis całego treningu, import, miękkie usuwanie) – równoległe zapisy do tej
+samej sesji się nie nadpisują. Czas trwania liczy TrainingSession.save().
+Polecenie repair_session_summaries porównuje podsumowania z surowymi danymi
+i poprawia rozbieżności partiami.
+"""
+
+import math
+from collections import defaultdict
+
+from django.db.models import Count, F, FloatField, Sum
+
+from .models import SessionExercise, TrainingSession
+from .rollups import VOLUME
+
+FIELDS = ("exercise_count", "total_volume", "duration_seconds")
+
+
+def volume(exercise):
+    return exercise.weight * exercise.sets * exercise.reps
+
+
+def add(session_id, count, added_volume):
+    """
+    Dodaje do podsumowania sesji count ćwiczeń o łącznej objętości
+    added_volume (ujemne wartości odejmują).
+    """
+    if count or added_volume:
+        TrainingSession.all_objects.filter(pk=session_id).update(
+            exercise_count=F("exercise_count") + count,
+            total_volume=F("total_volume") + added_volume,
+        )
+
+
+def add_exercises(exercises):
+    """
+    Dolicza nowe ćwiczenia (np. z bulk_create) – jeden UPDATE na sesję.
+    """
+    totals = defaultdict(lambda: [0, 0.0])
+    for exercise in exercises:
+        totals[exercise.training_session_id][0] += 1
+        totals[exercise.training_session_id][1] += volume(exercise)
+    for session_id, (count, added_volume) in totals.items():
+        add(session_id, count, added_volume)
+
+
+# --- Kontrola spójności ---
+
+
+def _batches(batch_size):
+    last = 0
+    while True:
+        batch = list(
+            TrainingSession.objects.filter(pk__gt=last)
+            .order_by("pk")
+            .values_list("pk", "start", "end", *FIELDS)[:batch_size]
+        )
+        if not batch:
+            return
+        last = batch[-1][0]
+        yield batch
+
+
+def find_drift(batch_size=1000):
+    """
+    Sesje, których podsumowanie różni się od surowych danych – krotki
+    (pk sesji, oczekiwane, zapisane). Sesje czytane są partiami, a sumy
+    ćwiczeń liczone jednym zapytaniem grupującym na partię.
+    """
+    for batch in _batches(batch_size):
+        rows = (
+            SessionExercise.objects.filter(
+                training_session_id__in=[row[0] for row in batch]
+            )
+            .order_by()
+            .values_list("training_session_id")
+            .annotate(
+                count=Count("id"), volume=Sum(VOLUME, output_field=FloatField())
+            )
+        )
+        totals = {session_id: (count, total) for session_id, count, total in rows}
+        for pk, start, end, *stored in batch:
+            count, total = totals.get(pk, (0, 0.0))
+            expected = (count, total, TrainingSession.duration_between(start, end))
+            if not _same(expected, stored):
+                yield pk, dict(zip(FIELDS, expected)), dict(zip(FIELDS, stored))
+
+
+def _same(expected, stored):
+    return (
+        expected[0] == stored[0]
+        and math.isclose(expected[1], stored[1], rel_tol=1e-9, abs_tol=1e-6)
+        and expected[2] == stored[2]
+    )
+
+
+def repair(batch_size=1000):
+    """
+    Nadpisuje rozbieżne podsumowania wartościami z surowych danych
+    (bulk_update partiami). Zwraca listę rozbieżności sprzed naprawy.
+    """
+    drift = list(find_drift(batch_size))
+    TrainingSession.objects.bulk_update(
+        [TrainingSession(pk=pk, **expected) for pk, expected, _ in drift],
+        FIELDS,
+        batch_size=batch_size,
+    )
+    return drift
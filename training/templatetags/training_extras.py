@@ -0,0 +1,16 @@
+from django import template
+
+register = template.Library()
+
+
+@register.filter
+def duration(value):
+    """
+    Czas trwania jako "3 h 05 min" (timedelta albo liczba sekund; puste
+    wartości – "–").
+    """
+    if not value:
+        return "–"
+    seconds = value if isinstance(value, (int, float)) else value.total_seconds()
+    minutes = int(seconds) // 60
+    return f"{minutes // 60} h {minutes % 60:02d} min"
@@ -1,3 +1,2600 @@
-from django.test import TestCase
+import importlib.util
+import json
+import os
+import re
+import tempfile
+import time
+import unittest
+from unittest import mock
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from io import StringIO
+from types import ModuleType
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404, HttpResponse
+from django.test import (
+    AsyncClient,
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve, reverse
+from django.utils import timezone
+
+from . import (
+    analytics,
+    catalogue,
+    deletion,
+    fragments,
+    jobs,
+    leaderboards,
+    overlaps,
+    pagination,
+    profiling,
+    records,
+    rollups,
+    routers,
+    sqlite,
+    stats,
+    summaries,
+    urls,
+    versions,
+    views,
+)
+from .forms import SessionExerciseForm
+from .management.commands import loadtest_views
+from .models import (
+    CacheVersion,
+    ExerciseType,
+    LeaderboardEntry,
+    PersonalRecord,
+    SessionExercise,
+    TrainingJob,
+    TrainingSession,
+    DailyExerciseStats,
+)
+
+
+def seed_training_data(users=3, sessions=20, exercises=3, types=8):
+    """
+    Wypełnia bazę syntetycznymi danymi: users × sessions × exercises.
+    Zwraca listę utworzonych użytkowników (pierwszy jest administratorem).
+    """
+    now = timezone.now()
+    exercise_types = ExerciseType.objects.bulk_create(
+        ExerciseType(name=f"Ćwiczenie {i:03d}") for i in range(types)
+    )
+    created_users = []
+    for u in range(users):
+        user = User.objects.create_user(
+            f"user{u}", password="haslo-testowe", is_staff=(u == 0)
+        )
+        created_users.append(user)
+        training_sessions = TrainingSession.objects.bulk_create(
+            TrainingSession(
+                start=now - timedelta(days=s, hours=1),
+                end=now - timedelta(days=s),
+                duration_seconds=3600,
+                created_by=user,
+            )
+            for s in range(sessions)
+        )
+        SessionExercise.objects.bulk_create(
+            SessionExercise(
+                training_session=session,
+                session_start=session.start,
+                exercise_type=exercise_types[(s + e) % types],
+                weight=20 + e * 5,
+                sets=3,
+                reps=8,
+                created_by=user,
+            )
+            for s, session in enumerate(training_sessions)
+            for e in range(exercises)
+        )
+    rollups.rebuild_all()
+    leaderboards.rebuild_all()
+    summaries.repair()
+    return created_users
+
+
+def session_log_data(exercise_types, rows, base_weight=40, start=None):
+    """
+    Dane POST formularza zbiorczego zapisu sesji z podaną liczbą wierszy
+    (domyślnie sesja od teraz, godzinna).
+    """
+    start = start or timezone.now().replace(microsecond=0)
+    data = {
+        "start": f"{start:%Y-%m-%dT%H:%M}",
+        "end": f"{start + timedelta(hours=1):%Y-%m-%dT%H:%M}",
+        "exercises-TOTAL_FORMS": rows,
+        "exercises-INITIAL_FORMS": 0,
+        "exercises-MIN_NUM_FORMS": 1,
+        "exercises-MAX_NUM_FORMS": 50,
+    }
+    for i in range(rows):
+        data[f"exercises-{i}-exercise_type"] = exercise_types[i % len(exercise_types)].pk
+        data[f"exercises-{i}-weight"] = base_weight + i
+        data[f"exercises-{i}-sets"] = 3
+        data[f"exercises-{i}-reps"] = 10
+    return data
+
+
+def training_routes(user):
+    """
+    (nazwa, url, metoda, dane POST) dla każdej trasy z training/urls.py
+    (pilnuje tego RouteBenchmarkTests.test_every_route_is_covered). Trasy
+    monitoringu wymagają administratora – pierwszy użytkownik
+    z seed_training_data nim jest.
+    """
+    session = TrainingSession.objects.filter(created_by=user).first()
+    exercise = SessionExercise.objects.filter(created_by=user).first()
+    # Osobne ćwiczenie – "exercise" usuwa wcześniejsza trasa.
+    api_exercise = SessionExercise.objects.filter(created_by=user).last()
+    etype = ExerciseType.objects.first()
+    start = timezone.now().replace(microsecond=0)
+    # Tworzone i edytowane sesje nie mogą się nakładać.
+    new_session_data = {
+        "start": f"{start + timedelta(hours=2):%Y-%m-%dT%H:%M}",
+        "end": f"{start + timedelta(hours=3):%Y-%m-%dT%H:%M}",
+    }
+    session_data = {
+        "start": f"{start:%Y-%m-%dT%H:%M}",
+        "end": f"{start + timedelta(hours=1):%Y-%m-%dT%H:%M}",
+    }
+    exercise_data = {
+        "training_session": session.pk,
+        "exercise_type": etype.pk,
+        "weight": 50,
+        "sets": 3,
+        "reps": 10,
+    }
+    return [
+        ("home", reverse("home"), "get", None),
+        ("exercise_type_list", reverse("exercise_type_list"), "get", None),
+        ("exercise_type_create", reverse("exercise_type_create"), "get", None),
+        (
+            "exercise_type_edit",
+            reverse("exercise_type_edit", args=[etype.pk]),
+            "post",
+            {"name": "Martwy ciąg"},
+        ),
+        (
+            "exercise_type_delete",
+            reverse("exercise_type_delete", args=[etype.pk]),
+            "get",
+            None,
+        ),
+        ("training_session_list", reverse("training_session_list"), "get", None),
+        (
+            "training_session_create",
+            reverse("training_session_create"),
+            "post",
+            new_session_data,
+        ),
+        (
+            "training_session_log",
+            reverse("training_session_log"),
+            "post",
+            session_log_data(
+                list(ExerciseType.objects.all()), 3, start=start + timedelta(hours=4)
+            ),
+        ),
+        (
+            "training_session_detail",
+            reverse("training_session_detail", args=[session.pk]),
+            "get",
+            None,
+        ),
+        (
+            "training_session_edit",
+            reverse("training_session_edit", args=[session.pk]),
+            "post",
+            session_data,
+        ),
+        (
+            "training_session_delete",
+            reverse("training_session_delete", args=[session.pk]),
+            "get",
+            None,
+        ),
+        (
+            "session_autocomplete",
+            reverse("session_autocomplete") + f"?q={start:%Y-%m}",
+            "get",
+            None,
+        ),
+        ("session_exercise_list", reverse("session_exercise_list"), "get", None),
+        (
+            "session_exercise_create",
+            reverse("session_exercise_create"),
+            "post",
+            exercise_data,
+        ),
+        (
+            "session_exercise_edit",
+            reverse("session_exercise_edit", args=[exercise.pk]),
+            "post",
+            exercise_data,
+        ),
+        (
+            "session_exercise_delete",
+            reverse("session_exercise_delete", args=[exercise.pk]),
+            "post",
+            None,
+        ),
+        (
+            "session_exercise_export",
+            reverse("session_exercise_export") + "?format=csv",
+            "get",
+            None,
+        ),
+        ("stats", reverse("stats"), "get", None),
+        ("personal_records_json", reverse("personal_records_json"), "get", None),
+        ("progress_trends_json", reverse("progress_trends_json"), "get", None),
+        ("cache_stats_json", reverse("cache_stats_json"), "get", None),
+        ("request_profiles", reverse("request_profiles"), "get", None),
+        ("api_exercise_types", reverse("api_exercise_types"), "get", None),
+        (
+            "api_exercise_type_detail",
+            reverse("api_exercise_type_detail", args=[etype.pk]),
+            "get",
+            None,
+        ),
+        ("api_training_sessions", reverse("api_training_sessions"), "get", None),
+        (
+            "api_training_session_detail",
+            reverse("api_training_session_detail", args=[session.pk]),
+            "get",
+            None,
+        ),
+        (
+            "api_session_exercises",
+            reverse("api_session_exercises") + "?fields=id,exercise,weight",
+            "get",
+            None,
+        ),
+        (
+            "api_session_exercise_detail",
+            reverse("api_session_exercise_detail", args=[api_exercise.pk]),
+            "get",
+            None,
+        ),
+    ]
+
+
+def async_urlconf():
+    """
+    URLconf projektu z wersjami async def widoków odczytu, jak pod ASGI.
+    training/urls.py wybiera wersje przy imporcie, więc moduł wykonywany jest
+    od nowa – bez podmiany w sys.modules.
+    """
+    spec = importlib.util.find_spec("training.urls")
+    training_urls = importlib.util.module_from_spec(spec)
+    with override_settings(TRAINING_ASYNC_VIEWS=True):
+        spec.loader.exec_module(training_urls)
+    urlconf = ModuleType("async_urlconf")
+    urlconf.urlpatterns = [
+        path("admin/", admin.site.urls),
+        path("accounts/", include("django.contrib.auth.urls")),
+        path("", include(training_urls)),
+    ]
+    return urlconf
+
+
+ASYNC_URLCONF = async_urlconf()
+
+
+@override_settings(TRAINING_JOBS_BACKEND="eager", TRAINING_SHARED_CACHE=True)
+class TrainingTestCase(TestCase):
+    """
+    Czyści cache przed każdym testem – w TestCase transakcje nie są
+    zatwierdzane, więc callbacki on_commit (np. podbicie wersji katalogu
+    typów ćwiczeń) się nie wykonują. Z tego samego powodu zadania w tle
+    wykonują się od razu (kolejkę sprawdza JobQueueTests). Testy działają
+    w jednym procesie, więc LocMemCache traktowany jest jak wspólny cache
+    (wersje w bazie sprawdza CacheVersionTests).
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+class DailyRollupTests(TrainingTestCase):
+    """
+    Po każdej zmianie tabela agregatów musi się zgadzać z agregacją surowych
+    danych od zera (rollups.find_mismatches).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("rollup", password="haslo-testowe")
+        cls.squat, cls.bench = ExerciseType.objects.bulk_create(
+            [ExerciseType(name="Przysiad"), ExerciseType(name="Wyciskanie")]
+        )
+
+    def session(self, day, hour=18):
+        start = timezone.make_aware(datetime(2026, 3, day, hour))
+        return TrainingSession.objects.create(
+            start=start, end=start + timedelta(hours=1), created_by=self.user
+        )
+
+    def exercise(self, session, exercise_type=None, weight=50, sets=3, reps=10):
+        return SessionExercise.objects.create(
+            training_session=session,
+            exercise_type=exercise_type or self.squat,
+            weight=weight,
+            sets=sets,
+            reps=reps,
+            created_by=self.user,
+        )
+
+    def bucket(self, day, exercise_type=None):
+        return DailyExerciseStats.objects.filter(
+            created_by=self.user,
+            exercise_type=exercise_type or self.squat,
+            period_start=date(2026, 3, day),
+        ).first()
+
+    def assertRollupsMatch(self):
+        self.assertEqual(rollups.find_mismatches(), [])
+
+    def test_create_adds_to_bucket(self):
+        morning, evening = self.session(9, hour=7), self.session(9)
+        self.exercise(morning, weight=50)
+        self.exercise(morning, weight=60, sets=2)
+        self.exercise(evening, weight=40)
+        self.exercise(evening, self.bench)
+        self.exercise(self.session(10), weight=100)
+        self.assertRollupsMatch()
+        bucket = self.bucket(9)
+        self.assertEqual(bucket.total_volume, 1500 + 1200 + 1200)
+        self.assertEqual(bucket.set_count, 8)
+        self.assertEqual(bucket.max_weight, 60)
+        # Dwa przysiady w jednej sesji to jedna sesja i jedna godzina.
+        self.assertEqual(bucket.session_count, 2)
+        self.assertEqual(bucket.total_duration, timedelta(hours=2))
+        self.assertEqual(self.bucket(10).max_weight, 100)
+
+    def test_edit_recomputes_old_and_new_bucket(self):
+        session = self.session(9)
+        heavy = self.exercise(session, weight=100)
+        self.exercise(session, weight=50)
+        heavy.weight = 40
+        heavy.save()
+        self.assertRollupsMatch()
+        self.assertEqual(self.bucket(9).max_weight, 50)
+
+        heavy.exercise_type = self.bench
+        heavy.save()
+        self.assertRollupsMatch()
+        self.assertEqual(self.bucket(9, self.bench).max_weight, 40)
+
+    def test_delete_removes_empty_bucket(self):
+        session = self.session(9)
+        first, second = self.exercise(session), self.exercise(session, self.bench)
+        first.delete()
+        self.assertRollupsMatch()
+        self.assertIsNone(self.bucket(9))
+        deletion.delete_exercise(second)
+        self.assertRollupsMatch()
+        self.assertFalse(DailyExerciseStats.objects.exists())
+
+    def test_move_exercise_to_session_on_other_day(self):
+        session, other = self.session(9), self.session(17)
+        self.exercise(session, weight=40)
+        moved = self.exercise(session, weight=80)
+        moved.training_session = other
+        moved.save()
+        self.assertRollupsMatch()
+        self.assertEqual(self.bucket(9).max_weight, 40)
+        self.assertEqual(self.bucket(17).max_weight, 80)
+        self.assertEqual(self.bucket(17).session_count, 1)
+
+    def test_move_session_to_other_day(self):
+        session = self.session(9)
+        self.exercise(session)
+        self.exercise(session, self.bench)
+        session.start += timedelta(days=8)
+        session.end += timedelta(days=8, minutes=30)
+        session.save()
+        self.assertRollupsMatch()
+        self.assertIsNone(self.bucket(9))
+        self.assertEqual(self.bucket(17).total_duration, timedelta(minutes=90))
+
+    def test_session_delete_cascades_to_buckets(self):
+        kept, removed = self.session(9, hour=7), self.session(9)
+        self.exercise(kept, weight=40)
+        self.exercise(removed, weight=90)
+        self.exercise(removed, self.bench)
+        removed.delete()
+        self.assertRollupsMatch()
+        self.assertEqual(self.bucket(9).max_weight, 40)
+        self.assertIsNone(self.bucket(9, self.bench))
+
+        soft = self.session(9, hour=12)
+        self.exercise(soft, weight=70)
+        deletion.delete_session(soft)
+        self.assertRollupsMatch()
+        self.assertEqual(self.bucket(9).session_count, 1)
+
+    def test_exercise_type_delete_cascades_to_buckets(self):
+        session = self.session(9)
+        self.exercise(session)
+        self.exercise(session, self.bench)
+        self.bench.delete()
+        self.assertRollupsMatch()
+        self.assertEqual(DailyExerciseStats.objects.count(), 1)
+
+
+class KeysetPaginationTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("pager", password="haslo-testowe")
+        start = timezone.make_aware(datetime(2026, 3, 1, 18))
+        # Po dwie sesje o tym samym początku – remisy rozstrzyga id.
+        TrainingSession.objects.bulk_create(
+            TrainingSession(
+                start=start + timedelta(days=n // 2),
+                end=start + timedelta(days=n // 2, hours=1),
+                created_by=cls.user,
+            )
+            for n in range(8)
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.sessions = TrainingSession.objects.filter(created_by=self.user)
+        self.expected = list(
+            self.sessions.order_by("-start", "-id").values_list("pk", flat=True)
+        )
+
+    def page(self, params):
+        return pagination.keyset_page(self.sessions, params, "start", per_page=3)
+
+    def pks(self, page):
+        return [session.pk for session in page]
+
+    def walk_forward(self):
+        pages = [self.page({})]
+        while pages[-1].has_next:
+            pages.append(self.page({"after": pages[-1].next_cursor}))
+        return pages
+
+    def test_next_cursors_visit_every_row_once(self):
+        pages = self.walk_forward()
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+        self.assertEqual(sum((self.pks(page) for page in pages), []), self.expected)
+
+    def test_first_and_last_page(self):
+        pages = self.walk_forward()
+        self.assertFalse(pages[0].has_previous)
+        self.assertTrue(pages[0].has_next)
+        self.assertTrue(pages[-1].has_previous)
+        self.assertFalse(pages[-1].has_next)
+        self.assertIsNone(pages[-1].next_cursor)
+
+    def test_previous_cursors_return_same_pages(self):
+        pages = self.walk_forward()
+        back = [pages[-1]]
+        while back[-1].has_previous:
+            back.append(self.page({"before": back[-1].previous_cursor}))
+        self.assertEqual(
+            [self.pks(page) for page in back[::-1]],
+            [self.pks(page) for page in pages],
+        )
+
+    def test_cursor_between_tied_rows(self):
+        # Kursor na drugiej z dwóch sesji o tym samym początku.
+        tied = self.sessions.get(pk=self.expected[3])
+        cursor = pagination.encode_cursor(tied.start, tied.pk)
+        self.assertEqual(self.pks(self.page({"after": cursor})), self.expected[4:7])
+        self.assertEqual(self.pks(self.page({"before": cursor})), self.expected[:3])
+
+    def test_empty_queryset(self):
+        page = pagination.keyset_page(
+            TrainingSession.objects.none(), {}, "start", per_page=3
+        )
+        self.assertEqual(list(page), [])
+        self.assertFalse(page.has_next or page.has_previous)
+
+    def test_invalid_cursor_is_not_found(self):
+        naive = pagination.encode_cursor(datetime(2026, 3, 1), 1)
+        truncated = self.page({}).next_cursor[:-3]
+        for cursor in ("!!!", "bm9wZQ", naive, truncated):
+            with self.subTest(cursor=cursor), self.assertRaises(Http404):
+                self.page({"after": cursor})
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("training_session_list"), {"before": "x"})
+        self.assertEqual(response.status_code, 404)
+
+
+class TrainingSessionLogTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=1, sessions=5)[0]
+        cls.exercise_types = list(ExerciseType.objects.all())
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.logged = 0
+
+    def post_log(self, rows, base_weight=40):
+        # Każdy zapis w innej godzinie – sesje nie mogą się nakładać.
+        self.logged += 1
+        start = timezone.now().replace(microsecond=0) + timedelta(hours=self.logged)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("training_session_log"),
+                session_log_data(self.exercise_types, rows, base_weight, start),
+            )
+        self.assertEqual(response.status_code, 302)
+        return len(queries)
+
+    def test_saves_session_with_all_exercises(self):
+        self.post_log(12)
+        session = TrainingSession.objects.filter(created_by=self.user).latest("id")
+        exercises = session.exercises.all()
+        self.assertEqual(len(exercises), 12)
+        self.assertTrue(all(e.created_by == self.user for e in exercises))
+        self.assertTrue(all(e.session_start == session.start for e in exercises))
+        self.assertEqual(rollups.find_mismatches(), [])
+
+    def test_query_count_does_not_depend_on_rows(self):
+        self.post_log(1)  # rozgrzanie katalogu typów ćwiczeń
+        # Rosnące ciężary, żeby oba zapisy poprawiały rekordy osobiste.
+        self.assertEqual(
+            self.post_log(1, base_weight=100), self.post_log(12, base_weight=200)
+        )
+
+    def test_invalid_row_saves_nothing(self):
+        data = session_log_data(self.exercise_types, 2)
+        data["exercises-1-reps"] = 0
+        before = TrainingSession.objects.count()
+        response = self.client.post(reverse("training_session_log"), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(TrainingSession.objects.count(), before)
+
+
+class SessionExerciseExportTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=2, sessions=4, exercises=2)[0]
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse("session_exercise_export")
+
+    def test_csv_streams_all_rows_of_user(self):
+        response = self.client.get(self.url, {"format": "csv"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "session_start,session_end,exercise,weight,sets,reps")
+        self.assertEqual(len(lines) - 1, 8)
+
+    def test_ndjson_rows_are_json_objects(self):
+        response = self.client.get(self.url, {"format": "ndjson"})
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[0]["sets"], 3)
+
+    def test_unchanged_history_returns_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        SessionExercise.objects.filter(created_by=self.user).first().delete()
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+
+class ExerciseTypeCatalogueTests(TrainingTestCase):
+    def setUp(self):
+        super().setUp()
+        ExerciseType.objects.create(name="Przysiad")
+
+    def test_steady_state_reads_do_not_query(self):
+        catalogue.exercise_types()
+        with self.assertNumQueries(0):
+            self.assertEqual([t.name for t in catalogue.exercise_types()], ["Przysiad"])
+
+    def test_changes_invalidate_catalogue_after_commit(self):
+        catalogue.exercise_types()
+        with self.captureOnCommitCallbacks(execute=True):
+            ExerciseType.objects.create(name="Martwy ciąg")
+        names = [t.name for t in catalogue.exercise_types()]
+        self.assertEqual(names, ["Martwy ciąg", "Przysiad"])
+
+    def test_list_page_answers_conditional_get(self):
+        url = reverse("exercise_type_list")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExerciseType.objects.create(name="Martwy ciąg")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(TRAINING_SHARED_CACHE=None)
+class CacheVersionTests(TrainingTestCase):
+    """
+    LocMemCache jest osobny w każdym procesie – wersje czytane są wtedy
+    z bazy, a podbicie w jednym procesie widzą pozostałe.
+    """
+
+    def test_process_local_cache_is_detected(self):
+        self.assertFalse(versions.shared_cache())
+        redis = "django.core.cache.backends.redis.RedisCache"
+        with override_settings(CACHES={"default": {"BACKEND": redis}}):
+            self.assertTrue(versions.shared_cache())
+
+    def test_catalogue_change_reaches_other_processes(self):
+        ExerciseType.objects.create(name="Przysiad")
+        catalogue.exercise_types()
+        with self.assertNumQueries(1):
+            catalogue.exercise_types()
+        # Zmiana i podbicie wersji w innym procesie – z jego własnym cache.
+        other_cache = caches.create_connection("default")
+        with mock.patch.object(versions, "cache", other_cache):
+            ExerciseType.objects.create(name="Martwy ciąg")
+            catalogue.bump()
+        names = [t.name for t in catalogue.exercise_types()]
+        self.assertEqual(names, ["Martwy ciąg", "Przysiad"])
+        self.assertEqual(
+            CacheVersion.objects.get(key=catalogue.VERSION_KEY).version,
+            catalogue.version(),
+        )
+
+    def test_fragment_change_reaches_other_processes(self):
+        user = User.objects.create_user("fragmenty", password="haslo-testowe")
+        render = mock.Mock(side_effect=["stara", "nowa"])
+        for _ in range(2):
+            fragments.get_or_render(user.pk, "test", [], render)
+        other_cache = caches.create_connection("default")
+        with mock.patch.object(versions, "cache", other_cache):
+            fragments.bump(user.pk)
+        self.assertEqual(fragments.get_or_render(user.pk, "test", [], render), "nowa")
+        self.assertEqual(render.call_count, 2)
+
+    def test_leaderboard_change_reaches_other_processes(self):
+        squat = ExerciseType.objects.create(name="Przysiad")
+        user = User.objects.create_user("ranking", password="haslo-testowe")
+        self.assertEqual(leaderboards.boards([squat])[squat.pk]["best_e1rm"], [])
+        # Osobny LocMemCache (inna lokalizacja) – jak cache innego procesu.
+        other_cache = LocMemCache("inny-proces", {})
+        with (
+            mock.patch.object(versions, "cache", other_cache),
+            mock.patch.object(leaderboards, "cache", other_cache),
+        ):
+            LeaderboardEntry.objects.create(
+                exercise_type=squat,
+                metric=leaderboards.Metric.BEST_E1RM,
+                created_by=user,
+                score=100,
+                rank=1,
+                computed_at=timezone.now(),
+            )
+            leaderboards.bump()
+        self.assertEqual(
+            leaderboards.boards([squat])[squat.pk]["best_e1rm"], [("ranking", 100)]
+        )
+
+    def test_list_page_etag_follows_stored_version(self):
+        url = reverse("exercise_type_list")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        catalogue.bump()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class PersonalRecordTests(TrainingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("rekordzista", password="haslo-testowe")
+        self.squat = ExerciseType.objects.create(name="Przysiad")
+        start = timezone.now()
+        self.session = TrainingSession.objects.create(
+            start=start, end=start + timedelta(hours=1), created_by=self.user
+        )
+
+    def log(self, weight, sets, reps):
+        return SessionExercise.objects.create(
+            training_session=self.session,
+            exercise_type=self.squat,
+            weight=weight,
+            sets=sets,
+            reps=reps,
+            created_by=self.user,
+        )
+
+    def record(self):
+        return PersonalRecord.objects.get(created_by=self.user, exercise_type=self.squat)
+
+    def test_new_exercises_update_records_incrementally(self):
+        heavy = self.log(120, 1, 1)
+        volume = self.log(80, 5, 10)
+        record = self.record()
+        self.assertEqual(record.max_weight, 120)
+        self.assertEqual(record.max_weight_exercise_id, heavy.pk)
+        self.assertEqual(record.max_volume, 4000)
+        self.assertEqual(record.max_volume_exercise_id, volume.pk)
+        self.assertAlmostEqual(record.best_e1rm, records.estimated_1rm(120, 1))
+
+    def test_edit_and_delete_of_record_source_recompute_slice(self):
+        heavy = self.log(120, 1, 1)
+        other = self.log(100, 3, 5)
+        heavy.weight = 90
+        heavy.save()
+        self.assertEqual(self.record().max_weight, 100)
+        self.assertEqual(self.record().max_weight_exercise_id, other.pk)
+
+        other.delete()
+        self.assertEqual(self.record().max_weight_exercise_id, heavy.pk)
+        heavy.delete()
+        self.assertFalse(PersonalRecord.objects.exists())
+
+    def test_json_endpoint(self):
+        self.log(100, 3, 5)
+        self.client.force_login(self.user)
+        data = self.client.get(reverse("personal_records_json")).json()
+        self.assertEqual(data["records"][0]["exercise"], "Przysiad")
+        self.assertEqual(data["records"][0]["max_weight"], 100)
+
+
+class ImportTrainingTests(TrainingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("importer", password="haslo-testowe")
+        ExerciseType.objects.create(name="Przysiad")
+
+    def import_rows(self, *rows, dry_run=False):
+        lines = ["session_start,session_end,exercise,weight,sets,reps", *rows]
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", delete=False, encoding="utf-8"
+        ) as f:
+            f.write("\n".join(lines))
+        self.addCleanup(os.unlink, f.name)
+        args = [f.name, "--user", self.user.username, "--chunk-size", "2"]
+        if dry_run:
+            args.append("--dry-run")
+        stderr = StringIO()
+        call_command("import_training", *args, stdout=StringIO(), stderr=stderr)
+        return stderr.getvalue()
+
+    def test_groups_rows_into_sessions_and_creates_missing_types(self):
+        self.import_rows(
+            "2025-01-06 10:00,2025-01-06 11:00,Przysiad,100,5,5",
+            "2025-01-06 10:00,2025-01-06 11:00,Martwy ciąg,140,3,5",
+            "2025-01-08 10:00,2025-01-08 11:00,Przysiad,105,5,5",
+        )
+        self.assertEqual(TrainingSession.objects.filter(created_by=self.user).count(), 2)
+        self.assertEqual(SessionExercise.objects.filter(created_by=self.user).count(), 3)
+        self.assertTrue(ExerciseType.objects.filter(name="Martwy ciąg").exists())
+        self.assertEqual(rollups.find_mismatches(), [])
+
+    def test_invalid_rows_are_skipped_and_dry_run_writes_nothing(self):
+        rows = (
+            "2025-01-06 10:00,2025-01-06 09:00,Przysiad,100,5,5",
+            "2025-01-06 10:00,2025-01-06 11:00,Przysiad,1001,5,5",
+            "2025-01-06 10:00,2025-01-06 11:00,Przysiad,100,5,5",
+        )
+        self.import_rows(*rows, dry_run=True)
+        self.assertFalse(SessionExercise.objects.exists())
+        self.import_rows(*rows)
+        self.assertEqual(SessionExercise.objects.count(), 1)
+
+    def test_repeated_import_skips_existing_sessions(self):
+        # Trzy wiersze jednej sesji – przy kawałkach po dwa wiersze sesja
+        # utworzona w pierwszym kawałku przyjmuje też wiersz z drugiego.
+        rows = (
+            "2025-01-06 10:00,2025-01-06 11:00,Przysiad,100,5,5",
+            "2025-01-06 10:00,2025-01-06 11:00,Przysiad,100,5,5",
+            "2025-01-06 10:00,2025-01-06 11:00,Przysiad,110,3,5",
+            "2025-01-08 10:00,2025-01-08 11:00,Przysiad,105,5,5",
+        )
+        self.import_rows(*rows)
+        self.assertEqual(TrainingSession.objects.count(), 2)
+        self.assertEqual(SessionExercise.objects.count(), 4)
+        self.import_rows(*rows, "2025-01-10 10:00,2025-01-10 11:00,Przysiad,90,5,5")
+        self.assertEqual(TrainingSession.objects.count(), 3)
+        self.assertEqual(SessionExercise.objects.count(), 5)
+        session = TrainingSession.objects.get(start__day=6)
+        self.assertEqual(session.exercise_count, 3)
+        self.assertEqual(rollups.find_mismatches(), [])
+
+    def test_sessions_overlapping_existing_ones_are_rejected(self):
+        start = timezone.make_aware(datetime(2025, 1, 6, 10))
+        TrainingSession.objects.create(
+            start=start, end=start + timedelta(hours=1), created_by=self.user
+        )
+        self.import_rows(
+            "2025-01-06 10:30,2025-01-06 11:30,Przysiad,100,5,5",
+            "2025-01-06 11:00,2025-01-06 12:00,Przysiad,100,5,5",
+            "2025-01-06 11:30,2025-01-06 12:30,Przysiad,100,5,5",
+        )
+        self.assertEqual(
+            list(TrainingSession.objects.order_by("start").values_list("start__hour")),
+            [(10,), (11,)],
+        )
+        self.assertEqual(SessionExercise.objects.count(), 1)
+
+    def test_dry_run_rejects_overlaps_across_chunks(self):
+        rows = (
+            "2025-01-06 10:00,2025-01-06 11:00,Przysiad,100,5,5",
+            "2025-01-06 10:00,2025-01-06 11:00,Przysiad,100,5,5",
+            # Kolejny kawałek: sesja nachodząca na sesję z poprzedniego.
+            "2025-01-06 10:30,2025-01-06 11:30,Przysiad,100,5,5",
+            "2025-01-08 10:00,2025-01-08 11:00,Przysiad,110,3,5",
+            # I jeszcze jeden: dalszy ciąg sesji z pierwszego kawałka.
+            "2025-01-06 10:00,2025-01-06 11:00,Przysiad,110,3,5",
+        )
+        for dry_run in (True, False):
+            with self.subTest(dry_run=dry_run):
+                stderr = self.import_rows(*rows, dry_run=dry_run)
+                self.assertIn("Wiersz 4: Sesja nakłada się", stderr)
+                self.assertNotIn("Wiersz 6", stderr)
+
+    def test_interrupted_import_leaves_derived_data_consistent(self):
+        apply_new = records.apply_new
+        calls = []
+
+        def fail_in_second_chunk(exercises):
+            calls.append(exercises)
+            if len(calls) == 2:
+                raise RuntimeError("przerwany import")
+            apply_new(exercises)
+
+        with mock.patch.object(records, "apply_new", fail_in_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.import_rows(
+                    "2025-01-06 10:00,2025-01-06 11:00,Przysiad,100,5,5",
+                    "2025-01-07 10:00,2025-01-07 11:00,Przysiad,110,5,5",
+                    "2025-01-08 10:00,2025-01-08 11:00,Przysiad,120,5,5",
+                )
+        self.assertEqual(SessionExercise.objects.count(), 2)
+        self.assertEqual(rollups.find_mismatches(), [])
+        squat = ExerciseType.objects.get(name="Przysiad")
+        self.assertEqual(
+            leaderboards.my_ranks(self.user.pk)[
+                (squat.pk, leaderboards.Metric.BEST_E1RM)
+            ],
+            (1, records.estimated_1rm(110, 5)),
+        )
+
+
+class SeedBefitTests(TrainingTestCase):
+    def test_generates_consistent_data(self):
+        call_command(
+            "seed_befit",
+            "--users", "7",
+            "--weeks", "6",
+            "--chunk-users", "3",
+            "--batch-size", "50",
+            stdout=StringIO(),
+        )
+        users = User.objects.filter(username__startswith="befit")
+        self.assertEqual(users.count(), 7)
+        self.assertTrue(
+            self.client.login(username="befit000000", password="befit-haslo")
+        )
+        self.assertTrue(SessionExercise.objects.exists())
+        self.assertFalse(
+            SessionExercise.objects.filter(session_start__gt=timezone.now()).exists()
+        )
+        for user in users:
+            self.assertEqual(list(overlaps.clusters(user.pk)), [])
+        self.assertEqual(list(summaries.find_drift()), [])
+        self.assertEqual(rollups.find_mismatches(), [])
+        self.assertTrue(PersonalRecord.objects.exists())
+        self.assertTrue(LeaderboardEntry.objects.exists())
+
+        with self.assertRaises(CommandError):
+            call_command("seed_befit", "--users", "1", stdout=StringIO())
+
+
+class ApiTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.other = seed_training_data(users=2, sessions=30, exercises=2)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse("api_training_sessions"))
+        self.assertEqual(response.status_code, 401)
+
+    def test_list_is_scoped_paginated_and_sparse(self):
+        url = reverse("api_session_exercises")
+        first = self.client.get(url, {"fields": "id,weight"}).json()
+        self.assertEqual(len(first["results"]), 50)
+        self.assertEqual(set(first["results"][0]), {"id", "weight"})
+        rest = self.client.get(
+            url, {"fields": "id,weight", "after": first["next"]}
+        ).json()
+        self.assertIsNone(rest["next"])
+
+        ids = {row["id"] for row in first["results"] + rest["results"]}
+        own = SessionExercise.objects.filter(created_by=self.user)
+        self.assertEqual(ids, set(own.values_list("id", flat=True)))
+
+        response = self.client.get(url, {"fields": "id,password"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_users_objects_are_not_found(self):
+        session = TrainingSession.objects.filter(created_by=self.other).first()
+        url = reverse("api_training_session_detail", args=[session.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.delete(url).status_code, 404)
+
+    def test_create_and_partial_update(self):
+        start = timezone.now().replace(microsecond=0)
+        response = self.client.post(
+            reverse("api_training_sessions"),
+            {"start": start.isoformat(), "end": (start + timedelta(hours=1)).isoformat()},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        url = reverse("api_training_session_detail", args=[response.json()["id"]])
+
+        response = self.client.patch(
+            url, {"end": start.isoformat()}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.patch(
+            url,
+            {"end": (start - timedelta(hours=1)).isoformat()},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("end", response.json()["errors"])
+
+    def test_conditional_get_uses_user_stamp(self):
+        url = reverse("api_training_sessions")
+        response = self.client.get(url)
+        etag, modified = response["ETag"], response["Last-Modified"]
+        # Sesja, użytkownik i znacznik – bez zapytań o same dane.
+        with self.assertNumQueries(3):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=modified).status_code, 304
+        )
+        # Inne parametry to inna treść.
+        self.assertEqual(
+            self.client.get(url, {"fields": "id"}, HTTP_IF_NONE_MATCH=etag).status_code,
+            200,
+        )
+
+        TrainingSession.objects.filter(created_by=self.user).first().delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class AsyncViewTests(TrainingTestCase):
+    """
+    Wersje async def widoków odczytu zwracają to samo co synchroniczne
+    i wykonują tyle samo zapytań.
+    """
+
+    READ_VIEWS = [
+        ("exercise_type_list", "exercise_type_list", []),
+        ("training_session_list", "training_session_list", []),
+        ("training_session_detail", "training_session_detail", ["session"]),
+        ("session_exercise_list", "session_exercise_list", []),
+        ("stats_view", "stats", []),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=2, sessions=5)[0]
+        cls.session = TrainingSession.objects.filter(created_by=cls.user).first()
+
+    def render(self, view, url, args):
+        request = RequestFactory().get(url)
+        request.user = self.user
+        request.session = {}
+
+        async def auser():
+            return self.user
+
+        request.auser = auser
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            if iscoroutinefunction(view):
+                response = async_to_sync(view)(request, *args)
+            else:
+                response = view(request, *args)
+        content = re.sub(
+            rb'name="csrfmiddlewaretoken" value="[^"]+"', b"", response.content
+        )
+        return response.status_code, content, len(queries)
+
+    def test_read_routes_follow_setting(self):
+        for _, url_name, args in self.READ_VIEWS:
+            with self.subTest(view=url_name):
+                url = reverse(url_name, args=[getattr(self, arg).pk for arg in args])
+                match = resolve(url, urlconf=ASYNC_URLCONF)
+                self.assertTrue(iscoroutinefunction(match.func))
+                self.assertEqual(
+                    iscoroutinefunction(resolve(url).func),
+                    settings.TRAINING_ASYNC_VIEWS,
+                )
+
+    def test_load_test_does_not_report_failed_requests(self):
+        mode = "async" if settings.TRAINING_ASYNC_VIEWS else "sync"
+        failed = {
+            "stats": {
+                "requests": 20,
+                "errors": 20,
+                "error_statuses": {"500": 20},
+                "rps": 900.0,
+                "p50_ms": 1.0,
+                "p99_ms": 2.0,
+            }
+        }
+        stdout = StringIO()
+        with mock.patch.object(
+            loadtest_views.Command, "run", mock.AsyncMock(return_value=failed)
+        ), self.assertRaisesMessage(CommandError, f"stats ({mode}): 20/20"):
+            call_command(
+                "loadtest_views", "--user", "user0", "--mode", mode, stdout=stdout
+            )
+        self.assertEqual(stdout.getvalue(), "")
+
+    def test_load_test_measures_single_request(self):
+        # Percentyle wymagają co najmniej dwóch pomiarów.
+        stdout = StringIO()
+        command = loadtest_views.Command(stdout=stdout)
+        with mock.patch.object(command, "request", mock.AsyncMock(return_value=200)):
+            result = async_to_sync(command.measure)(None, "/", "", 1, 4)
+        self.assertEqual(result["requests"], 1)
+        self.assertNotIn("p50_ms", result)
+        command.report({"sync": {"stats": result}})
+        self.assertIn("0.00ms", stdout.getvalue())
+
+    @override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+    async def test_async_views_through_asgi_stack(self):
+        # Pełny łańcuch middleware i prawdziwa sesja, jak pod serwerem ASGI.
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        for name, url_name, args in self.READ_VIEWS:
+            with self.subTest(view=name):
+                url = reverse(url_name, args=[getattr(self, arg).pk for arg in args])
+                self.assertTrue(iscoroutinefunction(resolve(url).func))
+                response = await client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.context["user"], self.user)
+
+    def test_async_views_match_sync_views(self):
+        for name, url_name, args in self.READ_VIEWS:
+            with self.subTest(view=name):
+                args = [getattr(self, arg).pk for arg in args]
+                url = reverse(url_name, args=args)
+                sync = self.render(getattr(views, name), url, args)
+                self.assertEqual(sync[0], 200)
+                self.assertEqual(self.render(getattr(views, f"a{name}"), url, args), sync)
+
+
+class StatsRangeTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=1, sessions=120, exercises=3)[0]
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def get(self, **params):
+        return self.client.get(reverse("stats"), params)
+
+    def test_periods_are_local_days(self):
+        with timezone.override("Europe/Warsaw"):
+            # 23:30 UTC to już następny dzień w Warszawie.
+            start = datetime(2026, 9, 30, 23, 30, tzinfo=dt_timezone.utc)
+            self.assertEqual(rollups.period_start(start), date(2026, 10, 1))
+            self.assertEqual(
+                rollups.period_bounds(date(2026, 10, 1)),
+                (
+                    timezone.make_aware(datetime(2026, 10, 1)),
+                    timezone.make_aware(datetime(2026, 10, 2)),
+                ),
+            )
+
+    def test_day_buckets_read_rollups(self):
+        since = stats.range_start("90d", "day")
+        sql = str(stats.queryset(self.user.pk, since, "day").query)
+        self.assertIn('FROM "training_dailyexercisestats"', sql)
+        self.assertNotIn("training_sessionexercise", sql)
+
+    def test_buckets_match_raw_data(self):
+        for bucket in ("day", "week", "month"):
+            with self.subTest(bucket=bucket):
+                rows = self.get(range="90d", bucket=bucket).context["rows"]
+                since = stats.range_start("90d", bucket)
+                raw = SessionExercise.objects.filter(
+                    created_by=self.user,
+                    session_start__date__gte=since,
+                )
+                self.assertEqual(
+                    sum(row["set_count"] for row in rows),
+                    sum(raw.values_list("sets", flat=True)),
+                )
+                self.assertEqual(
+                    sum(row["session_count"] for row in rows),
+                    raw.values("training_session", "exercise_type").distinct().count(),
+                )
+
+    def test_query_count_does_not_depend_on_range(self):
+        self.get()  # rozgrzanie katalogu
+        with CaptureQueriesContext(connection) as short:
+            self.get(range="28d", bucket="week")
+        with CaptureQueriesContext(connection) as long:
+            self.get(range="all", bucket="month")
+        self.assertEqual(len(short), len(long))
+
+    def test_day_buckets_are_limited_to_short_ranges(self):
+        response = self.get(range="1y", bucket="day")
+        self.assertTrue(response.context["form"].errors)
+        self.assertEqual(response.context["bucket"], stats.DEFAULT_BUCKET)
+
+    def test_session_duration_counts_each_session_once(self):
+        session = TrainingSession.objects.filter(created_by=self.user).first()
+        exercise = session.exercises.first()
+        SessionExercise.objects.create(
+            training_session=session,
+            exercise_type=exercise.exercise_type,
+            weight=10,
+            sets=1,
+            reps=1,
+            created_by=self.user,
+        )
+        session.end = session.start + timedelta(hours=2)
+        session.save()
+        self.assertEqual(rollups.find_mismatches(), [])
+
+        bucket = DailyExerciseStats.objects.get(
+            created_by=self.user,
+            exercise_type=exercise.exercise_type,
+            period_start=rollups.period_start(session.start),
+        )
+        sessions = TrainingSession.objects.filter(
+            exercises__exercise_type=exercise.exercise_type,
+            start__date__gte=bucket.period_start,
+            start__lt=rollups.period_bounds(bucket.period_start)[1],
+        ).distinct()
+        self.assertEqual(bucket.session_count, sessions.count())
+
+
+@unittest.skipUnless(analytics.AVAILABLE, "wymaga pakietu numpy")
+class ProgressTrendsTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=2, sessions=60, exercises=3)[0]
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.names = {t.pk: t.name for t in ExerciseType.objects.all()}
+
+    def naive_weeks(self):
+        # Ta sama analiza pętlą po wierszach ORM – punkt odniesienia.
+        volume, e1rm = {}, {}
+        for exercise in SessionExercise.objects.filter(created_by=self.user):
+            day = timezone.localtime(exercise.session_start).date()
+            key = (exercise.exercise_type_id, day - timedelta(days=day.weekday()))
+            volume[key] = volume.get(key, 0) + (
+                exercise.weight * exercise.sets * exercise.reps
+            )
+            e1rm[key] = max(
+                e1rm.get(key, 0),
+                records.estimated_1rm(exercise.weight, exercise.reps),
+            )
+        return volume, e1rm
+
+    def test_matches_row_by_row_computation(self):
+        result = analytics.trends(analytics.history(self.user.pk), self.names)
+        volume, e1rm = self.naive_weeks()
+        for t in result["types"]:
+            for week, value, best in zip(result["weeks"], t["volume"], t["e1rm"]):
+                key = (t["exercise_type_id"], week)
+                self.assertAlmostEqual(value, volume.get(key, 0), places=2)
+                if best is None:
+                    self.assertNotIn(key, e1rm)
+                else:
+                    self.assertAlmostEqual(best, e1rm[key], places=2)
+
+    def naive_days(self):
+        # Historia liczona wprost z żywych wierszy ćwiczeń, z pominięciem agregatów.
+        volume, e1rm = {}, {}
+        for exercise in SessionExercise.objects.filter(created_by=self.user):
+            day = timezone.localtime(exercise.session_start).date().toordinal()
+            key = (day, exercise.exercise_type_id)
+            volume[key] = volume.get(key, 0) + (
+                exercise.weight * exercise.sets * exercise.reps
+            )
+            e1rm[key] = max(
+                e1rm.get(key, 0),
+                records.estimated_1rm(exercise.weight, exercise.reps),
+            )
+        return volume, e1rm
+
+    def assert_history_matches_rows(self):
+        data = analytics.history(self.user.pk)
+        volume, e1rm = self.naive_days()
+        keys = list(zip(data.days.tolist(), data.type_ids.tolist()))
+        self.assertEqual(keys, sorted(volume))
+        for key, value, best in zip(keys, data.volume, data.e1rm):
+            self.assertAlmostEqual(value, volume[key], places=2)
+            self.assertAlmostEqual(best, e1rm[key], places=2)
+
+    def test_history_follows_edit_delete_and_restore(self):
+        self.assert_history_matches_rows()
+        exercise = SessionExercise.objects.filter(created_by=self.user).first()
+        other_type = ExerciseType.objects.exclude(pk=exercise.exercise_type_id)[0]
+
+        exercise.weight += 40
+        exercise.exercise_type = other_type
+        with self.captureOnCommitCallbacks(execute=True):
+            exercise.save()
+        self.assert_history_matches_rows()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deletion.delete_exercise(exercise)
+        self.assert_history_matches_rows()
+
+        exercise.deleted_at = None
+        with self.captureOnCommitCallbacks(execute=True):
+            exercise.save()
+        self.assert_history_matches_rows()
+
+    def test_rolling_mean_and_slope(self):
+        values = analytics.np.array([[4.0, 8.0, 12.0, 0.0]])
+        self.assertEqual(
+            analytics._rolling_mean(values, 2).tolist(), [[4.0, 6.0, 10.0, 6.0]]
+        )
+        groups = analytics.np.array([0, 0, 0, 1])
+        x = analytics.np.array([0.0, 1.0, 2.0, 0.0])
+        y = analytics.np.array([100.0, 102.5, 105.0, 50.0])
+        slopes = analytics._slopes(groups, x, y, 2)
+        self.assertAlmostEqual(slopes[0], 2.5)
+        self.assertTrue(analytics.np.isnan(slopes[1]))
+
+    def test_history_is_cached_until_user_data_changes(self):
+        analytics.history(self.user.pk)
+        with self.assertNumQueries(0):
+            analytics.history(self.user.pk)
+
+        exercise = SessionExercise.objects.filter(created_by=self.user).first()
+        exercise.weight = 500
+        with self.captureOnCommitCallbacks(execute=True):
+            exercise.save()
+        with self.assertNumQueries(1):
+            data = analytics.history(self.user.pk)
+        self.assertGreaterEqual(data.e1rm.max(), 500)
+
+    def test_history_reads_daily_rollups(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = analytics.history(self.user.pk)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('FROM "training_dailyexercisestats"', queries[0]["sql"])
+        self.assertEqual(
+            len(data), DailyExerciseStats.objects.filter(created_by=self.user).count()
+        )
+
+    def test_json_endpoint_and_stats_page(self):
+        url = reverse("progress_trends_json")
+        data = self.client.get(url, {"window": 8}).json()
+        self.assertEqual(data["window"], 8)
+        self.assertEqual(len(data["types"]), ExerciseType.objects.count())
+        self.assertEqual(self.client.get(url, {"window": 0}).status_code, 400)
+
+        response = self.client.get(reverse("stats"))
+        self.assertEqual(len(response.context["trends"]), len(data["types"]))
+        self.assertContains(response, "Trendy długoterminowe")
+
+
+class LeaderboardTests(TrainingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.squat = ExerciseType.objects.create(name="Przysiad")
+        self.users = [
+            User.objects.create_user(f"zawodnik{i}", password="haslo-testowe")
+            for i in range(3)
+        ]
+
+    def log(self, user, weight, reps=1, days_ago=0):
+        start = timezone.now() - timedelta(days=days_ago)
+        session = TrainingSession.objects.create(
+            start=start, end=start + timedelta(hours=1), created_by=user
+        )
+        return SessionExercise.objects.create(
+            training_session=session,
+            exercise_type=self.squat,
+            weight=weight,
+            sets=1,
+            reps=reps,
+            created_by=user,
+        )
+
+    def top(self, metric=leaderboards.Metric.BEST_E1RM):
+        return list(leaderboards._top_queryset(self.squat.pk, metric))
+
+    def snapshot(self):
+        return sorted(
+            (e.created_by_id, e.exercise_type_id, e.metric, round(e.score, 6), e.rank)
+            for e in LeaderboardEntry.objects.filter(score__gt=0)
+        )
+
+    def rank(self, user):
+        return leaderboards.my_ranks(user.pk)[
+            (self.squat.pk, leaderboards.Metric.BEST_E1RM)
+        ][0]
+
+    def test_saves_and_deletes_update_ranking(self):
+        first = self.log(self.users[0], 100)
+        self.log(self.users[1], 120)
+        self.log(self.users[2], 80)
+        self.assertEqual(
+            [name for name, _ in self.top()], ["zawodnik1", "zawodnik0", "zawodnik2"]
+        )
+        self.assertEqual(
+            leaderboards.my_ranks(self.users[2].pk)[
+                (self.squat.pk, leaderboards.Metric.BEST_E1RM)
+            ],
+            (3, 80),
+        )
+
+        first.weight = 150
+        first.save()
+        self.assertEqual(self.top()[0], ("zawodnik0", 150))
+
+        first.training_session.delete()
+        self.assertEqual(len(self.top()), 2)
+        self.assertFalse(
+            LeaderboardEntry.objects.filter(
+                created_by=self.users[0], score__gt=0
+            ).exists()
+        )
+
+    def test_volume_window_and_full_rebuild(self):
+        self.log(self.users[0], 100, reps=5)
+        self.log(self.users[0], 100, reps=5, days_ago=leaderboards.VOLUME_DAYS + 1)
+        self.log(self.users[1], 60, reps=10)
+        self.assertEqual(
+            self.top(leaderboards.Metric.VOLUME_28D),
+            [("zawodnik1", 600), ("zawodnik0", 500)],
+        )
+
+        incremental = self.snapshot()
+        self.assertEqual(leaderboards.rebuild_all(), len(incremental))
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_stored_ranks_follow_score_changes(self):
+        first = self.log(self.users[0], 100)
+        self.log(self.users[1], 100)
+        self.log(self.users[2], 80)
+        # Ex aequo dzielą miejsce.
+        self.assertEqual([self.rank(u) for u in self.users], [1, 1, 3])
+
+        first.weight = 70
+        first.save()
+        self.assertEqual([self.rank(u) for u in self.users], [3, 1, 2])
+
+        first.weight = 120
+        first.save()
+        self.assertEqual([self.rank(u) for u in self.users], [1, 2, 3])
+
+        first.training_session.delete()
+        self.assertEqual([self.rank(u) for u in self.users[1:]], [1, 2])
+        incremental = self.snapshot()
+        leaderboards.rebuild_all()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_list_page_shows_boards_and_changes_etag(self):
+        self.log(self.users[0], 100)
+        self.client.force_login(self.users[0])
+        url = reverse("exercise_type_list")
+        response = self.client.get(url)
+        self.assertContains(response, "zawodnik0 – 100 kg")
+        self.assertContains(response, "Twoje miejsce: 1")
+
+        etag = response["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.log(self.users[1], 130)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Twoje miejsce: 2")
+
+
+class LeaderboardBenchmarkTests(TrainingTestCase):
+    """
+    Benchmark rankingów: czas odczytu czołówki i miejsca użytkownika przy
+    rosnącej liczbie użytkowników. Oba zapytania muszą iść po indeksach, a ich
+    czas nie może rosnąć z liczbą wyników (miejsce jest zapisane w wyniku).
+
+    Liczby użytkowników ustawia BEFIT_LEADERBOARD_SCALES, np. "100,10000";
+    BEFIT_LEADERBOARD_REPORT zapisuje wyniki do pliku JSON.
+    """
+
+    DEFAULT_SCALES = "100,10000"
+    REPEAT = 25
+    MAX_SLOWDOWN = 2
+    TYPES = 4
+
+    def scales(self):
+        raw = os.environ.get("BEFIT_LEADERBOARD_SCALES", self.DEFAULT_SCALES)
+        return [int(n) for n in raw.split(",")]
+
+    def seed(self, users):
+        now = timezone.now()
+        types = ExerciseType.objects.bulk_create(
+            ExerciseType(name=f"Ranking {i}") for i in range(self.TYPES)
+        )
+        created = User.objects.bulk_create(
+            User(username=f"ranking{u}") for u in range(users)
+        )
+        entries = [
+            LeaderboardEntry(
+                exercise_type=t,
+                metric=metric,
+                created_by=user,
+                # Deterministyczny rozrzut wyników.
+                score=(u * 7919) % users + t.pk,
+                computed_at=now,
+            )
+            for t in types
+            for metric in leaderboards.Metric.values
+            for u, user in enumerate(created)
+        ]
+        LeaderboardEntry.objects.bulk_create(
+            leaderboards.assign_ranks(entries), batch_size=2000
+        )
+        return types[0], created[len(created) // 2]
+
+    def timed(self, func):
+        samples = []
+        for _ in range(self.REPEAT):
+            started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+        return round(samples[len(samples) // 2] * 1000, 3)
+
+    def plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def run_scale(self, users):
+        with transaction.atomic():
+            etype, user = self.seed(users)
+            metric = leaderboards.Metric.BEST_E1RM
+            top = leaderboards._top_queryset(etype.pk, metric)
+            ranks = leaderboards._ranks_queryset(user.pk)
+            result = {
+                "users": users,
+                "top_ms": self.timed(lambda: list(top.all())),
+                "my_rank_ms": self.timed(lambda: list(ranks.all())),
+                "plans": {"top": self.plan(top), "my_rank": self.plan(ranks)},
+            }
+            transaction.set_rollback(True)
+        return result
+
+    def test_reads_use_indexes_and_stay_flat(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN jest specyficzny dla SQLite.")
+        report = [self.run_scale(users) for users in self.scales()]
+
+        report_path = os.environ.get("BEFIT_LEADERBOARD_REPORT")
+        if report_path:
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"generated_at": timezone.now().isoformat(), "runs": report},
+                    f,
+                    indent=2,
+                )
+
+        for run in report:
+            self.assertTrue(
+                any("leaderboard_rank_idx" in step for step in run["plans"]["top"]),
+                run["plans"]["top"],
+            )
+            for name, plan in run["plans"].items():
+                with self.subTest(users=run["users"], query=name):
+                    for step in plan:
+                        self.assertFalse(step.startswith("SCAN "), plan)
+                        self.assertNotIn("TEMP B-TREE", step, plan)
+
+        # Przy wielokrotnie większej liczbie użytkowników odczyt ma trwać
+        # tyle samo – z zapasem na szum pomiaru.
+        smallest, largest = report[0], report[-1]
+        for name in ("top_ms", "my_rank_ms"):
+            with self.subTest(query=name):
+                self.assertLessEqual(
+                    largest[name], smallest[name] * self.MAX_SLOWDOWN + 0.25, report
+                )
+
+
+class SqliteTuningTests(TrainingTestCase):
+    def setUp(self):
+        super().setUp()
+        if connection.vendor != "sqlite":
+            self.skipTest("Pragmy dotyczą wyłącznie SQLite.")
+
+    def test_new_connections_get_configured_pragmas(self):
+        values = {"busy_timeout": 1234, "cache_size": -2048, "temp_store": 2}
+        original = sqlite.current(connection, values)
+        # Sygnał połączenia wywołany ręcznie – testowa baza w pamięci nie może
+        # zostać otwarta ponownie.
+        try:
+            with override_settings(TRAINING_SQLITE_PRAGMAS=values):
+                sqlite.configure_connection(sender=None, connection=connection)
+            self.assertEqual(sqlite.current(connection, values), values)
+        finally:
+            with override_settings(TRAINING_SQLITE_PRAGMAS=original):
+                sqlite.configure_connection(sender=None, connection=connection)
+
+    def test_project_settings_enable_wal_and_tuning(self):
+        if not settings.SQLITE_TUNING:
+            self.skipTest("Strojenie wyłączone (BEFIT_SQLITE_TUNING=0).")
+        self.assertEqual(settings.TRAINING_SQLITE_PRAGMAS["journal_mode"], "WAL")
+        self.assertEqual(
+            sqlite.current(connection, ["busy_timeout", "temp_store"]),
+            {
+                "busy_timeout": settings.TRAINING_SQLITE_PRAGMAS["busy_timeout"],
+                "temp_store": 2,
+            },
+        )
+
+    def test_invalid_pragmas_are_rejected(self):
+        for values in ({"cache_size; DROP": 1}, {"synchronous": "OFF; --"}):
+            with self.subTest(values=values):
+                with self.assertRaises(ImproperlyConfigured):
+                    sqlite.statements(values)
+
+
+@override_settings(TRAINING_READ_REPLICAS=["replica"])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def route_during(self, request):
+        # Alias wybrany dla odczytu w trakcie obsługi żądania przez middleware.
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(SessionExercise))
+            return HttpResponse()
+
+        routers.ReplicaRoutingMiddleware(view)(request)
+        return seen[0]
+
+    def request(self, method="get", pinned_for=None):
+        request = getattr(self.factory, method)("/")
+        request.session = {}
+        if pinned_for is not None:
+            request.session[routers.PIN_SESSION_KEY] = time.time() + pinned_for
+        return request
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.route_during(self.request()), "replica")
+        self.assertEqual(self.route_during(self.request("post")), "default")
+        # Poza żądaniem (polecenia, sygnały) – zawsze baza główna.
+        self.assertEqual(self.router.db_for_read(SessionExercise), "default")
+        self.assertEqual(self.router.db_for_write(SessionExercise), "default")
+        self.assertIsNone(self.router.db_for_read(User))
+
+    def test_pinned_user_reads_from_primary_until_window_ends(self):
+        self.assertEqual(self.route_during(self.request(pinned_for=5)), "default")
+        self.assertEqual(self.route_during(self.request(pinned_for=-1)), "replica")
+
+    def test_write_views_pin_only_successful_writes(self):
+        view = routers.pins_primary(lambda request: HttpResponse(status=302))
+        request = self.request("post")
+        view(request)
+        self.assertTrue(routers.is_pinned(request))
+
+        failing = routers.pins_primary(lambda request: HttpResponse(status=400))
+        request = self.request("post")
+        failing(request)
+        self.assertFalse(routers.is_pinned(request))
+
+    def test_replica_reads_are_cached_only_for_pin_window(self):
+        request = self.request()
+        seen = []
+
+        def view(request):
+            seen.append(routers.cache_timeout(None))
+            seen.append(routers.cache_timeout(3600))
+            return HttpResponse()
+
+        with self.settings(TRAINING_PRIMARY_PIN_SECONDS=7):
+            routers.ReplicaRoutingMiddleware(view)(request)
+        self.assertEqual(seen, [7, 7])
+        self.assertIsNone(routers.cache_timeout(None))
+
+    def test_replicas_are_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica", "training"))
+        self.assertIsNone(self.router.allow_migrate("default", "training"))
+
+
+class ReadYourWritesTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=1, sessions=2)[0]
+
+    def test_write_views_pin_user_to_primary(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("session_exercise_list"))
+        self.assertNotIn(routers.PIN_SESSION_KEY, self.client.session)
+
+        exercise = SessionExercise.objects.filter(created_by=self.user).first()
+        self.client.post(reverse("session_exercise_delete", args=[exercise.pk]))
+        self.assertGreater(self.client.session[routers.PIN_SESSION_KEY], time.time())
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+class AsgiRequestTests(TrainingTestCase):
+    """
+    Żądania zalogowanego użytkownika przez pełny łańcuch middleware pod ASGI
+    (AsyncClient) – sesja z bazy musi być wczytywana asynchronicznie.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=1, sessions=2)[0]
+
+    async def get_pages(self, client):
+        for name in ("training_session_list", "session_exercise_list", "stats"):
+            with self.subTest(view=name):
+                response = await client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+    async def test_reads_without_replicas(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        with mock.patch.object(
+            routers, "ais_pinned", side_effect=AssertionError("sesja wczytana")
+        ):
+            await self.get_pages(client)
+
+    @override_settings(TRAINING_READ_REPLICAS=["default"])
+    async def test_reads_of_pinned_user_with_replicas(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        await self.get_pages(client)
+        exercise = await SessionExercise.objects.filter(created_by=self.user).afirst()
+        response = await client.post(
+            reverse("session_exercise_delete", args=[exercise.pk])
+        )
+        self.assertEqual(response.status_code, 302)
+        session = await client.asession()
+        self.assertGreater(await session.aget(routers.PIN_SESSION_KEY), time.time())
+        await self.get_pages(client)
+
+
+SLOW_RESPONSE_SECONDS = 0.05
+
+
+def slow_response_middleware(get_response):
+    # Middleware testowe: opóźnia odpowiedź już po powrocie widoku.
+    def middleware(request):
+        response = get_response(request)
+        time.sleep(SLOW_RESPONSE_SECONDS)
+        return response
+
+    return middleware
+
+
+class RequestProfilingTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff, cls.user = seed_training_data(users=2, sessions=2)
+
+    def setUp(self):
+        super().setUp()
+        profiling.clear()
+
+    def profiled_client(self, user):
+        # Middleware ładuje się przy pierwszym żądaniu klienta, więc nowy
+        # klient widzi bieżące ustawienia.
+        client = Client()
+        client.force_login(user)
+        return client
+
+    @override_settings(TRAINING_PROFILING=True)
+    def test_server_timing_and_staff_panel(self):
+        client = self.profiled_client(self.user)
+        response = client.get(reverse("session_exercise_list"))
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn("total;dur=", response["Server-Timing"])
+
+        record = profiling.recent()[0]
+        self.assertEqual(record["view"], "session_exercise_list")
+        self.assertGreater(record["queries"], 0)
+        self.assertLessEqual(
+            len(record["slow_queries"]), settings.TRAINING_PROFILING_SLOW_QUERIES
+        )
+        self.assertTrue(
+            any(q["call_site"] for q in record["slow_queries"]),
+            "Zapytania powinny wskazywać miejsce wywołania w kodzie projektu.",
+        )
+
+        self.assertEqual(client.get(reverse("request_profiles")).status_code, 302)
+        staff = self.profiled_client(self.staff)
+        response = staff.get(reverse("request_profiles"))
+        self.assertContains(response, reverse("session_exercise_list"))
+
+    @override_settings(TRAINING_PROFILING=True, TRAINING_PROFILING_SAMPLE_RATE=0)
+    def test_sample_rate_limits_buffer(self):
+        response = self.profiled_client(self.user).get(reverse("stats"))
+        self.assertIn("Server-Timing", response)
+        self.assertEqual(profiling.recent(), [])
+
+    def test_disabled_by_default(self):
+        response = self.profiled_client(self.user).get(reverse("stats"))
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(profiling.recent(), [])
+
+    @override_settings(
+        TRAINING_PROFILING=True,
+        MIDDLEWARE=[
+            *settings.MIDDLEWARE[:1],
+            "training.tests.slow_response_middleware",
+            *settings.MIDDLEWARE[1:],
+        ],
+    )
+    def test_view_time_excludes_templates_and_middleware(self):
+        self.profiled_client(self.user).get(reverse("stats"))
+        record = profiling.recent()[0]
+        self.assertGreater(record["view_ms"], 0)
+        self.assertGreater(record["template_ms"], 0)
+        self.assertLessEqual(
+            record["view_ms"] + record["template_ms"] + SLOW_RESPONSE_SECONDS * 1000,
+            record["total_ms"],
+        )
+
+    @override_settings(TRAINING_PROFILING=True)
+    def test_middleware_keeps_async_chain_async(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        for middleware in (
+            profiling.RequestProfilingMiddleware,
+            profiling.ViewProfilingMiddleware,
+        ):
+            with self.subTest(middleware=middleware.__name__):
+                self.assertTrue(iscoroutinefunction(middleware(get_response)))
+                self.assertFalse(iscoroutinefunction(middleware(lambda r: r)))
+
+    @override_settings(TRAINING_PROFILING=True)
+    def test_streaming_queries_are_profiled(self):
+        response = self.profiled_client(self.user).get(
+            reverse("session_exercise_export")
+        )
+        # Nagłówek wychodzi przed treścią, a pomiar – dopiero po niej.
+        header = int(re.search(r'"SQL: (\d+)"', response["Server-Timing"])[1])
+        self.assertEqual(profiling.recent(), [])
+        b"".join(response.streaming_content)
+        record = profiling.recent()[0]
+        self.assertEqual(record["view"], "session_exercise_export")
+        self.assertGreater(record["queries"], header)
+        self.assertTrue(
+            any("training_sessionexercise" in q["sql"] for q in record["slow_queries"])
+        )
+
+    @override_settings(TRAINING_PROFILING=True, ROOT_URLCONF=ASYNC_URLCONF)
+    async def test_async_requests_are_profiled(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        response = await client.get(reverse("stats"))
+        self.assertIn("view;dur=", response["Server-Timing"])
+        record = profiling.recent()[0]
+        self.assertEqual(record["view"], "stats")
+        self.assertGreater(record["queries"], 0)
+        self.assertGreater(record["view_ms"], 0)
+
+
+@override_settings(TRAINING_JOBS_BACKEND="worker")
+class JobQueueTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=1, sessions=3)[0]
+
+    def test_identical_pending_jobs_are_deduplicated(self):
+        for _ in range(3):
+            jobs.enqueue("leaderboards.refresh", user_id=1, exercise_type_ids=[1, 2])
+        jobs.enqueue("leaderboards.refresh", user_id=1, exercise_type_ids=[3])
+        self.assertEqual(TrainingJob.objects.count(), 2)
+
+        # Zadanie w toku nie blokuje nowego – dane mogły się zmienić po
+        # jego rozpoczęciu.
+        jobs.claim()
+        jobs.enqueue("leaderboards.refresh", user_id=1, exercise_type_ids=[1, 2])
+        self.assertEqual(TrainingJob.objects.count(), 3)
+
+    def test_delete_recomputes_records_in_worker(self):
+        source = SessionExercise.objects.filter(created_by=self.user).first()
+        type_id = source.exercise_type_id
+        SessionExercise.objects.create(
+            training_session=source.training_session,
+            exercise_type_id=type_id,
+            weight=source.weight + 50,
+            sets=1,
+            reps=1,
+            created_by=self.user,
+        )
+        record = PersonalRecord.objects.get(
+            created_by=self.user, exercise_type_id=type_id
+        )
+        best = record.best_e1rm_exercise
+        TrainingJob.objects.all().delete()
+        self.client.force_login(self.user)
+        self.client.post(reverse("session_exercise_delete", args=[best.pk]))
+
+        # Rekord czeka na przeliczenie w tle (ćwiczenie jest usunięte miękko).
+        record.refresh_from_db()
+        self.assertEqual(record.best_e1rm_exercise_id, best.pk)
+        self.assertEqual(
+            list(TrainingJob.objects.values_list("name", flat=True)),
+            ["records.recompute"],
+        )
+
+        out = StringIO()
+        call_command("run_training_worker", "--once", stdout=out)
+        self.assertIn("Wykonane zadania: 1;", out.getvalue())
+        self.assertFalse(TrainingJob.objects.exists())
+        record.refresh_from_db()
+        self.assertEqual(record.best_e1rm_exercise_id, source.pk)
+
+    @override_settings(TRAINING_JOBS_MAX_ATTEMPTS=2)
+    def test_failed_job_is_retried_then_marked_failed(self):
+        calls = []
+
+        def flaky(**kwargs):
+            calls.append(kwargs)
+            raise ValueError("błąd testowy")
+
+        with (
+            mock.patch.dict(jobs._tasks, {"test.flaky": flaky}),
+            self.assertLogs("training.jobs", "ERROR"),
+        ):
+            jobs.enqueue("test.flaky", n=1)
+            self.assertEqual(jobs.run_pending(), 1)
+            job = TrainingJob.objects.get()
+            self.assertEqual(job.status, TrainingJob.Status.PENDING)
+            self.assertGreater(job.run_after, timezone.now())
+            self.assertIn("błąd testowy", job.last_error)
+            # Ponowienie dopiero po opóźnieniu.
+            self.assertEqual(jobs.run_pending(), 0)
+
+            TrainingJob.objects.update(run_after=timezone.now())
+            self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, TrainingJob.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(calls, [{"n": 1}, {"n": 1}])
+
+    def test_stale_running_jobs_are_requeued(self):
+        jobs.enqueue("leaderboards.refresh", user_id=self.user.pk, exercise_type_ids=[])
+        jobs.claim()
+        TrainingJob.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        job = TrainingJob.objects.get()
+        self.assertEqual(job.status, TrainingJob.Status.PENDING)
+        self.assertIn("TimeoutError", job.last_error)
+
+
+class SoftDeleteTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=2, sessions=3, exercises=4)[0]
+        call_command("rebuild_personal_records", stdout=StringIO())
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def session_with(self, count):
+        session = TrainingSession.objects.create(
+            start=timezone.now() - timedelta(hours=2),
+            end=timezone.now() - timedelta(hours=1),
+            created_by=self.user,
+        )
+        etype = ExerciseType.objects.first()
+        for i in range(count):
+            SessionExercise.objects.create(
+                training_session=session,
+                exercise_type=etype,
+                weight=200 + i,
+                sets=1,
+                reps=1,
+                created_by=self.user,
+            )
+        return session
+
+    def test_session_delete_hides_rows_and_updates_derived_data(self):
+        session = self.session_with(3)
+        url = reverse("training_session_delete", args=[session.pk])
+        self.assertEqual(self.client.post(url).status_code, 302)
+
+        self.assertFalse(TrainingSession.objects.filter(pk=session.pk).exists())
+        self.assertFalse(
+            SessionExercise.objects.filter(training_session=session.pk).exists()
+        )
+        self.assertEqual(
+            SessionExercise.all_objects.filter(
+                training_session=session.pk, deleted_at__isnull=False
+            ).count(),
+            3,
+        )
+        detail = reverse("training_session_detail", args=[session.pk])
+        self.assertEqual(self.client.get(detail).status_code, 404)
+
+        self.assertEqual(rollups.find_mismatches(), [])
+        stored = sorted(
+            PersonalRecord.objects.values_list(
+                "created_by_id", "exercise_type_id", "best_e1rm"
+            )
+        )
+        call_command("rebuild_personal_records", stdout=StringIO())
+        expected = sorted(
+            PersonalRecord.objects.values_list(
+                "created_by_id", "exercise_type_id", "best_e1rm"
+            )
+        )
+        self.assertEqual(stored, expected)
+
+    def test_session_delete_query_count_does_not_depend_on_size(self):
+        counts = []
+        for size in (1, 25):
+            session = self.session_with(size)
+            url = reverse("training_session_delete", args=[session.pk])
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(url)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_purge_removes_deleted_rows_in_batches(self):
+        session = self.session_with(5)
+        deletion.delete_session(session)
+        exercise = SessionExercise.objects.filter(created_by=self.user).first()
+        deletion.delete_exercise(exercise)
+        live = SessionExercise.objects.count()
+
+        out = StringIO()
+        call_command(
+            "purge_deleted_training",
+            "--older-than=0",
+            "--batch-size=2",
+            "--verbosity=2",
+            stdout=out,
+        )
+        self.assertIn("Usunięto 6 ćwiczeń i 1 sesji", out.getvalue())
+        self.assertEqual(out.getvalue().count("Usunięto partię"), 4)
+        self.assertFalse(SessionExercise.all_objects.filter(deleted_at__isnull=False))
+        self.assertFalse(TrainingSession.all_objects.filter(pk=session.pk).exists())
+        self.assertEqual(SessionExercise.objects.count(), live)
+
+    def test_purge_keeps_recently_deleted_rows(self):
+        deletion.delete_session(self.session_with(2))
+        call_command("purge_deleted_training", stdout=StringIO())
+        self.assertEqual(
+            SessionExercise.all_objects.filter(deleted_at__isnull=False).count(), 2
+        )
+
+
+class SessionSelectorTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.other = seed_training_data(users=2, sessions=40, exercises=1)
+        cls.sessions = list(
+            TrainingSession.objects.filter(created_by=cls.user).order_by("-start")
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def session_options(self, response):
+        select = re.search(
+            r'<select name="training_session".*?</select>',
+            response.content.decode(),
+            re.S,
+        ).group()
+        return re.findall(r'<option value="(\d+)"', select)
+
+    def test_select_lists_only_recent_sessions_and_current_one(self):
+        response = self.client.get(reverse("session_exercise_create"))
+        limit = SessionExerciseForm.RECENT_SESSIONS
+        recent = [str(s.pk) for s in self.sessions[:limit]]
+        self.assertEqual(self.session_options(response), recent)
+
+        oldest = self.sessions[-1]
+        exercise = SessionExercise.objects.get(training_session=oldest)
+        url = reverse("session_exercise_edit", args=[exercise.pk])
+        response = self.client.get(url)
+        self.assertEqual(self.session_options(response), recent + [str(oldest.pk)])
+
+    def test_post_validates_single_session_by_key(self):
+        oldest = self.sessions[-1]
+        data = {
+            "training_session": oldest.pk,
+            "exercise_type": ExerciseType.objects.first().pk,
+            "weight": 60,
+            "sets": 3,
+            "reps": 5,
+        }
+        form = SessionExerciseForm(data, user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(form.is_valid(), form.errors)
+        session_queries = [
+            q["sql"] for q in queries if "training_trainingsession" in q["sql"]
+        ]
+        self.assertEqual(len(session_queries), 1)
+        self.assertIn(f'"id" = {oldest.pk}', session_queries[0])
+
+        foreign = TrainingSession.objects.filter(created_by=self.other).first()
+        form = SessionExerciseForm(
+            {**data, "training_session": foreign.pk}, user=self.user
+        )
+        self.assertIn("training_session", form.errors)
+
+    def test_autocomplete_searches_by_date_prefix(self):
+        url = reverse("session_autocomplete")
+        oldest = timezone.localtime(self.sessions[-1].start)
+        response = self.client.get(url, {"q": f"{oldest:%Y-%m-%d}"})
+        self.assertEqual(
+            [r["id"] for r in response.json()["results"]], [self.sessions[-1].pk]
+        )
+
+        results = self.client.get(url).json()["results"]
+        self.assertEqual(
+            [r["id"] for r in results],
+            [s.pk for s in self.sessions[: SessionExerciseForm.RECENT_SESSIONS]],
+        )
+        for query in ("maj", "2024-13", "2024-02-30"):
+            with self.subTest(q=query):
+                response = self.client.get(url, {"q": query})
+                self.assertEqual(response.status_code, 400)
+
+
+class SessionSummaryTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=1, sessions=3, exercises=2)[0]
+        cls.exercise_types = list(ExerciseType.objects.all())
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def new_session(self):
+        return TrainingSession.objects.create(
+            start=timezone.now() - timedelta(minutes=90),
+            end=timezone.now(),
+            created_by=self.user,
+        )
+
+    def add_exercise(self, session, weight=50):
+        return SessionExercise.objects.create(
+            training_session=session,
+            exercise_type=self.exercise_types[0],
+            weight=weight,
+            sets=3,
+            reps=10,
+            created_by=self.user,
+        )
+
+    def assertSummary(self, session, count, volume):
+        session = TrainingSession.all_objects.get(pk=session.pk)
+        self.assertEqual(session.exercise_count, count)
+        self.assertAlmostEqual(session.total_volume, volume)
+
+    def test_summary_follows_exercise_changes(self):
+        session, other = self.new_session(), self.new_session()
+        self.assertEqual(session.duration_seconds, 90 * 60)
+        exercise = self.add_exercise(session)
+        self.add_exercise(session, weight=20)
+        self.assertSummary(session, 2, 2100)
+
+        exercise.weight = 60
+        exercise.save()
+        self.assertSummary(session, 2, 2400)
+
+        exercise.training_session = other
+        exercise.save()
+        self.assertSummary(session, 1, 600)
+        self.assertSummary(other, 1, 1800)
+
+        exercise.delete()
+        self.assertSummary(other, 0, 0)
+        self.assertEqual(list(summaries.find_drift()), [])
+
+    def test_soft_delete_and_log_view_update_summary(self):
+        session = self.new_session()
+        exercise = self.add_exercise(session)
+        self.add_exercise(session)
+        url = reverse("session_exercise_delete", args=[exercise.pk])
+        self.assertEqual(self.client.post(url).status_code, 302)
+        self.assertSummary(session, 1, 1500)
+
+        response = self.client.post(
+            reverse("training_session_log"),
+            session_log_data(
+                self.exercise_types, 3, start=session.end + timedelta(hours=1)
+            ),
+        )
+        self.assertEqual(response.status_code, 302)
+        logged = TrainingSession.objects.filter(created_by=self.user).latest("id")
+        self.assertSummary(logged, 3, (40 + 41 + 42) * 30)
+        self.assertEqual(logged.duration_seconds, 3600)
+        self.assertEqual(list(summaries.find_drift()), [])
+
+    def test_saving_stale_session_keeps_counters(self):
+        session = self.new_session()
+        stale = TrainingSession.objects.get(pk=session.pk)
+        self.add_exercise(session)
+        stale.end += timedelta(minutes=30)
+        stale.save()
+        self.assertSummary(session, 1, 1500)
+        session.refresh_from_db()
+        self.assertEqual(session.duration_seconds, 120 * 60)
+
+    def test_repair_command_fixes_drift(self):
+        session = TrainingSession.objects.filter(created_by=self.user).first()
+        TrainingSession.objects.filter(pk=session.pk).update(
+            exercise_count=7, total_volume=1, duration_seconds=5
+        )
+        with self.assertRaises(CommandError):
+            call_command(
+                "repair_session_summaries",
+                "--check-only",
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+
+        out = StringIO()
+        call_command(
+            "repair_session_summaries",
+            "--batch-size",
+            "2",
+            stdout=out,
+            stderr=StringIO(),
+        )
+        self.assertIn("Poprawiono podsumowania sesji: 1.", out.getvalue())
+        self.assertEqual(list(summaries.find_drift()), [])
+        self.assertSummary(session, 2, (20 + 25) * 24)
+
+    def test_list_and_stats_show_summaries(self):
+        response = self.client.get(reverse("training_session_list"))
+        self.assertContains(response, "1080 kg")
+        response = self.client.get(reverse("stats"), {"range": "all"})
+        self.assertContains(response, "<strong>Sesje:</strong> 3")
+        self.assertContains(response, "<strong>Ćwiczenia:</strong> 6")
+
+
+class SessionOverlapTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=2, sessions=4, exercises=2)[0]
+        cls.exercise_types = list(ExerciseType.objects.all())
+        cls.base = timezone.now().replace(second=0, microsecond=0) + timedelta(
+            days=1
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def session(self, start_minutes, end_minutes, exercises=0):
+        session = TrainingSession.objects.create(
+            start=self.base + timedelta(minutes=start_minutes),
+            end=self.base + timedelta(minutes=end_minutes),
+            created_by=self.user,
+        )
+        for i in range(exercises):
+            SessionExercise.objects.create(
+                training_session=session,
+                exercise_type=self.exercise_types[i],
+                weight=30 + i,
+                sets=3,
+                reps=10,
+                created_by=self.user,
+            )
+        return session
+
+    def post_session(self, start_minutes, end_minutes, session=None):
+        data = {
+            "start": f"{self.base + timedelta(minutes=start_minutes):%Y-%m-%dT%H:%M}",
+            "end": f"{self.base + timedelta(minutes=end_minutes):%Y-%m-%dT%H:%M}",
+        }
+        if session is None:
+            url = reverse("training_session_create")
+        else:
+            url = reverse("training_session_edit", args=[session.pk])
+        return self.client.post(url, data)
+
+    def test_form_rejects_overlapping_sessions(self):
+        existing = self.session(60, 120)
+        for start, end in [(30, 90), (90, 100), (100, 150), (0, 180), (60, 60)]:
+            with self.subTest(start=start, end=end):
+                response = self.post_session(start, end)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, "nakłada się na inną sesję")
+
+        # Sesje stykające się z istniejącą są w porządku.
+        self.assertEqual(self.post_session(0, 60).status_code, 302)
+        self.assertEqual(self.post_session(120, 180).status_code, 302)
+        # Edycja nie porównuje sesji z nią samą...
+        self.assertEqual(self.post_session(70, 110, existing).status_code, 302)
+        # ...ale z pozostałymi tak.
+        self.assertEqual(self.post_session(50, 110, existing).status_code, 200)
+
+    def test_api_rejects_overlapping_session(self):
+        self.session(60, 120)
+        response = self.client.post(
+            reverse("api_training_sessions"),
+            {
+                "start": (self.base + timedelta(minutes=90)).isoformat(),
+                "end": (self.base + timedelta(minutes=150)).isoformat(),
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_check_query_count_does_not_depend_on_history(self):
+        self.session(60, 120)
+        with self.assertNumQueries(2):
+            self.assertIsNone(
+                overlaps.find(
+                    self.user.pk,
+                    self.base + timedelta(minutes=120),
+                    self.base + timedelta(minutes=180),
+                )
+            )
+
+    def test_merge_command_merges_overlapping_groups(self):
+        first = self.session(0, 60, exercises=2)
+        second = self.session(30, 90, exercises=1)
+        third = self.session(80, 100, exercises=2)
+        duplicate = self.session(200, 260, exercises=1)
+        self.session(200, 230)
+        separate = self.session(300, 360, exercises=1)
+
+        out = StringIO()
+        call_command("merge_overlapping_sessions", "--dry-run", stdout=out)
+        self.assertIn("Znaleziono grupy nakładających się sesji: 2", out.getvalue())
+        self.assertEqual(
+            TrainingSession.objects.filter(created_by=self.user).count(), 10
+        )
+
+        out = StringIO()
+        call_command("merge_overlapping_sessions", "--user", "user0", stdout=out)
+        self.assertIn("Scalono grupy nakładających się sesji: 2", out.getvalue())
+        live = set(TrainingSession.objects.values_list("pk", flat=True))
+        self.assertNotIn(second.pk, live)
+        self.assertNotIn(third.pk, live)
+        self.assertIn(separate.pk, live)
+
+        first.refresh_from_db()
+        self.assertEqual(first.end, self.base + timedelta(minutes=100))
+        self.assertEqual(first.duration_seconds, 100 * 60)
+        self.assertEqual(first.exercise_count, 5)
+        exercises = SessionExercise.objects.filter(training_session=first)
+        self.assertEqual(len(exercises), 5)
+        self.assertTrue(all(e.session_start == first.start for e in exercises))
+        duplicate.refresh_from_db()
+        self.assertEqual(duplicate.exercise_count, 1)
+
+        self.assertEqual(list(overlaps.clusters(self.user.pk)), [])
+        self.assertEqual(list(summaries.find_drift()), [])
+        self.assertEqual(rollups.find_mismatches(), [])
+
+
+class FragmentCacheTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data(users=2, sessions=3)[0]
+        cls.session = TrainingSession.objects.filter(created_by=cls.user).first()
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.urls = [
+            reverse("training_session_detail", args=[self.session.pk]),
+            reverse("session_exercise_list"),
+        ]
+
+    def test_hit_skips_orm(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.client.get(url)
+                before = fragments.stats()["hits"]
+                # Tylko sesja i użytkownik.
+                with self.assertNumQueries(2):
+                    self.client.get(url)
+                self.assertEqual(fragments.stats()["hits"], before + 1)
+
+    def test_changes_from_views_and_admin_invalidate(self):
+        for url in self.urls:
+            self.client.get(url)
+        exercise = self.session.exercises.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("session_exercise_edit", args=[exercise.pk]),
+                {
+                    "training_session": self.session.pk,
+                    "exercise_type": exercise.exercise_type_id,
+                    "weight": 123,
+                    "sets": 3,
+                    "reps": 5,
+                },
+            )
+        for url in self.urls:
+            self.assertContains(self.client.get(url), "123")
+
+        # Zapis modelu (jak w panelu admina) też unieważnia fragmenty.
+        exercise.refresh_from_db()
+        exercise.weight = 77
+        with self.captureOnCommitCallbacks(execute=True):
+            exercise.save()
+        for url in self.urls:
+            self.assertContains(self.client.get(url), "77")
+
+    def test_other_users_session_is_not_found(self):
+        other = TrainingSession.objects.exclude(created_by=self.user).first()
+        url = reverse("training_session_detail", args=[other.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_stats_endpoint_is_staff_only(self):
+        url = reverse("cache_stats_json")
+        self.assertIn("hit_ratio", self.client.get(url).json()["fragments"])
+        self.client.force_login(User.objects.get(username="user1"))
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+
+class AdminPerformanceTests(TrainingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_training_data(users=3, sessions=4, exercises=3)
+        cls.admin = User.objects.create_superuser("szef", password="haslo-testowe")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+
+    def changelist(self, model, params=None):
+        url = reverse(f"admin:training_{model}_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, queries
+
+    @override_settings(TRAINING_ADMIN_EXACT_COUNT_LIMIT=0)
+    def test_query_count_does_not_depend_on_rows(self):
+        for model in ("sessionexercise", "trainingsession"):
+            with self.subTest(model=model):
+                _, before = self.changelist(model)
+                user = self.users[0]
+                session = TrainingSession.objects.create(
+                    start=timezone.now(), end=timezone.now(), created_by=user
+                )
+                for _ in range(5):
+                    SessionExercise.objects.create(
+                        training_session=session,
+                        exercise_type=ExerciseType.objects.last(),
+                        weight=10,
+                        sets=1,
+                        reps=1,
+                        created_by=user,
+                    )
+                _, after = self.changelist(model)
+                self.assertEqual(len(before), len(after))
+                sql = " ".join(q["sql"] for q in after.captured_queries)
+                self.assertNotIn("COUNT(", sql)
+
+    def test_sidebar_does_not_list_all_users(self):
+        response, _ = self.changelist("sessionexercise")
+        self.assertContains(response, "admin-autocomplete")
+        self.assertNotContains(response, f'?created_by__id__exact={self.users[1].pk}"')
+        response, _ = self.changelist(
+            "sessionexercise", {"created_by__id__exact": self.users[1].pk}
+        )
+        self.assertEqual(
+            {e.created_by_id for e in response.context["cl"].result_list},
+            {self.users[1].pk},
+        )
+
+    def test_indexed_search(self):
+        response, _ = self.changelist("sessionexercise", {"q": "user1"})
+        self.assertEqual(
+            {e.created_by_id for e in response.context["cl"].result_list},
+            {self.users[1].pk},
+        )
+        response, queries = self.changelist("sessionexercise", {"q": "ĆWICZENIE 001"})
+        self.assertEqual(
+            {e.exercise_type.name for e in response.context["cl"].result_list},
+            {"Ćwiczenie 001"},
+        )
+        self.assertNotIn("LIKE", " ".join(q["sql"] for q in queries.captured_queries))
+
+    def test_estimated_count_above_limit(self):
+        with self.settings(TRAINING_ADMIN_EXACT_COUNT_LIMIT=5):
+            response, _ = self.changelist("sessionexercise")
+        first, last = SessionExercise.all_objects.aggregate(
+            first=Min("pk"), last=Max("pk")
+        ).values()
+        self.assertEqual(response.context["cl"].result_count, last - first + 1)
+
+    def test_autocomplete_filter_endpoint(self):
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "app_label": "training",
+                "model_name": "sessionexercise",
+                "field_name": "created_by",
+                "term": "user2",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["text"] for r in response.json()["results"]], ["user2"])
+
+
+class QueryPlanTests(TrainingTestCase):
+    """
+    Każde zapytanie wykonywane przez widoki aplikacji musi korzystać z indeksu:
+    EXPLAIN QUERY PLAN nie może zwrócić pełnego skanu tabeli ani sortowania
+    w tymczasowym B-drzewie. Wyjątkiem są zapytania grupujące (GROUP BY,
+    DISTINCT) – sortują wtedy tylko wiersze już zawężone wyszukiwaniem
+    w indeksie, a nie całą tabelę.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed_training_data()[0]
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN jest specyficzny dla SQLite.")
+        self.client.force_login(self.user)
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexedPlan(self, sql):
+        plan = self.explain(sql)
+        grouped = "GROUP BY" in sql or sql.lstrip().startswith("SELECT DISTINCT")
+        for detail in plan:
+            if grouped:
+                self.assertFalse(detail.startswith("SCAN "), sql)
+            else:
+                self.assertNotIn("USE TEMP B-TREE", detail, sql)
+            if detail.startswith("SCAN "):
+                # Przegląd całej tabeli jest dopuszczalny tylko po indeksie
+                # (np. lista typów ćwiczeń w kolejności alfabetycznej).
+                self.assertIn("USING", detail, sql)
+
+    def test_views_use_indexes(self):
+        for name, url, method, data in training_routes(self.user):
+            with self.subTest(view=name):
+                with CaptureQueriesContext(connection) as queries:
+                    response = getattr(self.client, method)(url, data)
+                self.assertLess(response.status_code, 400)
+                for query in queries.captured_queries:
+                    sql = query["sql"]
+                    if sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                        self.assertIndexedPlan(sql)
+
+
+class RouteBenchmarkTests(TrainingTestCase):
+    """
+    Benchmark wszystkich tras: liczba zapytań, czas i rozmiar odpowiedzi
+    dla kilku skal danych (użytkownicy × sesje × ćwiczenia).
+
+    Skale ustawia zmienna BEFIT_BENCH_SCALES, np. "2x5x2,5x200x6".
+    Jeśli ustawiono BEFIT_BENCH_REPORT, wyniki trafiają do tego pliku JSON.
+    """
+
+    DEFAULT_SCALES = "2x5x2,4x60x5"
+
+    def scales(self):
+        raw = os.environ.get("BEFIT_BENCH_SCALES", self.DEFAULT_SCALES)
+        return [tuple(int(n) for n in scale.split("x")) for scale in raw.split(",")]
+
+    def measure(self, user, url, method, data):
+        self.client.force_login(user)
+        # Pomiar przy zimnym cache – liczba zapytań nie zależy od kolejności tras.
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(url, data)
+            if response.streaming:
+                content = b"".join(response.streaming_content)
+            else:
+                content = response.content
+            elapsed = time.perf_counter() - started
+        return {
+            "status": response.status_code,
+            "queries": len(queries),
+            "time_ms": round(elapsed * 1000, 3),
+            "bytes": len(content),
+        }
+
+    def run_scale(self, users, sessions, exercises):
+        results = {}
+        with transaction.atomic():
+            user = seed_training_data(users, sessions, exercises)[0]
+            for name, url, method, data in training_routes(user):
+                # Każda trasa startuje z tego samego stanu bazy.
+                with transaction.atomic():
+                    results[name] = self.measure(user, url, method, data)
+                    transaction.set_rollback(True)
+            transaction.set_rollback(True)
+        return results
+
+    def test_every_route_is_covered(self):
+        user = seed_training_data(users=1, sessions=2, exercises=2)[0]
+        named = {pattern.name for pattern in urls.urlpatterns}
+        self.assertEqual({name for name, *_ in training_routes(user)}, named)
+
+    def test_query_counts_do_not_grow_with_data(self):
+        report = []
+        for users, sessions, exercises in self.scales():
+            report.append(
+                {
+                    "scale": {
+                        "users": users,
+                        "sessions": sessions,
+                        "exercises": exercises,
+                    },
+                    "routes": self.run_scale(users, sessions, exercises),
+                }
+            )
+
+        report_path = os.environ.get("BEFIT_BENCH_REPORT")
+        if report_path:
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"generated_at": timezone.now().isoformat(), "runs": report},
+                    f,
+                    indent=2,
+                )
+
+        baseline = report[0]["routes"]
+        for run in report:
+            for name, result in run["routes"].items():
+                with self.subTest(route=name, scale=run["scale"]):
+                    self.assertLess(result["status"], 400)
+                    self.assertEqual(
+                        result["queries"],
+                        baseline[name]["queries"],
+                        "Liczba zapytań zależy od rozmiaru danych.",
+                    )
@@ -1,12 +1,25 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
+
+
+def read_view(name):
+    # Widoki odczytu mają wersję async def (przedrostek "a"), używaną pod ASGI.
+    if getattr(settings, "TRAINING_ASYNC_VIEWS", False):
+        return getattr(views, f"a{name}")
+    return getattr(views, name)
+
 
 urlpatterns = [
     # Strona główna
     path("", views.home, name="home"),
 
     # Typy ćwiczeń
-    path("exercise-types/", views.exercise_type_list, name="exercise_type_list"),
+    path(
+        "exercise-types/",
+        read_view("exercise_type_list"),
+        name="exercise_type_list",
+    ),
     path(
         "exercise-types/create/",
         views.exercise_type_create,
@@ -24,17 +37,31 @@ urlpatterns = [
     ),
 
     # Sesje treningowe
-    path("training-sessions/", views.training_session_list, name="training_session_list"),
+    path(
+        "training-sessions/",
+        read_view("training_session_list"),
+        name="training_session_list",
+    ),
     path(
         "training-sessions/create/",
         views.training_session_create,
         name="training_session_create",
     ),
+    path(
+        "training-sessions/log/",
+        views.training_session_log,
+        name="training_session_log",
+    ),
     path(
         "training-sessions/<int:pk>/",
-        views.training_session_detail,
+        read_view("training_session_detail"),
         name="training_session_detail",
     ),
+    path(
+        "training-sessions/autocomplete/",
+        views.session_autocomplete,
+        name="session_autocomplete",
+    ),
     path(
         "training-sessions/<int:pk>/edit/",
         views.training_session_edit,
@@ -49,9 +76,14 @@ urlpatterns = [
     # Wykonane ćwiczenia
     path(
         "session-exercises/",
-        views.session_exercise_list,
+        read_view("session_exercise_list"),
         name="session_exercise_list",
     ),
+    path(
+        "session-exercises/export/",
+        views.session_exercise_export,
+        name="session_exercise_export",
+    ),
     path(
         "session-exercises/create/",
         views.session_exercise_create,
@@ -69,5 +101,47 @@ urlpatterns = [
     ),
 
     # Statystyki
-    path("stats/", views.stats_view, name="stats"),
+    path("stats/", read_view("stats_view"), name="stats"),
+    path(
+        "stats/records/",
+        views.personal_records_json,
+        name="personal_records_json",
+    ),
+    path(
+        "stats/trends/",
+        views.progress_trends_json,
+        name="progress_trends_json",
+    ),
+
+    # Monitoring
+    path("monitoring/cache/", views.cache_stats_json, name="cache_stats_json"),
+    path("monitoring/requests/", views.request_profiles, name="request_profiles"),
+
+    # JSON API
+    path("api/exercise-types/", api.exercise_types, name="api_exercise_types"),
+    path(
+        "api/exercise-types/<int:pk>/",
+        api.exercise_type_detail,
+        name="api_exercise_type_detail",
+    ),
+    path(
+        "api/training-sessions/",
+        api.training_sessions,
+        name="api_training_sessions",
+    ),
+    path(
+        "api/training-sessions/<int:pk>/",
+        api.training_session_detail,
+        name="api_training_session_detail",
+    ),
+    path(
+        "api/session-exercises/",
+        api.session_exercises,
+        name="api_session_exercises",
+    ),
+    path(
+        "api/session-exercises/<int:pk>/",
+        api.session_exercise_detail,
+        name="api_session_exercise_detail",
+    ),
 ]
@@ -0,0 +1,85 @@
+"""
+Wersje danych w pamięci podręcznej, wspólne dla wszystkich procesów serwera.
+
+Zapamiętane dane (np. katalog typów ćwiczeń) leżą pod kluczem zawierającym
+wersję, a każda zmiana danych podbija wersję – starej zawartości nikt już nie
+odczyta. Działa to tylko wtedy, gdy podbicie widzą wszystkie procesy.
+
+Przy wspólnym cache (Redis, Memcached, baza danych) wersja leży w nim i jej
+odczyt nie wykonuje zapytania. Cache lokalny dla procesu (LocMemCache –
+domyślny w Django – albo DummyCache) nie widzi podbicia z innego procesu,
+więc wtedy wersja czytana jest z bazy (CacheVersion, jeden odczyt po kluczu
+głównym). Wykrycie na podstawie backendu nadpisuje TRAINING_SHARED_CACHE.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import CacheVersion
+
+
+# Backendy cache, których zawartość widzi tylko bieżący proces.
+LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def shared_cache():
+    """
+    Czy cache Django jest wspólny dla wszystkich procesów serwera.
+    """
+    shared = getattr(settings, "TRAINING_SHARED_CACHE", None)
+    if shared is not None:
+        return shared
+    return settings.CACHES[DEFAULT_CACHE_ALIAS]["BACKEND"] not in LOCAL_CACHE_BACKENDS
+
+
+def _fresh_version():
+    # Po utracie wersji numeracja startuje od bieżącego czasu, więc nie
+    # powtórzy wersji, którą klient mógł już zapamiętać (np. w ETag).
+    return int(time.time() * 1000)
+
+
+def _stored(key):
+    return CacheVersion.objects.filter(key=key).values_list("version", flat=True)
+
+
+def get(key):
+    if shared_cache():
+        return cache.get_or_set(key, _fresh_version, timeout=None)
+    return _stored(key).first() or 0
+
+
+async def aget(key):
+    if shared_cache():
+        return await cache.aget_or_set(key, _fresh_version, timeout=None)
+    return await _stored(key).afirst() or 0
+
+
+def bump(key):
+    """
+    Unieważnia dane zapamiętane pod kluczem we wszystkich procesach.
+    """
+    if not shared_cache():
+        _bump_stored(key)
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _fresh_version(), timeout=None)
+
+
+def _bump_stored(key):
+    versions = CacheVersion.objects.filter(key=key)
+    if versions.update(version=F("version") + 1):
+        return
+    try:
+        with transaction.atomic():
+            CacheVersion.objects.create(key=key, version=_fresh_version())
+    except IntegrityError:
+        versions.update(version=F("version") + 1)
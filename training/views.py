@@ -1,12 +1,64 @@
-from datetime import timedelta
+import csv
+import hashlib
+import re
+from datetime import datetime, timedelta
+from functools import wraps
 
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+from . import (
+    analytics,
+    catalogue,
+    deletion,
+    fragments,
+    jobs,
+    leaderboards,
+    profiling,
+    records,
+    rollups,
+    stamps,
+    stats,
+    summaries,
+)
+from .forms import (
+    TrainingSessionForm,
+    SessionExerciseForm,
+    SessionExerciseFormSet,
+    ExerciseTypeForm,
+    StatsFilterForm,
+)
+from .models import (
+    ExerciseType,
+    PersonalRecord,
+    TrainingSession,
+    SessionExercise,
+)
+from .pagination import akeyset_page, keyset_page
+from .routers import pins_primary
+
+
+def _async_user(view):
+    """
+    Dla widoków async def: użytkownik wczytywany asynchronicznie, raz na
+    żądanie. Dalej request.user (szablony, funkcje ETag) nie wykonuje już
+    zapytań, które w kontekście asynchronicznym byłyby niedozwolone.
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        return await view(request, *args, **kwargs)
 
-from .forms import TrainingSessionForm, SessionExerciseForm, ExerciseTypeForm
-from .models import ExerciseType, TrainingSession, SessionExercise
+    return wrapper
 
 
 # --- Strona główna ---
@@ -19,15 +71,96 @@ def home(request):
 # --- Typy ćwiczeń ---
 
 
+def _exercise_type_list_etag(request):
+    # Strona zależy od katalogu i rankingów, ale też od zalogowanego
+    # użytkownika (pasek nawigacji, przyciski admina, jego miejsca) i tokenu
+    # CSRF w formularzu wylogowania.
+    user = request.user
+    versions = getattr(request, "_list_versions", None) or (
+        catalogue.version(),
+        leaderboards.version(),
+    )
+    raw = (
+        f"{versions[0]}:{versions[1]}:{user.pk}:"
+        f"{user.is_staff}:{request.META.get('CSRF_COOKIE', '')}"
+    )
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+@condition(etag_func=_exercise_type_list_etag)
 def exercise_type_list(request):
     """
-    Publiczna lista typów ćwiczeń (bez logowania).
+    Publiczna lista typów ćwiczeń (bez logowania) z rankingami użytkowników.
+    Typy pochodzą z katalogu, czołówki z tabeli rankingów (obie w pamięci
+    podręcznej), a niezmieniona strona jest obsługiwana warunkowo (ETag → 304).
     """
-    types = ExerciseType.objects.all().order_by("name")
-    return render(request, "training/exercise_type_list.html", {"types": types})
+    types = catalogue.exercise_types()
+    ranks = {}
+    if request.user.is_authenticated:
+        ranks = leaderboards.my_ranks(request.user.pk)
+    response = render(
+        request,
+        "training/exercise_type_list.html",
+        _exercise_type_list_context(types, leaderboards.boards(types), ranks),
+    )
+    patch_vary_headers(response, ["Cookie"])
+    return response
+
+
+def _async_list_versions(view):
+    # Wersje katalogu i rankingów mogą wymagać zapytania (training/versions.py),
+    # a funkcja ETag dekoratora condition jest synchroniczna.
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request._list_versions = (
+            await catalogue.aversion(),
+            await leaderboards.aversion(),
+        )
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@_async_user
+@_async_list_versions
+@condition(etag_func=_exercise_type_list_etag)
+async def aexercise_type_list(request):
+    """
+    Asynchroniczna wersja exercise_type_list.
+    """
+    types = await catalogue.aexercise_types()
+    ranks = {}
+    if request.user.is_authenticated:
+        ranks = await leaderboards.amy_ranks(request.user.pk)
+    response = render(
+        request,
+        "training/exercise_type_list.html",
+        _exercise_type_list_context(types, await leaderboards.aboards(types), ranks),
+    )
+    patch_vary_headers(response, ["Cookie"])
+    return response
+
+
+def _exercise_type_list_context(types, boards, ranks):
+    rows = [
+        {
+            "type": t,
+            "boards": [
+                {
+                    "label": label,
+                    "top": boards.get(t.pk, {}).get(metric, []),
+                    "mine": ranks.get((t.pk, metric)),
+                }
+                for metric, label in leaderboards.Metric.choices
+            ],
+        }
+        for t in types
+    ]
+    return {"types": types, "rows": rows, "metrics": leaderboards.Metric.labels}
 
 
 @staff_member_required
+@pins_primary
 def exercise_type_create(request):
     """
     Tworzenie typu ćwiczenia – tylko admin (is_staff).
@@ -48,6 +181,7 @@ def exercise_type_create(request):
 
 
 @staff_member_required
+@pins_primary
 def exercise_type_edit(request, pk):
     """
     Edycja typu ćwiczenia – tylko admin.
@@ -70,6 +204,7 @@ def exercise_type_edit(request, pk):
 
 
 @staff_member_required
+@pins_primary
 def exercise_type_delete(request, pk):
     """
     Usuwanie typu ćwiczenia – tylko admin.
@@ -95,13 +230,33 @@ def training_session_list(request):
     """
     Lista sesji treningowych zalogowanego użytkownika.
     """
-    sessions = TrainingSession.objects.filter(created_by=request.user).order_by(
-        "-start"
+    sessions = keyset_page(
+        TrainingSession.objects.filter(created_by=request.user),
+        request.GET,
+        "start",
     )
     return render(
         request,
         "training/training_session_list.html",
-        {"sessions": sessions},
+        {"sessions": sessions, "page": sessions},
+    )
+
+
+@_async_user
+@login_required
+async def atraining_session_list(request):
+    """
+    Asynchroniczna wersja training_session_list.
+    """
+    sessions = await akeyset_page(
+        TrainingSession.objects.filter(created_by=request.user),
+        request.GET,
+        "start",
+    )
+    return render(
+        request,
+        "training/training_session_list.html",
+        {"sessions": sessions, "page": sessions},
     )
 
 
@@ -110,34 +265,81 @@ def training_session_detail(request, pk):
     """
     Szczegóły pojedynczej sesji zalogowanego użytkownika
     + lista wykonanych ćwiczeń w tej sesji (tylko jego).
+    Wyrenderowana część z danymi jest zapamiętywana do następnej zmiany danych
+    użytkownika – trafienie nie wykonuje zapytań.
     """
-    session = get_object_or_404(TrainingSession, pk=pk, created_by=request.user)
-    exercises = (
-        SessionExercise.objects.filter(
-            training_session=session, created_by=request.user
-        ).select_related("exercise_type")
-    )
-    context = {
-        "session": session,
-        "exercises": exercises,
-    }
-    return render(request, "training/training_session_detail.html", context)
+
+    def render_fragment():
+        session = get_object_or_404(TrainingSession, pk=pk, created_by=request.user)
+        exercises = _session_detail_exercises(session, request.user)
+        return _session_detail_fragment(request, session, exercises)
+
+    fragment = fragments.get_or_render(
+        request.user.pk, "training_session_detail", [pk], render_fragment
+    )
+    return render(
+        request, "training/training_session_detail.html", {"fragment": fragment}
+    )
+
+
+@_async_user
+@login_required
+async def atraining_session_detail(request, pk):
+    """
+    Asynchroniczna wersja training_session_detail.
+    """
+
+    async def render_fragment():
+        try:
+            session = await TrainingSession.objects.aget(
+                pk=pk, created_by=request.user
+            )
+        except TrainingSession.DoesNotExist:
+            raise Http404("Nie znaleziono sesji treningowej.")
+        exercises = [
+            e async for e in _session_detail_exercises(session, request.user)
+        ]
+        return _session_detail_fragment(request, session, exercises)
+
+    fragment = await fragments.aget_or_render(
+        request.user.pk, "training_session_detail", [pk], render_fragment
+    )
+    return render(
+        request, "training/training_session_detail.html", {"fragment": fragment}
+    )
+
+
+def _session_detail_exercises(session, user):
+    return (
+        SessionExercise.objects.filter(training_session=session, created_by=user)
+        .select_related("exercise_type")
+        .order_by("id")
+    )
+
+
+def _session_detail_fragment(request, session, exercises):
+    return render_to_string(
+        "training/fragments/training_session_detail.html",
+        {"session": session, "exercises": exercises},
+        request,
+    )
 
 
 @login_required
+@pins_primary
 def training_session_create(request):
     """
     Tworzenie nowej sesji – przypisywana automatycznie do zalogowanego użytkownika.
     """
     if request.method == "POST":
-        form = TrainingSessionForm(request.POST)
+        form = TrainingSessionForm(request.POST, user=request.user)
         if form.is_valid():
             session = form.save(commit=False)
             session.created_by = request.user
             session.save()
             return redirect("training_session_list")
     else:
-        form = TrainingSessionForm()
+        form = TrainingSessionForm(user=request.user)
 
     return render(
         request,
@@ -147,6 +349,55 @@ def training_session_create(request):
 
 
 @login_required
+@pins_primary
+def training_session_log(request):
+    """
+    Zapis całej sesji razem z wykonanymi ćwiczeniami w jednym formularzu.
+    Walidacja odbywa się w pamięci, a zapis to jeden INSERT sesji i jeden
+    bulk_create ćwiczeń w jednej transakcji – liczba zapytań nie zależy
+    od liczby wierszy.
+    """
+    if request.method == "POST":
+        form = TrainingSessionForm(request.POST, user=request.user)
+        formset = SessionExerciseFormSet(request.POST, prefix="exercises")
+        if form.is_valid() and formset.is_valid():
+            with transaction.atomic():
+                session = form.save(commit=False)
+                session.created_by = request.user
+                session.save()
+
+                exercises = formset.save(commit=False)
+                for exercise in exercises:
+                    exercise.training_session = session
+                    exercise.session_start = session.start
+                    exercise.created_by = request.user
+                SessionExercise.objects.bulk_create(exercises)
+                summaries.add_exercises(exercises)
+                records.apply_new(exercises)
+                jobs.enqueue_types(
+                    "leaderboards.refresh",
+                    request.user.pk,
+                    {e.exercise_type_id for e in exercises},
+                )
+                rollups.refresh_period(
+                    request.user.pk,
+                    rollups.period_start(session.start),
+                    {e.exercise_type_id for e in exercises},
+                )
+            return redirect("training_session_detail", pk=session.pk)
+    else:
+        form = TrainingSessionForm(user=request.user)
+        formset = SessionExerciseFormSet(prefix="exercises")
+
+    return render(
+        request,
+        "training/training_session_log.html",
+        {"form": form, "formset": formset, "title": "Zapisz trening"},
+    )
+
+
+@login_required
+@pins_primary
 def training_session_edit(request, pk):
     """
     Edycja sesji – tylko jeśli należy do zalogowanego użytkownika.
@@ -154,12 +405,12 @@ def training_session_edit(request, pk):
     session = get_object_or_404(TrainingSession, pk=pk, created_by=request.user)
 
     if request.method == "POST":
-        form = TrainingSessionForm(request.POST, instance=session)
+        form = TrainingSessionForm(request.POST, instance=session, user=request.user)
         if form.is_valid():
             form.save()
             return redirect("training_session_list")
     else:
-        form = TrainingSessionForm(instance=session)
+        form = TrainingSessionForm(instance=session, user=request.user)
 
     return render(
         request,
@@ -169,14 +420,17 @@ def training_session_edit(request, pk):
 
 
 @login_required
+@pins_primary
 def training_session_delete(request, pk):
     """
     Usuwanie sesji – tylko jeśli należy do zalogowanego użytkownika.
+    Usunięcie jest miękkie (training/deletion.py), więc trwa tyle samo
+    niezależnie od liczby ćwiczeń w sesji.
     """
     session = get_object_or_404(TrainingSession, pk=pk, created_by=request.user)
 
     if request.method == "POST":
-        session.delete()
+        deletion.delete_session(session)
         return redirect("training_session_list")
 
     return render(
@@ -186,6 +440,55 @@ def training_session_delete(request, pk):
     )
 
 
+DATE_PREFIX = re.compile(r"^(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?$")
+
+
+def _date_prefix_range(query):
+    """
+    Zakres [od, do) początku sesji dla prefiksu daty RRRR[-MM[-DD]] (w strefie
+    lokalnej) albo None, jeśli zapytanie nie jest poprawnym prefiksem.
+    """
+    match = DATE_PREFIX.match(query)
+    if not match:
+        return None
+    year, month, day = (int(part) if part else None for part in match.groups())
+    try:
+        if day:
+            since = datetime(year, month, day)
+            until = since + timedelta(days=1)
+        elif month:
+            since = datetime(year, month, 1)
+            until = datetime(year + month // 12, month % 12 + 1, 1)
+        else:
+            since, until = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    except ValueError:
+        return None
+    return timezone.make_aware(since), timezone.make_aware(until)
+
+
+@login_required
+def session_autocomplete(request):
+    """
+    Podpowiedzi sesji dla formularza ćwiczenia: ?q=RRRR[-MM[-DD]] zawęża listę
+    do sesji rozpoczętych w danym roku, miesiącu lub dniu, pusty q zwraca
+    najnowsze. Zapytanie to zakres w indeksie (użytkownik, start), ucięty
+    po SessionExerciseForm.RECENT_SESSIONS wynikach.
+    """
+    query = request.GET.get("q", "").strip()
+    sessions = TrainingSession.objects.filter(created_by=request.user)
+    if query:
+        bounds = _date_prefix_range(query)
+        if bounds is None:
+            return JsonResponse(
+                {"error": "q musi mieć postać RRRR, RRRR-MM albo RRRR-MM-DD."},
+                status=400,
+            )
+        sessions = sessions.filter(start__gte=bounds[0], start__lt=bounds[1])
+    limit = SessionExerciseForm.RECENT_SESSIONS
+    sessions = sessions.order_by("-start", "-id")[:limit]
+    return JsonResponse({"results": [{"id": s.pk, "label": str(s)} for s in sessions]})
+
+
 # --- Wykonane ćwiczenia ---
 
 
@@ -193,20 +496,70 @@ def training_session_delete(request, pk):
 def session_exercise_list(request):
     """
     Lista wykonanych ćwiczeń zalogowanego użytkownika.
+    Strony listy (osobno dla każdego kursora) są zapamiętywane jak szczegóły sesji.
     """
-    exercises = (
-        SessionExercise.objects.filter(created_by=request.user)
-        .select_related("exercise_type", "training_session")
-        .order_by("-training_session__start")
+
+    def render_fragment():
+        exercises = keyset_page(
+            _session_exercises(request.user), request.GET, "session_start"
+        )
+        return _session_exercise_list_fragment(request, exercises)
+
+    fragment = fragments.get_or_render(
+        request.user.pk,
+        "session_exercise_list",
+        _page_key(request),
+        render_fragment,
+    )
+    return render(
+        request, "training/session_exercise_list.html", {"fragment": fragment}
+    )
+
+
+@_async_user
+@login_required
+async def asession_exercise_list(request):
+    """
+    Asynchroniczna wersja session_exercise_list.
+    """
+
+    async def render_fragment():
+        exercises = await akeyset_page(
+            _session_exercises(request.user), request.GET, "session_start"
+        )
+        return _session_exercise_list_fragment(request, exercises)
+
+    fragment = await fragments.aget_or_render(
+        request.user.pk,
+        "session_exercise_list",
+        _page_key(request),
+        render_fragment,
     )
     return render(
+        request, "training/session_exercise_list.html", {"fragment": fragment}
+    )
+
+
+def _session_exercises(user):
+    return SessionExercise.objects.filter(created_by=user).select_related(
+        "exercise_type", "training_session"
+    )
+
+
+def _page_key(request):
+    return [request.GET.get("after", ""), request.GET.get("before", "")]
+
+
+def _session_exercise_list_fragment(request, exercises):
+    return render_to_string(
+        "training/fragments/session_exercise_list.html",
+        {"exercises": exercises, "page": exercises},
         request,
-        "training/session_exercise_list.html",
-        {"exercises": exercises},
     )
 
 
 @login_required
+@pins_primary
 def session_exercise_create(request):
     if request.method == "POST":
         form = SessionExerciseForm(request.POST, user=request.user)
@@ -226,6 +579,7 @@ def session_exercise_create(request):
 
 
 @login_required
+@pins_primary
 def session_exercise_edit(request, pk):
     exercise = get_object_or_404(SessionExercise, pk=pk, created_by=request.user)
 
@@ -247,11 +601,12 @@ def session_exercise_edit(request, pk):
 
 
 @login_required
+@pins_primary
 def session_exercise_delete(request, pk):
     exercise = get_object_or_404(SessionExercise, pk=pk, created_by=request.user)
 
     if request.method == "POST":
-        exercise.delete()
+        deletion.delete_exercise(exercise)
         return redirect("session_exercise_list")
 
     return render(
@@ -261,28 +616,248 @@ def session_exercise_delete(request, pk):
     )
 
 
+EXPORT_COLUMNS = (
+    ("session_start", "training_session__start"),
+    ("session_end", "training_session__end"),
+    ("exercise", "exercise_type__name"),
+    ("weight", "weight"),
+    ("sets", "sets"),
+    ("reps", "reps"),
+)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """
+    Pseudo-bufor dla csv.writer – zwraca zapisany wiersz zamiast go trzymać.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _export_etag(request):
+    return stamps.etag(stamps.for_request(request), request.GET.get("format", "csv"))
+
+
+def _export_last_modified(request):
+    return stamps.for_request(request).modified_at
+
+
+@login_required
+@condition(etag_func=_export_etag, last_modified_func=_export_last_modified)
+def session_exercise_export(request):
+    """
+    Strumieniowy eksport całej historii ćwiczeń użytkownika (CSV lub NDJSON).
+    Wiersze czytane są porcjami przez values_list().iterator(), bez tworzenia
+    instancji modeli – zużycie pamięci nie zależy od długości historii.
+    """
+    fmt = request.GET.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        raise Http404("Nieobsługiwany format eksportu.")
+    content_type, extension = EXPORT_FORMATS[fmt]
+
+    rows = (
+        SessionExercise.objects.filter(created_by=request.user)
+        .order_by("session_start", "id")
+        .values_list(*(lookup for _, lookup in EXPORT_COLUMNS))
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    lines = _csv_lines(rows) if fmt == "csv" else _ndjson_lines(rows)
+
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response["Content-Disposition"] = (
+        f'attachment; filename="befit-{request.user.username}.{extension}"'
+    )
+    return response
+
+
+def _csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _ndjson_lines(rows):
+    header = [name for name, _ in EXPORT_COLUMNS]
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(dict(zip(header, row))) + "\n"
+
+
 # --- Statystyki ---
 
 
 @login_required
 def stats_view(request):
     """
-    Widok statystyk z ostatnich 4 tygodni (28 dni).
-    Na razie przekazujemy surowe dane, agregację można rozbudować.
+    Statystyki w wybranym zakresie (?range=7d/28d/90d/1y/all) pogrupowane
+    w kubełki (?bucket=day/week/month) i typy ćwiczeń. Sumy liczy baza
+    z gotowych agregatów dziennych, bez sięgania do pojedynczych ćwiczeń.
     """
-    since = timezone.now() - timedelta(days=28)
-
-    exercises = (
-        SessionExercise.objects.filter(
-            created_by=request.user, training_session__start__gte=since
-        ).select_related("exercise_type", "training_session")
+    form, since, bucket = _stats_filters(request)
+    rows = stats.queryset(request.user.pk, since, bucket)
+    sessions = stats.session_summary(request.user.pk, since)
+    records = _personal_records(request.user)
+    trends = None
+    if analytics.AVAILABLE:
+        trends = analytics.summary(
+            analytics.history(request.user.pk), _type_names(catalogue.exercise_types())
+        )
+    return render(
+        request,
+        "training/stats.html",
+        _stats_context(form, since, bucket, rows, sessions, records, trends),
     )
 
+
+@_async_user
+@login_required
+async def astats_view(request):
+    """
+    Asynchroniczna wersja stats_view.
+    """
+    form, since, bucket = _stats_filters(request)
+    rows = [row async for row in stats.queryset(request.user.pk, since, bucket)]
+    sessions = await stats.asession_summary(request.user.pk, since)
+    records = [r async for r in _personal_records(request.user)]
+    trends = None
+    if analytics.AVAILABLE:
+        trends = analytics.summary(
+            await analytics.ahistory(request.user.pk),
+            _type_names(await catalogue.aexercise_types()),
+        )
     return render(
         request,
         "training/stats.html",
+        _stats_context(form, since, bucket, rows, sessions, records, trends),
+    )
+
+
+def _stats_filters(request):
+    form = StatsFilterForm(request.GET)
+    range_key, bucket = form.filters()
+    return form, stats.range_start(range_key, bucket), bucket
+
+
+def _stats_context(form, since, bucket, rows, sessions, records, trends):
+    return {
+        "form": form,
+        "rows": rows,
+        "sessions": sessions,
+        "bucket": bucket,
+        "since": since,
+        "records": _by_exercise_name(records),
+        "trends": trends,
+    }
+
+
+def _type_names(types):
+    return {t.pk: t.name for t in types}
+
+
+def _personal_records(user):
+    return PersonalRecord.objects.filter(created_by=user).select_related(
+        "exercise_type"
+    )
+
+
+def _by_exercise_name(records):
+    # Kilka–kilkanaście wierszy: sortowanie w Pythonie zamiast w bazie, gdzie
+    # ORDER BY po nazwie z dołączonej tabeli wymagałby sortowania tymczasowego.
+    return sorted(records, key=lambda r: r.exercise_type.name)
+
+
+def _records_etag(request):
+    return stamps.etag(stamps.for_request(request), "records")
+
+
+@login_required
+@condition(etag_func=_records_etag)
+def personal_records_json(request):
+    """
+    Rekordy osobiste zalogowanego użytkownika w formacie JSON.
+    """
+    return JsonResponse(
         {
-            "exercises": exercises,
-            "since": since,
-        },
+            "records": [
+                {
+                    "exercise_type_id": r.exercise_type_id,
+                    "exercise": r.exercise_type.name,
+                    "max_weight": r.max_weight,
+                    "max_weight_exercise_id": r.max_weight_exercise_id,
+                    "best_e1rm": round(r.best_e1rm, 2),
+                    "best_e1rm_exercise_id": r.best_e1rm_exercise_id,
+                    "max_volume": r.max_volume,
+                    "max_volume_exercise_id": r.max_volume_exercise_id,
+                }
+                for r in _by_exercise_name(_personal_records(request.user))
+            ]
+        }
+    )
+
+
+def _trends_etag(request):
+    return stamps.etag(
+        stamps.for_request(request), "trends", request.GET.get("window", "")
+    )
+
+
+@login_required
+@condition(etag_func=_trends_etag)
+def progress_trends_json(request):
+    """
+    Długoterminowe trendy (?window=liczba tygodni średniej kroczącej) dla
+    każdego typu ćwiczenia: tygodniowa objętość, jej średnia krocząca,
+    tygodniowy szacowany 1RM i jego nachylenie w kg/tydzień.
+    """
+    if not analytics.AVAILABLE:
+        return JsonResponse(
+            {"error": "Analiza trendów wymaga pakietu numpy."}, status=503
+        )
+    try:
+        window = int(request.GET.get("window", analytics.DEFAULT_WINDOW))
+    except ValueError:
+        window = 0
+    if not 1 <= window <= analytics.MAX_WINDOW:
+        return JsonResponse(
+            {"error": f"window musi być liczbą od 1 do {analytics.MAX_WINDOW}."},
+            status=400,
+        )
+    return JsonResponse(
+        analytics.trends(
+            analytics.history(request.user.pk),
+            _type_names(catalogue.exercise_types()),
+            window,
+        )
+    )
+
+
+# --- Monitoring ---
+
+
+@staff_member_required
+def cache_stats_json(request):
+    """
+    Liczniki trafień i chybień pamięci podręcznej fragmentów (w tym procesie).
+    """
+    return JsonResponse({"fragments": fragments.stats()})
+
+
+@staff_member_required
+def request_profiles(request):
+    """
+    Ostatnie zmierzone żądania (próbka z bufora w tym procesie) – liczba
+    i czas zapytań, najwolniejsze zapytania z miejscem wywołania, czasy
+    szablonów i widoku. Pusta, gdy pomiar jest wyłączony.
+    """
+    return render(
+        request,
+        "training/request_profiles.html",
+        {"profiles": profiling.recent(), "enabled": profiling.enabled()},
     )